@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import ChamaGroup, GroupMembership, Contribution, Payout, Transaction
+from .models import (
+    ChamaGroup, GroupMembership, Contribution, Payout, PayoutBatch, Transaction, ChainCheckpoint, AccountNonce,
+    WalletBalanceSnapshot, OutgoingTransaction, Round
+)
 
 
 @admin.register(ChamaGroup)
@@ -41,6 +44,15 @@ class PayoutAdmin(admin.ModelAdmin):
     readonly_fields = ('block_number', 'gas_used')
 
 
+@admin.register(PayoutBatch)
+class PayoutBatchAdmin(admin.ModelAdmin):
+    list_display = ('id', 'recipient_count', 'total_amount', 'status', 'transaction_hash', 
+                   'created_at', 'confirmed_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('transaction_hash',)
+    readonly_fields = ('created_at', 'sent_at', 'confirmed_at', 'block_number', 'gas_used')
+
+
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
     list_display = ('user', 'group', 'transaction_type', 'amount', 'status', 
@@ -48,3 +60,42 @@ class TransactionAdmin(admin.ModelAdmin):
     list_filter = ('transaction_type', 'status', 'created_at', 'group__name')
     search_fields = ('user__email', 'group__name', 'transaction_hash')
     readonly_fields = ('created_at',)
+
+
+@admin.register(ChainCheckpoint)
+class ChainCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('name', 'last_block', 'updated_at')
+    readonly_fields = ('updated_at',)
+
+
+@admin.register(AccountNonce)
+class AccountNonceAdmin(admin.ModelAdmin):
+    list_display = ('address', 'next_nonce', 'released_nonces', 'synced_at', 'updated_at')
+    readonly_fields = ('synced_at', 'updated_at')
+
+
+@admin.register(WalletBalanceSnapshot)
+class WalletBalanceSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('address', 'owner_type', 'user', 'group', 'balance', 'block_number', 'taken_at')
+    list_filter = ('owner_type', 'taken_at')
+    search_fields = ('address', 'user__email', 'group__name')
+    list_select_related = ('user', 'group')
+    date_hierarchy = 'taken_at'
+
+
+@admin.register(OutgoingTransaction)
+class OutgoingTransactionAdmin(admin.ModelAdmin):
+    list_display = ('from_address', 'nonce', 'transaction_hash', 'status', 'attempts', 'payout', 'batch', 
+                   'broadcast_at')
+    list_filter = ('status', 'broadcast_at')
+    search_fields = ('from_address', 'transaction_hash')
+    readonly_fields = ('replaced_hashes', 'created_at', 'mined_at')
+
+
+@admin.register(Round)
+class RoundAdmin(admin.ModelAdmin):
+    list_display = ('group', 'number', 'status', 'contributed_count', 'expected_members', 'total_amount', 
+                   'started_at', 'ended_at')
+    list_filter = ('status', 'started_at', 'group__name')
+    search_fields = ('group__name',)
+    readonly_fields = ('contributed_count', 'total_amount', 'started_at', 'ended_at')
@@ -1,6 +1,19 @@
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ChamaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'chama'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        # Management commands other than runserver serve no submissions, and
+        # may run before the tables exist
+        command = sys.argv[1] if sys.argv[0].endswith('manage.py') and len(sys.argv) > 1 else None
+        if settings.CONTRIBUTION_BLOOM_PRELOAD and command in (None, 'runserver'):
+            from .dedup import preload_in_background
+            preload_in_background()
@@ -0,0 +1,104 @@
+import logging
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from . import metrics
+from .models import ChamaGroup, WalletBalanceSnapshot
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+def tracked_wallets() -> Dict[str, Tuple[str, Optional[int], Optional[str]]]:
+    """Every member and group wallet, as ``{address: (owner_type, user_id, group_id)}``"""
+    wallets = {}
+    users = User.objects.exclude(wallet_address__isnull=True).exclude(wallet_address='')
+    for user_id, address in users.values_list('id', 'wallet_address').iterator():
+        wallets.setdefault(address.lower(), ('user', user_id, None))
+    groups = ChamaGroup.objects.exclude(contract_address__isnull=True).exclude(contract_address='')
+    for group_id, address in groups.values_list('id', 'contract_address').iterator():
+        wallets.setdefault(address.lower(), ('group', None, group_id))
+    return wallets
+
+
+def latest_snapshots(addresses: Iterable[str]) -> Dict[str, WalletBalanceSnapshot]:
+    """Most recent snapshot of each address, read from the database only"""
+    addresses = {address.lower() for address in addresses if address}
+    latest = WalletBalanceSnapshot.objects.filter(address=OuterRef('address')).order_by('-taken_at').values('id')[:1]
+    snapshots = WalletBalanceSnapshot.objects.filter(address__in=addresses, id=Subquery(latest))
+    return {snapshot.address: snapshot for snapshot in snapshots}
+
+
+class BalanceService:
+    """
+    Bulk wallet balances for member and group wallets.
+
+    Balances are fetched with batched ``eth_getBalance`` calls and kept in the
+    Django cache for ``BALANCE_CACHE_TTL_SECONDS``. ``snapshot`` records every
+    tracked wallet in ``WalletBalanceSnapshot`` so views can show balances
+    without touching the chain.
+    """
+
+    cache_key_prefix = 'chama:balance:'
+
+    def __init__(self, helper=None):
+        if helper is None:
+            from .web3_utils import get_web3_helper
+            helper = get_web3_helper()
+        self.helper = helper
+
+    def get_balances(self, addresses: Iterable[str]) -> Dict[str, Optional[Decimal]]:
+        """Balances keyed by lowercased address, from the cache where possible"""
+        addresses = list(dict.fromkeys(address.lower() for address in addresses if address))
+        cached = cache.get_many([self.cache_key_prefix + address for address in addresses])
+        balances = {address: cached[self.cache_key_prefix + address]
+                    for address in addresses if self.cache_key_prefix + address in cached}
+
+        metrics.incr('balance_cache.hits', len(balances))
+        missing = [address for address in addresses if address not in balances]
+        if missing:
+            metrics.incr('balance_cache.misses', len(missing))
+            balances.update(self.refresh(missing))
+        return balances
+
+    def refresh(self, addresses: Iterable[str]) -> Dict[str, Optional[Decimal]]:
+        """Fetch balances from the chain and update the cache"""
+        balances = {address.lower(): balance for address, balance in self.helper.get_balances(addresses).items()}
+        cache.set_many(
+            {self.cache_key_prefix + address: balance for address, balance in balances.items() if balance is not None},
+            timeout=settings.BALANCE_CACHE_TTL_SECONDS
+        )
+        return balances
+
+    def snapshot(self) -> int:
+        """Record the balance of every tracked wallet; returns the number of rows written"""
+        wallets = tracked_wallets()
+        if not wallets:
+            return 0
+
+        block_number = self.helper.get_block_number()
+        balances = self.refresh(wallets.keys())
+        taken_at = timezone.now()
+        rows = [
+            WalletBalanceSnapshot(
+                address=address, owner_type=owner_type, user_id=user_id, group_id=group_id,
+                balance=balances[address], block_number=block_number, taken_at=taken_at
+            )
+            for address, (owner_type, user_id, group_id) in wallets.items()
+            if balances.get(address) is not None
+        ]
+        WalletBalanceSnapshot.objects.bulk_create(rows, batch_size=1000)
+
+        cutoff = taken_at - timedelta(days=settings.BALANCE_SNAPSHOT_RETENTION_DAYS)
+        WalletBalanceSnapshot.objects.filter(taken_at__lt=cutoff).delete()
+
+        logger.info(f"Recorded {len(rows)} wallet balance snapshots at block {block_number}")
+        return len(rows)
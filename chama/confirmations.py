@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .indexer import ContributionIndexer, settle_contributions, verify_contributions
+from .ledger import (
+    confirm_payout_batch, confirm_payouts, fail_payout_batch, fail_payouts, revert_orphaned_blocks
+)
+from .models import ChainCheckpoint, Contribution, Payout, PayoutBatch
+from .round_checks import request_round_checks
+from .web3_utils import get_web3_helper
+
+logger = logging.getLogger(__name__)
+
+
+class ConfirmationTracker:
+    """
+    Resolves awaited contribution and payout transactions as blocks arrive.
+
+    The tracker follows new block heads, from a websocket ``newHeads``
+    subscription when ``AVALANCHE_WS_URL`` is set and by polling otherwise.
+    Every head reloads the set of awaited hashes (pending contributions,
+    processing payouts and sent payout batches) and all awaited hashes mined
+    in the new blocks are resolved together once they are
+    ``CONFIRMATION_TRACKER_CONFIRMATIONS`` blocks deep.
+
+    Hashes of the last ``CONFIRMATION_TRACKER_REORG_DEPTH`` blocks are kept to
+    detect reorgs. When a block is orphaned, everything recorded from it is
+    reverted and its transactions are awaited again.
+    """
+
+    def __init__(self, helper=None):
+        self.helper = helper or get_web3_helper()
+        # Awaited transaction hash (lowercased) -> (kind, hash as stored)
+        self.awaited: Dict[str, Tuple[str, str]] = {}
+        # Awaited hash -> block it was mined in, while not yet deep enough
+        self.included: Dict[str, int] = {}
+        # Block number -> hash, for the most recent blocks
+        self.block_hashes: Dict[int, str] = {}
+        self.last_block: Optional[int] = None
+
+    def depth(self, tx_hash: str) -> Optional[int]:
+        """Number of confirmations of an awaited transaction, if it was mined"""
+        block_number = self.included.get(tx_hash.lower())
+        if block_number is None or self.last_block is None:
+            return None
+        return self.last_block - block_number + 1
+
+    def process_head(self, head: int) -> Dict[str, Any]:
+        """Process every block up to ``head`` that has not been seen yet"""
+        summary = {'blocks': 0, 'reorged_from': None, 'confirmed': 0, 'failed': 0, 'groups': set(), 'payouts': []}
+        new_hashes = self._sync_awaited()
+
+        start = head if self.last_block is None else min(head, self.last_block + 1)
+        start = max(start, head - settings.CONFIRMATION_TRACKER_MAX_BLOCKS + 1)
+        blocks = self._get_blocks(range(start, head + 1))
+
+        fork = self._find_fork(start, blocks)
+        if fork is not None:
+            self._handle_reorg(fork)
+            summary['reorged_from'] = fork
+            new_hashes |= self._sync_awaited()
+            start = fork
+
+        for number in range(start, head + 1):
+            block = blocks[number]
+            self.block_hashes[number] = block['hash']
+            for tx_hash in block['transactions']:
+                if tx_hash.lower() in self.awaited:
+                    self.included[tx_hash.lower()] = number
+        self._forget_blocks_before(head - settings.CONFIRMATION_TRACKER_REORG_DEPTH)
+
+        self.last_block = head if fork is not None or self.last_block is None else max(head, self.last_block)
+        summary['blocks'] = head - start + 1
+
+        deep = {tx_hash for tx_hash, number in self.included.items() if self._is_deep(number)}
+        summary.update(self._resolve(new_hashes | deep))
+        return summary
+
+    def run(self, ws_url: Optional[str] = None, poll_only: bool = False) -> None:
+        """Follow the chain forever, preferring the websocket subscription"""
+        ws_url = settings.AVALANCHE_WS_URL if ws_url is None else ws_url
+        while True:
+            if ws_url and not poll_only:
+                try:
+                    asyncio.run(self._follow_websocket(ws_url))
+                except Exception as e:
+                    logger.warning(f"newHeads subscription failed, falling back to polling: {e}")
+                until = time.monotonic() + settings.CONFIRMATION_TRACKER_WS_RETRY_SECONDS
+            else:
+                until = None
+            self._follow_polling(until)
+
+    def _follow_polling(self, until: Optional[float] = None) -> None:
+        while until is None or time.monotonic() < until:
+            head = self.helper.get_block_number()
+            if head is not None and head != self.last_block:
+                self._on_head(head)
+            time.sleep(settings.CONFIRMATION_TRACKER_POLL_INTERVAL_SECONDS)
+
+    async def _follow_websocket(self, ws_url: str) -> None:
+        from web3 import AsyncWeb3, WebSocketProvider
+
+        async with AsyncWeb3(WebSocketProvider(ws_url)) as w3:
+            await w3.eth.subscribe('newHeads')
+            logger.info(f"Subscribed to new heads on {ws_url}")
+            async for message in w3.socket.process_subscriptions():
+                await sync_to_async(self._on_head)(message['result']['number'])
+
+    def _on_head(self, head: int) -> None:
+        try:
+            summary = self.process_head(head)
+        except Exception as e:
+            logger.error(f"Error processing block {head}: {e}")
+            return
+        self.dispatch(summary)
+
+    def dispatch(self, summary: Dict[str, Any]) -> None:
+        """Queue the follow-up work for resolved transactions.
+
+        Payout completion emails are already queued by the ledger.
+        """
+        request_round_checks(summary['groups'])
+
+    def _sync_awaited(self) -> Set[str]:
+        """Reload the awaited hashes from the database; return the ones not awaited before"""
+        awaited = {}
+        pending = Contribution.objects.filter(status='pending', transaction_hash__isnull=False)
+        for tx_hash in pending.values_list('transaction_hash', flat=True):
+            awaited[tx_hash.lower()] = ('contribution', tx_hash)
+        processing = Payout.objects.filter(status='processing', batch__isnull=True, transaction_hash__isnull=False)
+        for tx_hash in processing.values_list('transaction_hash', flat=True):
+            awaited[tx_hash.lower()] = ('payout', tx_hash)
+        sent = PayoutBatch.objects.filter(status='sent', transaction_hash__isnull=False)
+        for tx_hash in sent.values_list('transaction_hash', flat=True):
+            awaited[tx_hash.lower()] = ('batch', tx_hash)
+
+        new_hashes = set(awaited) - set(self.awaited)
+        self.awaited = awaited
+        self.included = {tx_hash: number for tx_hash, number in self.included.items() if tx_hash in awaited}
+        return new_hashes
+
+    def _get_blocks(self, block_numbers) -> Dict[int, Dict[str, Any]]:
+        blocks = self.helper.get_blocks(block_numbers, full_transactions=False)
+        for number, block in blocks.items():
+            if block is None:
+                raise ValueError(f"Block {number} not available yet")
+        return blocks
+
+    def _find_fork(self, start: int, blocks: Dict[int, Dict[str, Any]]) -> Optional[int]:
+        """Return the first orphaned block number, or None if the chain only grew"""
+        fork = None
+        number = start
+        block = blocks[start]
+        if self.block_hashes.get(number) not in (None, block['hash']):
+            fork = number
+        # Walk back until the new chain joins the blocks we have seen
+        while self.block_hashes.get(number - 1) not in (None, block['parentHash']):
+            number -= 1
+            fork = number
+            block = blocks[number] = self._get_blocks([number])[number]
+        return fork
+
+    def _handle_reorg(self, fork: int) -> None:
+        logger.warning(f"Chain reorganization detected, blocks from {fork} were orphaned")
+        revert_orphaned_blocks(fork)
+        # Let the contribution indexer rescan the replacement blocks
+        ChainCheckpoint.objects.filter(
+            name=ContributionIndexer.checkpoint_name, last_block__gte=fork
+        ).update(last_block=fork - 1)
+        self.block_hashes = {number: block_hash for number, block_hash in self.block_hashes.items() if number < fork}
+        self.included = {tx_hash: number for tx_hash, number in self.included.items() if number < fork}
+
+    def _forget_blocks_before(self, number: int) -> None:
+        for old in [old for old in self.block_hashes if old < number]:
+            del self.block_hashes[old]
+
+    def _is_deep(self, block_number: Optional[int]) -> bool:
+        if block_number is None or self.last_block is None:
+            return False
+        return self.last_block - block_number + 1 >= settings.CONFIRMATION_TRACKER_CONFIRMATIONS
+
+    def _resolve(self, tx_hashes: Set[str]) -> Dict[str, Any]:
+        """Look up awaited transactions together and settle the ones deep enough"""
+        by_kind: Dict[str, List[str]] = defaultdict(list)
+        for tx_hash in tx_hashes:
+            kind, stored_hash = self.awaited[tx_hash]
+            by_kind[kind].append(stored_hash)
+
+        summary = {'confirmed': 0, 'failed': 0, 'groups': set(), 'payouts': []}
+        if by_kind['contribution']:
+            self._merge(summary, self._resolve_contributions(by_kind['contribution']))
+        if by_kind['payout'] or by_kind['batch']:
+            fetched = self.helper.fetch_transactions(by_kind['payout'] + by_kind['batch'])
+            receipts = {tx_hash: result['receipt'] for tx_hash, result in fetched.items()
+                        if result['receipt'] and self._settle_ready(tx_hash, result['receipt']['blockNumber'])}
+            self._merge(summary, self._resolve_payouts(receipts))
+            self._merge(summary, self._resolve_batches(receipts))
+        return summary
+
+    def _settle_ready(self, tx_hash: str, block_number: Optional[int]) -> bool:
+        """Whether a mined transaction can be settled; shallow ones are tracked until deep enough"""
+        if block_number is None:
+            return False
+        if not self._is_deep(block_number):
+            self.included[tx_hash.lower()] = block_number
+            return False
+        self.included.pop(tx_hash.lower(), None)
+        return True
+
+    def _resolve_contributions(self, tx_hashes: List[str]) -> Dict[str, Any]:
+        contributions = list(
+            Contribution.objects.filter(transaction_hash__in=tx_hashes, status='pending').select_related('group')
+        )
+        results = verify_contributions(self.helper, contributions)
+        ready = [
+            contribution for contribution in contributions
+            if self._settle_ready(contribution.transaction_hash, results[contribution.transaction_hash].get('block_number'))
+        ]
+        return settle_contributions(self.helper, ready, results)
+
+    def _resolve_payouts(self, receipts: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        payouts = Payout.objects.filter(transaction_hash__in=receipts.keys(), status='processing', batch__isnull=True)
+        completed, failed = [], []
+        for payout in payouts:
+            receipt = receipts[payout.transaction_hash]
+            (completed if receipt.get('status') == 1 else failed).append((payout, receipt))
+
+        return {'payouts': confirm_payouts(completed), 'failed': fail_payouts(failed)}
+
+    def _resolve_batches(self, receipts: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        summary = {'payouts': [], 'failed': 0}
+        for batch in PayoutBatch.objects.filter(transaction_hash__in=receipts.keys(), status='sent'):
+            receipt = receipts[batch.transaction_hash]
+            if receipt.get('status') == 1:
+                summary['payouts'] += confirm_payout_batch(batch, receipt)
+            else:
+                summary['failed'] += fail_payout_batch(batch, receipt)
+        return summary
+
+    @staticmethod
+    def _merge(summary: Dict[str, Any], other: Dict[str, Any]) -> None:
+        summary['confirmed'] += other.get('confirmed', 0) + len(other.get('payouts', []))
+        summary['failed'] += other.get('failed', 0)
+        summary['groups'] |= other.get('groups', set())
+        summary['payouts'] += other.get('payouts', [])
@@ -0,0 +1,148 @@
+import hashlib
+import logging
+import math
+import threading
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection
+
+from . import metrics
+from .models import Contribution
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    ``might_contain`` never returns False for an added item; it returns True
+    for an item that was not added with probability ``error_rate`` once
+    ``capacity`` items are in the filter.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+        return [(first + index * second) % self.size for index in range(self.hash_count)]
+
+    def add(self, item: str) -> None:
+        with self._lock:
+            for position in self._positions(item):
+                self.bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class ContributionDeduplicator:
+    """
+    Finds contributions that were already submitted.
+
+    Transaction hashes and per-member idempotency keys of every contribution
+    are kept in a Bloom filter, preloaded from the database when the process
+    starts (see ``preload_in_background``), so a new submission is usually
+    recognised as new without a query. Only when the filter reports a
+    possible match is the database checked. The filter is per process:
+    submissions handled by other processes are still caught by the unique
+    constraints when the contribution is inserted.
+    """
+
+    def __init__(self):
+        self.filter: Optional[BloomFilter] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_item(member_id, idempotency_key: str) -> str:
+        return f'key:{member_id}:{idempotency_key}'
+
+    @staticmethod
+    def hash_item(transaction_hash: str) -> str:
+        return f'tx:{transaction_hash.lower()}'
+
+    def warm(self) -> BloomFilter:
+        """Load every known transaction hash and idempotency key"""
+        bloom = BloomFilter(settings.CONTRIBUTION_BLOOM_CAPACITY, settings.CONTRIBUTION_BLOOM_ERROR_RATE)
+        rows = Contribution.objects.values_list('transaction_hash', 'member_id', 'idempotency_key')
+        count = 0
+        for transaction_hash, member_id, idempotency_key in rows.iterator(chunk_size=5000):
+            if transaction_hash:
+                bloom.add(self.hash_item(transaction_hash))
+            if idempotency_key:
+                bloom.add(self.key_item(member_id, idempotency_key))
+            count += 1
+        logger.info(f"Loaded {count} contributions into the duplicate filter")
+        return bloom
+
+    def preload(self) -> None:
+        """Build the filter now, so the first submission does not pay for the table scan"""
+        self._get_filter()
+
+    def _get_filter(self) -> BloomFilter:
+        if self.filter is None:
+            with self._lock:
+                if self.filter is None:
+                    self.filter = self.warm()
+        return self.filter
+
+    def find_by_idempotency_key(self, member, idempotency_key: str) -> Optional[Contribution]:
+        if not self._get_filter().might_contain(self.key_item(member.id, idempotency_key)):
+            metrics.incr('contribution_intake.filter_skips')
+            return None
+        contributions = Contribution.objects.select_related('member', 'group')
+        return contributions.filter(member=member, idempotency_key=idempotency_key).first()
+
+    def find_by_transaction_hash(self, transaction_hash: str) -> Optional[Contribution]:
+        if not self._get_filter().might_contain(self.hash_item(transaction_hash)):
+            metrics.incr('contribution_intake.filter_skips')
+            return None
+        contributions = Contribution.objects.select_related('member', 'group')
+        return contributions.filter(transaction_hash=transaction_hash.lower()).first()
+
+    def remember(self, contribution: Contribution) -> None:
+        bloom = self._get_filter()
+        if contribution.transaction_hash:
+            bloom.add(self.hash_item(contribution.transaction_hash))
+        if contribution.idempotency_key:
+            bloom.add(self.key_item(contribution.member_id, contribution.idempotency_key))
+
+
+_deduplicator = None
+_deduplicator_lock = threading.Lock()
+
+
+def get_contribution_deduplicator() -> ContributionDeduplicator:
+    """Get the process-wide contribution deduplicator"""
+    global _deduplicator
+    if _deduplicator is None:
+        with _deduplicator_lock:
+            if _deduplicator is None:
+                _deduplicator = ContributionDeduplicator()
+    return _deduplicator
+
+
+def preload_in_background() -> threading.Thread:
+    """Preload the process-wide deduplicator in a daemon thread, so startup is not held up.
+
+    Submissions arriving meanwhile wait for the load instead of starting
+    their own.
+    """
+    def preload():
+        try:
+            get_contribution_deduplicator().preload()
+        except Exception as e:
+            # The first lookup loads it instead
+            logger.warning(f"Could not preload the duplicate filter: {e}")
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=preload, name='contribution-dedup-preload', daemon=True)
+    thread.start()
+    return thread
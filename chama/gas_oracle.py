@@ -0,0 +1,74 @@
+import logging
+from statistics import median
+from typing import Any, Callable, Dict, List
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+GWEI = 10 ** 9
+
+
+class GasOracle:
+    """
+    EIP-1559 fee estimates shared by every payout sender.
+
+    Fees are derived from ``eth_feeHistory``: the next block's base fee times
+    ``GAS_BASE_FEE_MULTIPLIER`` (headroom for a few full blocks) plus the
+    median of the ``GAS_PRIORITY_FEE_PERCENTILE`` tips paid over the last
+    ``GAS_FEE_HISTORY_BLOCKS`` blocks. Estimates live in the Django cache for
+    ``GAS_ORACLE_TTL_SECONDS``, so a batch of payouts across workers costs a
+    single fee RPC. If the node cannot answer, the last known estimate is used.
+    """
+
+    cache_key = 'chama:gas_oracle:fees'
+    last_known_cache_key = 'chama:gas_oracle:last_known_fees'
+
+    def __init__(self, fetch_fee_history: Callable[[int, List[float]], Dict[str, Any]],
+                 fetch_gas_price: Callable[[], int]):
+        self.fetch_fee_history = fetch_fee_history
+        self.fetch_gas_price = fetch_gas_price
+
+    def get_fees(self) -> Dict[str, int]:
+        """Return transaction fee fields: EIP-1559 fields, or ``gasPrice`` on legacy nodes"""
+        fees = cache.get(self.cache_key)
+        if fees is not None:
+            metrics.incr('gas_oracle.hits')
+            return fees
+
+        metrics.incr('gas_oracle.refreshes')
+        try:
+            fees = self._estimate()
+        except Exception as e:
+            logger.error(f"Error estimating fees: {e}")
+            return cache.get(self.last_known_cache_key) or {
+                'gasPrice': int(settings.GAS_PRICE_FALLBACK_GWEI * GWEI)
+            }
+
+        cache.set(self.cache_key, fees, timeout=settings.GAS_ORACLE_TTL_SECONDS)
+        cache.set(self.last_known_cache_key, fees, timeout=None)
+        return fees
+
+    def invalidate(self) -> None:
+        """Drop the cached estimate, e.g. after a transaction was underpriced"""
+        cache.delete(self.cache_key)
+
+    def _estimate(self) -> Dict[str, int]:
+        try:
+            history = self.fetch_fee_history(settings.GAS_FEE_HISTORY_BLOCKS, [settings.GAS_PRIORITY_FEE_PERCENTILE])
+        except Exception as e:
+            logger.warning(f"eth_feeHistory unavailable, falling back to eth_gasPrice: {e}")
+            return {'gasPrice': self.fetch_gas_price()}
+
+        # The last entry is the base fee of the next block
+        base_fee = history['baseFeePerGas'][-1]
+        tips = [reward[0] for reward in history.get('reward') or [] if reward]
+        priority_fee = max(int(median(tips)) if tips else 0, int(settings.GAS_MIN_PRIORITY_FEE_GWEI * GWEI))
+
+        return {
+            'maxFeePerGas': int(base_fee * settings.GAS_BASE_FEE_MULTIPLIER) + priority_fee,
+            'maxPriorityFeePerGas': priority_fee,
+        }
@@ -0,0 +1,170 @@
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .ledger import confirm_contributions, fail_contributions
+from .models import ChainCheckpoint, ChamaGroup, Contribution
+from .web3_utils import get_web3_helper
+
+logger = logging.getLogger(__name__)
+
+
+class ContributionIndex:
+    """In-memory lookup tables used to match block transactions to contributions"""
+
+    def __init__(self):
+        # Watched recipient address -> group id (None for the shared Chama contract)
+        self.address_to_group: Dict[str, Optional[Any]] = {}
+        # Transaction hash -> pending contribution
+        self.hash_to_contribution: Dict[str, Contribution] = {}
+
+    @classmethod
+    def load(cls) -> 'ContributionIndex':
+        index = cls()
+        if settings.CHAMA_CONTRACT_ADDRESS:
+            index.address_to_group[settings.CHAMA_CONTRACT_ADDRESS.lower()] = None
+
+        groups = ChamaGroup.objects.exclude(contract_address__isnull=True).exclude(contract_address='')
+        for group_id, contract_address in groups.values_list('id', 'contract_address'):
+            index.address_to_group[contract_address.lower()] = group_id
+
+        pending = Contribution.objects.filter(status='pending', transaction_hash__isnull=False).select_related('group')
+        for contribution in pending:
+            index.hash_to_contribution[contribution.transaction_hash.lower()] = contribution
+        return index
+
+    def match(self, tx: Dict[str, Any]) -> Optional[Contribution]:
+        """Return the pending contribution paid by ``tx``, if any"""
+        to_address = (tx.get('to') or '').lower()
+        if to_address not in self.address_to_group:
+            return None
+
+        contribution = self.hash_to_contribution.get((tx.get('hash') or '').lower())
+        if contribution is None:
+            return None
+
+        group_id = self.address_to_group[to_address]
+        if group_id is not None and group_id != contribution.group_id:
+            return None
+        return contribution
+
+
+class ContributionIndexer:
+    """
+    Tails the chain once for all groups and confirms pending contributions
+    in bulk, instead of polling every transaction hash separately.
+
+    Blocks are scanned from the stored checkpoint up to the current head minus
+    ``CHAIN_INDEXER_CONFIRMATIONS``, at most ``CHAIN_INDEXER_MAX_BLOCKS`` per
+    run. The checkpoint is committed together with the confirmations, in a
+    short transaction after the chain has been read; a run whose checkpoint
+    moved meanwhile discards its results.
+    """
+
+    checkpoint_name = 'contributions'
+
+    def __init__(self, helper=None):
+        self.helper = helper or get_web3_helper()
+
+    def run(self) -> Dict[str, Any]:
+        head = self.helper.get_block_number()
+        if head is None:
+            return {'blocks': 0, 'confirmed': 0, 'failed': 0, 'groups': set()}
+        safe_head = head - settings.CHAIN_INDEXER_CONFIRMATIONS
+
+        checkpoint = self._get_checkpoint(safe_head)
+        start = checkpoint.last_block + 1
+        end = min(safe_head, start + settings.CHAIN_INDEXER_MAX_BLOCKS - 1)
+        if end < start:
+            return {'blocks': 0, 'confirmed': 0, 'failed': 0, 'groups': set()}
+
+        # Blocks and receipts are fetched outside any transaction, so a slow
+        # node never holds the checkpoint lock
+        index = ContributionIndex.load()
+        matched = self._scan(index, range(start, end + 1)) if index.hash_to_contribution else []
+        results = verify_contributions(self.helper, matched) if matched else {}
+
+        with transaction.atomic():
+            locked = ChainCheckpoint.objects.select_for_update().get(pk=checkpoint.pk)
+            if locked.last_block != checkpoint.last_block:
+                logger.info(f"Blocks {start}-{end} were indexed by another worker meanwhile")
+                return {'blocks': 0, 'confirmed': 0, 'failed': 0, 'groups': set()}
+
+            summary = settle_contributions(self.helper, matched, results)
+            locked.last_block = end
+            locked.save(update_fields=['last_block', 'updated_at'])
+
+        summary['blocks'] = end - start + 1
+        logger.info(
+            f"Indexed blocks {start}-{end}: {summary['confirmed']} contributions confirmed, "
+            f"{summary['failed']} failed"
+        )
+        return summary
+
+    def _get_checkpoint(self, safe_head: int) -> ChainCheckpoint:
+        checkpoint = ChainCheckpoint.objects.filter(name=self.checkpoint_name).first()
+        if checkpoint is None:
+            start_block = settings.CHAIN_INDEXER_START_BLOCK
+            if start_block is None:
+                start_block = safe_head
+            try:
+                with transaction.atomic():
+                    checkpoint = ChainCheckpoint.objects.create(name=self.checkpoint_name,
+                                                                last_block=max(start_block - 1, 0))
+            except IntegrityError:
+                # Created concurrently by another worker
+                checkpoint = ChainCheckpoint.objects.get(name=self.checkpoint_name)
+        return checkpoint
+
+    def _scan(self, index: ContributionIndex, block_numbers: range) -> List[Contribution]:
+        matched = []
+        blocks = self.helper.get_blocks(block_numbers, full_transactions=True)
+        for number in block_numbers:
+            block = blocks.get(number)
+            if block is None:
+                raise ValueError(f"Block {number} not available yet")
+            for tx in block['transactions']:
+                contribution = index.match(tx)
+                if contribution is not None:
+                    matched.append(contribution)
+        return matched
+
+
+def settle_contributions(helper, contributions: List[Contribution],
+                         results: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Verify contributions with one batched lookup and record the outcome.
+
+    ``results`` may hold verification results that were already fetched.
+    Confirmations and failures are written in one transaction; contributions
+    whose transaction is not mined yet are left pending.
+    """
+    if not contributions:
+        return {'confirmed': 0, 'failed': 0, 'groups': set()}
+
+    if results is None:
+        results = verify_contributions(helper, contributions)
+    verified, failed = [], []
+    for contribution in contributions:
+        result = results[contribution.transaction_hash]
+        if result['is_valid']:
+            verified.append((contribution, result))
+        elif 'status' in result:
+            # Mined, but reverted or not matching the expected transfer
+            logger.warning(f"Contribution {contribution.id} failed verification: {result['errors']}")
+            failed.append(contribution)
+
+    with transaction.atomic():
+        groups: Set[Any] = confirm_contributions(verified)
+        fail_contributions(failed)
+    return {'confirmed': len(verified), 'failed': len(failed), 'groups': groups}
+
+
+def verify_contributions(helper, contributions: List[Contribution]) -> Dict[str, Dict[str, Any]]:
+    """Verification results for contributions, keyed by transaction hash"""
+    return helper.verify_transactions(
+        (contribution.transaction_hash, contribution.amount, contribution.group.contract_address
+         or settings.CHAMA_CONTRACT_ADDRESS)
+        for contribution in contributions
+    )
@@ -0,0 +1,480 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max, Q, Sum
+from django.utils import timezone
+
+from .models import Contribution, GroupMembership, Payout, PayoutBatch, Round, RoundContributor, Transaction
+from .notifications import queue_payout_completed_emails
+
+logger = logging.getLogger(__name__)
+
+
+def active_member_count(group_id) -> int:
+    return GroupMembership.objects.filter(group_id=group_id, status='active').count()
+
+
+def current_round(group_id) -> Round:
+    """The open round of a group, opening the first one if the group has none"""
+    existing = Round.objects.filter(group_id=group_id, status='open').first()
+    if existing:
+        return existing
+
+    last_number = Round.objects.filter(group_id=group_id).aggregate(number=Max('number'))['number']
+    if last_number is None:
+        last_number = Payout.objects.filter(group_id=group_id).aggregate(number=Max('round_number'))['number'] or 0
+    with transaction.atomic():
+        opened, _ = Round.objects.get_or_create(
+            group_id=group_id,
+            status='open',
+            defaults={
+                'number': last_number + 1,
+                'started_at': timezone.now(),
+                'expected_members': active_member_count(group_id),
+            },
+        )
+    return opened
+
+
+def close_round(current: Round, payout: Payout) -> Round:
+    """Complete a round with its payout and open the next one; returns the new round"""
+    now = timezone.now()
+    with transaction.atomic():
+        current.status = 'completed'
+        current.payout = payout
+        current.ended_at = now
+        current.save(update_fields=['status', 'payout', 'ended_at'])
+        return Round.objects.create(
+            group_id=current.group_id,
+            number=current.number + 1,
+            started_at=now,
+            expected_members=active_member_count(current.group_id),
+        )
+
+
+def next_payout_recipient(group_id) -> Optional[GroupMembership]:
+    """The active member after the previous round's recipient in payout order, wrapping around.
+
+    Members are ordered by ``payout_position`` (unset positions last, by join
+    date). If the previous recipient has since left, the rotation continues
+    from their position.
+    """
+    members = list(
+        GroupMembership.objects.filter(group_id=group_id, status='active').select_related('user')
+        .order_by(F('payout_position').asc(nulls_last=True), 'joined_at', 'id')
+    )
+    if not members:
+        return None
+
+    previous = (
+        Round.objects.filter(group_id=group_id, payout__isnull=False)
+        .select_related('payout').order_by('-number').first()
+    )
+    if previous is not None:
+        previous_recipient = previous.payout.recipient_id
+    else:
+        # Payouts made before rounds were tracked
+        previous_recipient = (
+            Payout.objects.filter(group_id=group_id).order_by('-round_number')
+            .values_list('recipient_id', flat=True).first()
+        )
+    if previous_recipient is None:
+        return members[0]
+
+    user_ids = [member.user_id for member in members]
+    if previous_recipient in user_ids:
+        return members[(user_ids.index(previous_recipient) + 1) % len(members)]
+
+    previous_position = (
+        GroupMembership.objects.filter(group_id=group_id, user_id=previous_recipient)
+        .values_list('payout_position', flat=True).first()
+    )
+    if previous_position is not None:
+        for member in members:
+            if member.payout_position is not None and member.payout_position > previous_position:
+                return member
+    return members[0]
+
+
+def sync_expected_members(group_id) -> None:
+    """Refresh the open round's expected member count after members join or leave"""
+    Round.objects.filter(group_id=group_id, status='open').update(expected_members=active_member_count(group_id))
+
+
+def has_contributed_this_round(group_id, user_id) -> bool:
+    return RoundContributor.objects.filter(round__group_id=group_id, round__status='open', user_id=user_id).exists()
+
+
+def record_round_contributions(contributions: List[Contribution]) -> None:
+    """Count newly confirmed contributions towards their group's open round.
+
+    Must run inside the transaction confirming them. Open rounds are locked
+    while their counters are incremented, and each contribution's ``round``
+    is set (the caller saves it).
+    """
+    if not contributions:
+        return
+
+    group_ids = {contribution.group_id for contribution in contributions}
+    for group_id in group_ids:
+        current_round(group_id)
+    rounds = {
+        opened.group_id: opened
+        for opened in Round.objects.select_for_update().filter(group_id__in=group_ids, status='open')
+    }
+
+    now = timezone.now()
+    totals = defaultdict(Decimal)
+    contributors = {}
+    for contribution in contributions:
+        opened = rounds[contribution.group_id]
+        contribution.round = opened
+        totals[opened.id] += contribution.amount
+        contributors.setdefault((opened.id, contribution.member_id), now)
+
+    existing = set(
+        RoundContributor.objects.filter(round_id__in=totals.keys(), user_id__in={user_id for _, user_id in contributors})
+        .values_list('round_id', 'user_id')
+    )
+    new_contributors = [
+        RoundContributor(round_id=round_id, user_id=user_id, contributed_at=contributed_at)
+        for (round_id, user_id), contributed_at in contributors.items()
+        if (round_id, user_id) not in existing
+    ]
+    RoundContributor.objects.bulk_create(new_contributors)
+
+    new_counts = defaultdict(int)
+    for contributor in new_contributors:
+        new_counts[contributor.round_id] += 1
+    for round_id, total in totals.items():
+        Round.objects.filter(id=round_id).update(
+            contributed_count=F('contributed_count') + new_counts[round_id],
+            total_amount=F('total_amount') + total,
+        )
+
+
+def unrecord_round_contributions(reverted: List[Tuple[Any, Any, Decimal]]) -> None:
+    """Take contributions that are no longer confirmed back out of their rounds.
+
+    ``reverted`` holds ``(round_id, member_id, amount)`` of each contribution,
+    whose status must already be updated.
+    """
+    totals = defaultdict(Decimal)
+    for round_id, _, amount in reverted:
+        totals[round_id] += amount
+
+    for round_id, member_id in {(round_id, member_id) for round_id, member_id, _ in reverted}:
+        if not Contribution.objects.filter(round_id=round_id, member_id=member_id, status='confirmed').exists():
+            RoundContributor.objects.filter(round_id=round_id, user_id=member_id).delete()
+    for round_id, total in totals.items():
+        Round.objects.filter(id=round_id).update(
+            contributed_count=RoundContributor.objects.filter(round_id=round_id).count(),
+            total_amount=F('total_amount') - total,
+        )
+
+
+def confirm_contributions(verified: Iterable[Tuple[Contribution, Dict[str, Any]]]) -> Set[Any]:
+    """Mark verified contributions as confirmed and record their transactions.
+
+    ``verified`` pairs each contribution with its (valid) verification result.
+    Rows are re-read under lock so contributions confirmed concurrently by
+    another worker are skipped, and the open rounds of their groups are
+    updated in the same transaction. Returns the ids of the affected groups.
+    """
+    results = {contribution.id: result for contribution, result in verified}
+    if not results:
+        return set()
+
+    now = timezone.now()
+    with transaction.atomic():
+        contributions = list(
+            Contribution.objects.select_for_update()
+            .filter(id__in=results.keys(), status='pending')
+        )
+        ledger_entries = []
+        for contribution in contributions:
+            result = results[contribution.id]
+            contribution.status = 'confirmed'
+            contribution.block_number = result.get('block_number')
+            contribution.gas_used = result.get('gas_used')
+            contribution.confirmed_at = now
+            ledger_entries.append(Transaction(
+                transaction_hash=contribution.transaction_hash,
+                transaction_type='contribution',
+                group_id=contribution.group_id,
+                user_id=contribution.member_id,
+                contribution=contribution,
+                from_address=result.get('from_address') or '',
+                to_address=result.get('to_address') or '',
+                amount=contribution.amount,
+                gas_price=result.get('gas_price') or 0,
+                gas_used=result.get('gas_used'),
+                block_number=result.get('block_number'),
+                status='confirmed',
+                confirmed_at=now,
+            ))
+
+        record_round_contributions(contributions)
+        Contribution.objects.bulk_update(contributions, ['status', 'block_number', 'gas_used', 'confirmed_at', 'round'])
+        Transaction.objects.bulk_create(ledger_entries, ignore_conflicts=True)
+
+    logger.info(f"Confirmed {len(contributions)} contributions")
+    return {contribution.group_id for contribution in contributions}
+
+
+def fail_contributions(contributions: List[Contribution]) -> int:
+    """Mark pending contributions whose transaction reverted as failed"""
+    return Contribution.objects.filter(
+        id__in=[contribution.id for contribution in contributions],
+        status='pending'
+    ).update(status='failed')
+
+
+def due_payouts():
+    """Scheduled payouts that are due and not claimed by a live worker"""
+    now = timezone.now()
+    expired = now - timedelta(seconds=settings.PAYOUT_CLAIM_LEASE_SECONDS)
+    return (
+        Payout.objects
+        .filter(status='scheduled', batch__isnull=True, scheduled_date__lte=now.date())
+        .filter(Q(claimed_at__isnull=True) | Q(claimed_at__lt=expired))
+    )
+
+
+def claim_due_payouts(limit: int, payout_ids: Optional[Iterable[Any]] = None) -> List[Payout]:
+    """Claim up to ``limit`` due payouts for this worker.
+
+    Rows are locked with ``SKIP LOCKED``, so concurrent sweepers claim
+    disjoint payouts, and stamped with ``claimed_at``. A claim expires after
+    ``PAYOUT_CLAIM_LEASE_SECONDS``, which is when a payout whose send failed
+    or whose worker died is picked up again.
+    """
+    with transaction.atomic():
+        claimable = due_payouts()
+        if payout_ids is not None:
+            claimable = claimable.filter(id__in=payout_ids)
+        claimed_ids = list(
+            claimable.select_for_update(skip_locked=True)
+            .order_by('scheduled_date', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        Payout.objects.filter(id__in=claimed_ids).update(claimed_at=timezone.now())
+    return list(Payout.objects.filter(id__in=claimed_ids).select_related('recipient').order_by('scheduled_date', 'id'))
+
+
+def create_payout_batch(limit: int) -> Optional[PayoutBatch]:
+    """Claim up to ``limit`` due payouts, across all groups, into a new batch.
+
+    Payouts locked by a concurrent claim are skipped, so several workers can
+    build batches at the same time. Returns None when nothing is due.
+    """
+    with transaction.atomic():
+        payout_ids = list(
+            due_payouts().select_for_update(skip_locked=True, of=('self',))
+            .exclude(recipient__wallet_address__isnull=True)
+            .exclude(recipient__wallet_address='')
+            .order_by('scheduled_date', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if not payout_ids:
+            return None
+
+        payouts = Payout.objects.filter(id__in=payout_ids)
+        batch = PayoutBatch.objects.create(
+            contract_address=settings.DISPERSE_CONTRACT_ADDRESS,
+            total_amount=payouts.aggregate(total=Sum('amount'))['total'],
+            recipient_count=len(payout_ids),
+        )
+        payouts.update(batch=batch, status='processing')
+
+    logger.info(f"Created payout batch {batch.id} with {len(payout_ids)} payouts")
+    return batch
+
+
+def batch_payouts(batch: PayoutBatch) -> List[Payout]:
+    """Payouts of a batch in the order they are passed to the disperse contract"""
+    return list(batch.payouts.select_related('recipient', 'group').order_by('id'))
+
+
+def release_payout_batch(batch: PayoutBatch) -> int:
+    """Return the payouts of a batch that could not be sent to the schedule"""
+    with transaction.atomic():
+        released = batch.payouts.filter(status='processing').update(batch=None, status='scheduled')
+        PayoutBatch.objects.filter(id=batch.id).update(status='failed')
+    return released
+
+
+def confirm_payout_batch(batch: PayoutBatch, receipt: Dict[str, Any]) -> List[Payout]:
+    """Complete every payout of a mined batch transaction from its single receipt.
+
+    Payouts, recipient memberships and ledger transactions are all written
+    in bulk, and the completion emails are queued in the same transaction.
+    Returns the payouts that were completed.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = PayoutBatch.objects.select_for_update().get(id=batch.id)
+        if batch.status == 'completed':
+            return []
+
+        payouts = [payout for payout in batch_payouts(batch) if payout.status == 'processing']
+        gas_used = receipt.get('gasUsed')
+        # Gas is shared evenly between the transfers of the batch
+        gas_share = gas_used // len(payouts) if gas_used and payouts else None
+
+        ledger_entries = []
+        for index, payout in enumerate(payouts):
+            payout.status = 'completed'
+            payout.block_number = receipt.get('blockNumber')
+            payout.gas_used = gas_share
+            payout.processed_at = now
+            ledger_entries.append(Transaction(
+                transaction_hash=batch.transaction_hash,
+                batch_index=index,
+                transaction_type='payout',
+                group_id=payout.group_id,
+                user_id=payout.recipient_id,
+                payout=payout,
+                from_address=receipt.get('from') or '',
+                to_address=payout.recipient.wallet_address,
+                amount=payout.amount,
+                gas_price=receipt.get('effectiveGasPrice') or 0,
+                gas_used=gas_share,
+                block_number=receipt.get('blockNumber'),
+                status='confirmed',
+                confirmed_at=now,
+            ))
+
+        Payout.objects.bulk_update(payouts, ['status', 'block_number', 'gas_used', 'processed_at'])
+        Transaction.objects.bulk_create(ledger_entries, ignore_conflicts=True)
+        if payouts:
+            GroupMembership.objects.filter(
+                reduce(or_, (Q(group_id=payout.group_id, user_id=payout.recipient_id) for payout in payouts))
+            ).update(has_received_payout=True)
+        queue_payout_completed_emails(payouts)
+
+        batch.status = 'completed'
+        batch.block_number = receipt.get('blockNumber')
+        batch.gas_used = gas_used
+        batch.confirmed_at = now
+        batch.save(update_fields=['status', 'block_number', 'gas_used', 'confirmed_at'])
+
+    logger.info(f"Completed {len(payouts)} payouts from batch {batch.id}")
+    return payouts
+
+
+def fail_payout_batch(batch: PayoutBatch, receipt: Optional[Dict[str, Any]] = None) -> int:
+    """Mark a batch whose transaction reverted, and its payouts, as failed"""
+    block_number = receipt.get('blockNumber') if receipt else None
+    with transaction.atomic():
+        failed = batch.payouts.filter(status='processing').update(status='failed', block_number=block_number)
+        PayoutBatch.objects.filter(id=batch.id).update(status='failed', block_number=block_number)
+    return failed
+
+
+def confirm_payouts(verified: Iterable[Tuple[Payout, Dict[str, Any]]]) -> List[Payout]:
+    """Complete single-transfer payouts from their (successful) receipts.
+
+    Completion emails are queued in the same transaction. Returns the
+    payouts that were completed; ones already completed by another worker
+    are skipped.
+    """
+    receipts = {payout.id: receipt for payout, receipt in verified}
+    if not receipts:
+        return []
+
+    now = timezone.now()
+    with transaction.atomic():
+        payouts = list(
+            Payout.objects.select_for_update(of=('self',)).select_related('recipient', 'group')
+            .filter(id__in=receipts.keys(), status='processing')
+        )
+        ledger_entries = []
+        for payout in payouts:
+            receipt = receipts[payout.id]
+            payout.status = 'completed'
+            payout.block_number = receipt.get('blockNumber')
+            payout.gas_used = receipt.get('gasUsed')
+            payout.processed_at = now
+            ledger_entries.append(Transaction(
+                transaction_hash=payout.transaction_hash,
+                transaction_type='payout',
+                group_id=payout.group_id,
+                user_id=payout.recipient_id,
+                payout=payout,
+                from_address=receipt.get('from') or '',
+                to_address=payout.recipient.wallet_address or '',
+                amount=payout.amount,
+                gas_price=receipt.get('effectiveGasPrice') or 0,
+                gas_used=receipt.get('gasUsed'),
+                block_number=receipt.get('blockNumber'),
+                status='confirmed',
+                confirmed_at=now,
+            ))
+
+        Payout.objects.bulk_update(payouts, ['status', 'block_number', 'gas_used', 'processed_at'])
+        Transaction.objects.bulk_create(ledger_entries, ignore_conflicts=True)
+        if payouts:
+            GroupMembership.objects.filter(
+                reduce(or_, (Q(group_id=payout.group_id, user_id=payout.recipient_id) for payout in payouts))
+            ).update(has_received_payout=True)
+        queue_payout_completed_emails(payouts)
+
+    logger.info(f"Completed {len(payouts)} payouts")
+    return payouts
+
+
+def fail_payouts(failed: Iterable[Tuple[Payout, Dict[str, Any]]]) -> int:
+    """Mark payouts whose transaction reverted as failed"""
+    count = 0
+    with transaction.atomic():
+        for payout, receipt in failed:
+            count += Payout.objects.filter(id=payout.id, status='processing').update(
+                status='failed', block_number=receipt.get('blockNumber'), gas_used=receipt.get('gasUsed')
+            )
+    return count
+
+
+def revert_orphaned_blocks(from_block: int) -> Dict[str, int]:
+    """Undo everything recorded from blocks at or above ``from_block`` after a reorg.
+
+    Confirmed contributions go back to pending (and out of their rounds) and
+    completed or failed payouts back to processing, so they are resolved again once their
+    transactions land in the new canonical chain. Ledger transactions from
+    the orphaned blocks are removed.
+    """
+    with transaction.atomic():
+        contributions = Contribution.objects.filter(block_number__gte=from_block, status='confirmed')
+        counted = list(contributions.filter(round__isnull=False).values_list('round_id', 'member_id', 'amount'))
+        reverted_contributions = contributions.update(
+            status='pending', block_number=None, gas_used=None, confirmed_at=None, round=None
+        )
+        unrecord_round_contributions(counted)
+
+        payouts = Payout.objects.filter(block_number__gte=from_block, status__in=['completed', 'failed'])
+        recipients = list(payouts.filter(status='completed').values_list('group_id', 'recipient_id'))
+        reverted_payouts = payouts.update(status='processing', block_number=None, gas_used=None, processed_at=None)
+        if recipients:
+            GroupMembership.objects.filter(
+                reduce(or_, (Q(group_id=group_id, user_id=user_id) for group_id, user_id in recipients))
+            ).update(has_received_payout=False)
+
+        PayoutBatch.objects.filter(block_number__gte=from_block, status__in=['completed', 'failed']).update(
+            status='sent', block_number=None, gas_used=None, confirmed_at=None
+        )
+        deleted_entries, _ = Transaction.objects.filter(
+            block_number__gte=from_block, transaction_type__in=['contribution', 'payout']
+        ).delete()
+
+    logger.warning(
+        f"Reverted {reverted_contributions} contributions and {reverted_payouts} payouts "
+        f"from orphaned blocks >= {from_block}"
+    )
+    return {'contributions': reverted_contributions, 'payouts': reverted_payouts, 'transactions': deleted_entries}
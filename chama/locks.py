@@ -0,0 +1,61 @@
+import hashlib
+import logging
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import GroupLock
+
+logger = logging.getLogger(__name__)
+
+
+class GroupLockUnavailable(Exception):
+    """Raised when another worker holds the lock of a group"""
+
+
+def advisory_lock_key(group_id) -> int:
+    """Signed 64-bit key of a group's Postgres advisory lock"""
+    digest = hashlib.blake2b(f'chama.group:{group_id}'.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+@contextmanager
+def group_lock(group_id):
+    """Serialize work on a group across workers, failing fast if it is taken.
+
+    The body runs in a transaction. On Postgres the lock is a transaction
+    level advisory lock (``pg_try_advisory_xact_lock``), released when the
+    transaction ends. Other databases use a ``GroupLock`` lease row that
+    expires after ``GROUP_LOCK_LEASE_SECONDS`` if its holder dies.
+
+    Raises ``GroupLockUnavailable`` without waiting when another worker
+    holds the lock.
+    """
+    if connection.vendor == 'postgresql':
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_try_advisory_xact_lock(%s)', [advisory_lock_key(group_id)])
+                acquired = cursor.fetchone()[0]
+            if not acquired:
+                raise GroupLockUnavailable(f'Group {group_id} is locked')
+            yield
+        return
+
+    owner = uuid.uuid4().hex
+    now = timezone.now()
+    GroupLock.objects.get_or_create(group_id=group_id)
+    acquired = GroupLock.objects.filter(group_id=group_id).filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+    ).update(owner=owner, locked_until=now + timedelta(seconds=settings.GROUP_LOCK_LEASE_SECONDS))
+    if not acquired:
+        raise GroupLockUnavailable(f'Group {group_id} is locked')
+    try:
+        with transaction.atomic():
+            yield
+    finally:
+        GroupLock.objects.filter(group_id=group_id, owner=owner).update(owner='', locked_until=None)
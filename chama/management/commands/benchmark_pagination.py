@@ -0,0 +1,98 @@
+import time
+import uuid
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from chama.models import ChamaGroup, Contribution
+from chama.pagination import KeysetPagination
+
+User = get_user_model()
+
+
+class RollBack(Exception):
+    """Raised to discard the seeded rows once the benchmark is done"""
+
+
+class Command(BaseCommand):
+    help = 'Compare page-number and cursor paging of a group\'s contributions at increasing depths'
+
+    ORDERING = ('-contribution_date', '-id')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000,
+                            help='Contributions to seed into one group (rolled back afterwards)')
+        parser.add_argument('--page-size', type=int, default=20,
+                            help='Rows per page')
+        parser.add_argument('--runs', type=int, default=5,
+                            help='Requests per depth; the fastest one is reported')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                group = self._seed(options['rows'])
+                self._compare(group, options['rows'], options['page_size'], options['runs'])
+                raise RollBack()
+        except RollBack:
+            pass
+
+    def _seed(self, rows):
+        suffix = uuid.uuid4().hex[:12]
+        member = User.objects.create(
+            email=f'benchmark-{suffix}@example.com', username=f'benchmark-{suffix}',
+            phone_number=f'+0{suffix}',
+        )
+        group = ChamaGroup.objects.create(name=f'Pagination benchmark {suffix}', created_by=member,
+                                          contribution_amount=Decimal('1.00'))
+        started = time.perf_counter()
+        today = timezone.now().date()
+        for start in range(0, rows, 5000):
+            Contribution.objects.bulk_create([
+                Contribution(group=group, member=member, amount=Decimal('1.00'), expected_amount=Decimal('1.00'),
+                             transaction_hash=f'0x{suffix}{index:054x}', due_date=today)
+                for index in range(start, min(start + 5000, rows))
+            ])
+        self.stdout.write(f'Seeded {rows} contributions in {time.perf_counter() - started:.1f}s')
+        return group
+
+    def _compare(self, group, rows, page_size, runs):
+        queryset = Contribution.objects.filter(group=group)
+        view = type('BenchmarkView', (), {'cursor_ordering': self.ORDERING})()
+        paginator = KeysetPagination()
+        factory = APIRequestFactory()
+
+        self.stdout.write(f'{"depth":>10} {"page number":>14} {"cursor":>14}')
+        for depth in self._depths(rows, page_size):
+            page = depth // page_size + 1
+            page_request = Request(factory.get('/', {'page': page, 'page_size': page_size}))
+            page_time = self._time(runs, lambda: KeysetPagination().paginate_queryset(queryset, page_request, view))
+
+            cursor_params = {'page_size': page_size}
+            if depth:
+                # The key of the last row of the previous page, as a client would hold it
+                key = queryset.order_by(*self.ORDERING).values_list('contribution_date', 'id')[depth - 1]
+                cursor_params['cursor'] = paginator.encode_cursor(key)
+            cursor_request = Request(factory.get('/', cursor_params))
+            cursor_time = self._time(runs, lambda: KeysetPagination().paginate_queryset(queryset, cursor_request, view))
+
+            self.stdout.write(f'{depth:>10} {page_time * 1000:>12.2f}ms {cursor_time * 1000:>12.2f}ms')
+
+    def _depths(self, rows, page_size):
+        depths = {0}
+        for fraction in (0.01, 0.1, 0.5, 0.99):
+            depths.add(int(rows * fraction) // page_size * page_size)
+        return sorted(depth for depth in depths if depth < rows)
+
+    def _time(self, runs, paginate):
+        best = None
+        for _ in range(runs):
+            started = time.perf_counter()
+            paginate()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
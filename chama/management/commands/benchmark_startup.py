@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Code run in a fresh interpreter for each startup scenario
+SCENARIOS = {
+    'wsgi': 'import chama_backend.wsgi',
+    'wsgi + urls': (
+        'import chama_backend.wsgi\n'
+        'from django.urls import get_resolver\n'
+        'get_resolver().url_patterns'
+    ),
+    'celery worker': (
+        'import django\n'
+        'django.setup()\n'
+        'from chama_backend.celery import app\n'
+        'app.loader.import_default_modules()'
+    ),
+}
+
+# Modules that should only be imported once a chain call is actually made
+HEAVY_MODULES = ('web3', 'eth_account')
+
+
+class Command(BaseCommand):
+    help = 'Measure process startup import cost with python -X importtime'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10,
+                            help='Number of slowest top-level imports to list per scenario')
+        parser.add_argument('--runs', type=int, default=3,
+                            help='Interpreter runs per scenario; the fastest one is reported')
+
+    def handle(self, *args, **options):
+        for name, code in SCENARIOS.items():
+            runs = [self._measure(code) for _ in range(options['runs'])]
+            total, modules = min(runs, key=lambda run: run[0])
+
+            heavy = [module for module in HEAVY_MODULES if module in modules]
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{name}: {total / 1000:.1f} ms'))
+            self.stdout.write(f"  heavy modules imported: {', '.join(heavy) or 'none'}")
+
+            top_level = sorted(
+                ((cumulative, module) for module, (cumulative, depth) in modules.items() if depth == 0),
+                reverse=True
+            )
+            for cumulative, module in top_level[:options['top']]:
+                self.stdout.write(f'  {cumulative / 1000:8.1f} ms  {module}')
+
+    def _measure(self, code):
+        """Run ``code`` in a fresh interpreter; return total import time (us) and per-module stats"""
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'chama_backend.settings'))
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True
+        )
+
+        total = 0
+        modules = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            total += int(self_us)
+            # Nesting depth is encoded as two spaces per level
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            modules[name.strip()] = (int(cumulative_us), depth)
+        return total, modules
@@ -0,0 +1,64 @@
+import asyncio
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from chama.testing.fake_rpc import FakeRPCNode
+from chama.web3_utils import AsyncAvalancheWeb3Helper, AvalancheWeb3Helper
+
+
+class Command(BaseCommand):
+    help = 'Compare sync and async contribution verification throughput against a local stand-in node'
+
+    GROUP_WALLET = '0x000000000000000000000000000000000000dEaD'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transactions', type=int, default=200,
+                            help='Number of contribution transactions to verify')
+        parser.add_argument('--latency', type=float, default=0.02,
+                            help='Simulated node latency per HTTP request, in seconds')
+        parser.add_argument('--concurrency', type=int, default=32,
+                            help='Maximum in-flight requests for the async client')
+
+    def handle(self, *args, **options):
+        count = options['transactions']
+        with FakeRPCNode(latency=options['latency']) as node:
+            checks = []
+            for index in range(count):
+                tx_hash = '0x' + f'{index:064x}'
+                node.add_transaction(tx_hash, self.GROUP_WALLET, 10 ** 18)
+                checks.append((tx_hash, Decimal('1'), self.GROUP_WALLET))
+
+            sync_helper = AvalancheWeb3Helper(rpc_url=node.url)
+            async_helper = AsyncAvalancheWeb3Helper(rpc_url=node.url, max_concurrency=options['concurrency'])
+
+            self._report('sync, one hash per call', node, count,
+                         lambda: [sync_helper.verify_transaction(*check) for check in checks])
+            self._report('sync, single batch', node, count,
+                         lambda: sync_helper.verify_transactions(checks))
+            self._report('async, one hash per call', node, count,
+                         lambda: asyncio.run(self._verify_concurrently(async_helper, checks)))
+            self._report('async, parallel batches', node, count,
+                         lambda: asyncio.run(self._verify_batched(async_helper, checks)))
+
+    async def _verify_concurrently(self, helper, checks):
+        try:
+            return await asyncio.gather(*(helper.verify_transaction(*check) for check in checks))
+        finally:
+            await helper.disconnect()
+
+    async def _verify_batched(self, helper, checks):
+        try:
+            return await helper.verify_transactions(checks)
+        finally:
+            await helper.disconnect()
+
+    def _report(self, label, node, count, run):
+        node.request_count = 0
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{label:<28} {elapsed:8.3f}s  {count / elapsed:10.1f} tx/s  {node.request_count:6d} HTTP requests'
+        )
@@ -0,0 +1,128 @@
+import re
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from chama.ledger import due_payouts
+from chama.models import ChamaGroup, Contribution, Payout, Transaction
+
+User = get_user_model()
+
+
+class RollBack(Exception):
+    """Raised to discard seeded rows once the plans are printed"""
+
+
+class Command(BaseCommand):
+    help = 'Print the query plan of each hot ledger query and the indexes it uses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Seed this many contributions, payouts and transactions first (rolled back afterwards)')
+        parser.add_argument('--analyze', action='store_true',
+                            help='Run the queries with EXPLAIN ANALYZE (PostgreSQL only)')
+
+    def handle(self, *args, **options):
+        if options['analyze'] and connection.vendor != 'postgresql':
+            raise CommandError('--analyze needs PostgreSQL')
+
+        try:
+            with transaction.atomic():
+                if options['seed']:
+                    self._seed(options['seed'])
+                self._explain_all(options['analyze'])
+                raise RollBack()
+        except RollBack:
+            pass
+
+    def hot_queries(self):
+        """The ledger queries run on every request or sweep, with sample parameters"""
+        today = timezone.now().date()
+        group = ChamaGroup.objects.order_by('-created_at').first()
+        user = User.objects.order_by('-date_joined').first()
+        if group is None or user is None:
+            raise CommandError('No groups or users to build queries from; use --seed')
+
+        return [
+            ('group confirmed total', Contribution.objects.filter(group=group, status='confirmed')
+             .values('group').annotate(total=Sum('amount'))),
+            ('group contributions page', Contribution.objects.filter(group=group)
+             .order_by('-contribution_date', '-id')[:20]),
+            ('member confirmed total', Contribution.objects.filter(member=user, status='confirmed')
+             .values('member').annotate(total=Sum('amount'))),
+            ('member contributions page', Contribution.objects.filter(member=user)
+             .order_by('-contribution_date', '-id')[:20]),
+            ('pending verification sweep', Contribution.objects.filter(
+                status='pending', transaction_hash__isnull=False, next_verification_at__lte=timezone.now()
+             ).order_by('next_verification_at', 'contribution_date').values('id')[:100]),
+            ('overdue pending contributions', Contribution.objects.filter(status='pending', due_date__lt=today)),
+            ('group completed rounds', Payout.objects.filter(group=group, status='completed')
+             .order_by('-processed_at')),
+            ('group payouts page', Payout.objects.filter(group=group).order_by('-scheduled_date', '-id')[:20]),
+            ('recipient completed payouts', Payout.objects.filter(recipient=user, status='completed')
+             .values('recipient').annotate(total=Sum('amount'))),
+            ('due payouts sweep', due_payouts().order_by('scheduled_date')[:20]),
+            ('user transactions page', Transaction.objects.filter(user=user).order_by('-created_at', '-id')[:20]),
+        ]
+
+    def _explain_all(self, analyze):
+        index_names = self._index_names()
+        for label, queryset in self.hot_queries():
+            plan = queryset.explain(analyze=True) if analyze else queryset.explain()
+            used = sorted(name for name in index_names if re.search(rf'\b{name}\b', plan))
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{label}: {", ".join(used) or "no ledger index"}'))
+            self.stdout.write(plan)
+            self.stdout.write('')
+
+    def _index_names(self):
+        names = set()
+        for model in (Contribution, Payout, Transaction):
+            names.update(index.name for index in model._meta.indexes)
+        return names
+
+    def _seed(self, rows):
+        """Spread rows over a few groups and members so selectivity resembles production"""
+        suffix = uuid.uuid4().hex[:8]
+        members = [
+            User.objects.create(email=f'explain-{suffix}-{index}@example.com', username=f'explain-{suffix}-{index}',
+                                phone_number=f'+0{suffix}{index:03d}')
+            for index in range(20)
+        ]
+        groups = [
+            ChamaGroup.objects.create(name=f'Explain {suffix} {index}', created_by=members[index],
+                                      contribution_amount=Decimal('1.00'))
+            for index in range(10)
+        ]
+        today = timezone.now().date()
+        statuses = ['confirmed'] * 18 + ['pending', 'failed']
+        for start in range(0, rows, 5000):
+            batch = range(start, min(start + 5000, rows))
+            Contribution.objects.bulk_create([
+                Contribution(group=groups[index % len(groups)], member=members[index % len(members)],
+                             amount=Decimal('1.00'), expected_amount=Decimal('1.00'),
+                             transaction_hash=f'0x{suffix}{index:058x}', status=statuses[index % len(statuses)],
+                             due_date=today - timedelta(days=index % 60))
+                for index in batch
+            ])
+            Transaction.objects.bulk_create([
+                Transaction(group=groups[index % len(groups)], user=members[index % len(members)],
+                            transaction_type='contribution', amount=Decimal('1.00'), gas_price=25 * 10 ** 9,
+                            transaction_hash=f'0x{suffix}{index:058x}', status='confirmed')
+                for index in batch
+            ])
+        Payout.objects.bulk_create([
+            Payout(group=groups[index % len(groups)], recipient=members[index % len(members)],
+                   amount=Decimal('10.00'), round_number=index // len(groups) + 1,
+                   status='completed' if index % 10 else 'scheduled',
+                   scheduled_date=today - timedelta(days=index % 365))
+            for index in range(max(rows // 10, 1))
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.stdout.write(f'Seeded {rows} contributions and transactions, {max(rows // 10, 1)} payouts')
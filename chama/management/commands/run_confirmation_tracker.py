@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from chama.confirmations import ConfirmationTracker
+
+
+class Command(BaseCommand):
+    help = 'Follow new blocks and confirm awaited contributions and payouts as they are mined'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll', action='store_true',
+                            help='Poll for new blocks even if AVALANCHE_WS_URL is set')
+        parser.add_argument('--once', action='store_true',
+                            help='Process the current head once and exit')
+
+    def handle(self, *args, **options):
+        tracker = ConfirmationTracker()
+
+        if options['once']:
+            head = tracker.helper.get_block_number()
+            if head is None:
+                self.stderr.write(self.style.ERROR('Could not get the current block number'))
+                return
+            summary = tracker.process_head(head)
+            tracker.dispatch(summary)
+            self.stdout.write(self.style.SUCCESS(
+                f"Block {head}: {summary['confirmed']} confirmed, {summary['failed']} failed, "
+                f"{len(tracker.awaited)} still awaited"
+            ))
+            return
+
+        self.stdout.write('Following new blocks, press Ctrl+C to stop')
+        try:
+            tracker.run(poll_only=options['poll'])
+        except KeyboardInterrupt:
+            pass
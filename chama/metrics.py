@@ -0,0 +1,53 @@
+import logging
+from typing import Dict, Iterable, Optional
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'chama:metrics:'
+
+# Every counter exposed by the metrics endpoint
+COUNTERS = (
+    'receipt_cache.memory_hits',
+    'receipt_cache.db_hits',
+    'receipt_cache.misses',
+    'receipt_cache.stores',
+    'gas_oracle.hits',
+    'gas_oracle.refreshes',
+    'balance_cache.hits',
+    'balance_cache.misses',
+    'reminders.queued',
+    'round_checks.scheduled',
+    'round_checks.coalesced',
+    'round_checks.evaluated',
+    'verifications.coalesced',
+    'verifications.bulk_tasks',
+    'verifications.contributions',
+    'contribution_intake.duplicates',
+    'contribution_intake.filter_skips',
+)
+
+
+def incr(name: str, delta: int = 1) -> None:
+    """Increment a shared counter; counters never expire"""
+    if not delta:
+        return
+    key = KEY_PREFIX + name
+    try:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key, delta)
+    except Exception as e:
+        # Metrics must never break the code path being measured
+        logger.warning(f"Could not increment counter {name}: {e}")
+
+
+def get_counters(names: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """Read the current value of counters (all known counters by default)"""
+    names = list(names or COUNTERS)
+    values = cache.get_many([KEY_PREFIX + name for name in names])
+    return {name: values.get(KEY_PREFIX + name, 0) for name in names}
+
+
+def reset_counters(names: Optional[Iterable[str]] = None) -> None:
+    cache.delete_many([KEY_PREFIX + name for name in (names or COUNTERS)])
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-16 22:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chama', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChainCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_block', models.PositiveBigIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Chain Checkpoint',
+                'verbose_name_plural': 'Chain Checkpoints',
+                'db_table': 'chain_checkpoints',
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-16 22:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chama', '0003_chaincheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountNonce',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('address', models.CharField(max_length=42, unique=True)),
+                ('next_nonce', models.PositiveBigIntegerField()),
+                ('released_nonces', models.JSONField(blank=True, default=list, help_text='Reserved nonces that were never broadcast')),
+                ('synced_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Account Nonce',
+                'verbose_name_plural': 'Account Nonces',
+                'db_table': 'account_nonces',
+            },
+        ),
+    ]
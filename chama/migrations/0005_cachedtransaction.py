@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-16 22:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chama', '0004_accountnonce'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CachedTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transaction_hash', models.CharField(max_length=66, unique=True)),
+                ('block_number', models.PositiveBigIntegerField()),
+                ('transaction', models.JSONField()),
+                ('receipt', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Cached Transaction',
+                'verbose_name_plural': 'Cached Transactions',
+                'db_table': 'cached_transactions',
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.1 on 2026-10-16 22:43
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chama', '0005_cachedtransaction'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayoutBatch',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('contract_address', models.CharField(max_length=42)),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('recipient_count', models.PositiveIntegerField()),
+                ('transaction_hash', models.CharField(blank=True, max_length=66, null=True, unique=True)),
+                ('block_number', models.PositiveIntegerField(blank=True, null=True)),
+                ('gas_used', models.PositiveIntegerField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('confirmed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Payout Batch',
+                'verbose_name_plural': 'Payout Batches',
+                'db_table': 'payout_batches',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='batch_index',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='payout',
+            name='transaction_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=66, null=True),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='transaction_hash',
+            field=models.CharField(db_index=True, max_length=66),
+        ),
+        migrations.AddConstraint(
+            model_name='transaction',
+            constraint=models.UniqueConstraint(fields=('transaction_hash', 'batch_index'), name='unique_transaction_transfer'),
+        ),
+        migrations.AddField(
+            model_name='payout',
+            name='batch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payouts', to='chama.payoutbatch'),
+        ),
+    ]
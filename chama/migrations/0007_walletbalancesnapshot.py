@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-16 22:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chama', '0006_payoutbatch'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WalletBalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('address', models.CharField(max_length=42)),
+                ('owner_type', models.CharField(choices=[('user', 'User'), ('group', 'Group')], max_length=10)),
+                ('balance', models.DecimalField(decimal_places=18, max_digits=36)),
+                ('block_number', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('taken_at', models.DateTimeField(db_index=True)),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='balance_snapshots', to='chama.chamagroup')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='balance_snapshots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Wallet Balance Snapshot',
+                'verbose_name_plural': 'Wallet Balance Snapshots',
+                'db_table': 'wallet_balance_snapshots',
+                'ordering': ['-taken_at'],
+                'indexes': [models.Index(fields=['address', '-taken_at'], name='balance_snapshot_address_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-16 22:50
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chama', '0007_walletbalancesnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingTransaction',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('from_address', models.CharField(max_length=42)),
+                ('nonce', models.PositiveBigIntegerField()),
+                ('to_address', models.CharField(max_length=42)),
+                ('value', models.DecimalField(decimal_places=0, max_digits=40)),
+                ('data', models.TextField(blank=True)),
+                ('gas', models.PositiveBigIntegerField()),
+                ('max_fee_per_gas', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('max_priority_fee_per_gas', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('gas_price', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('transaction_hash', models.CharField(max_length=66, unique=True)),
+                ('replaced_hashes', models.JSONField(blank=True, default=list)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('mined', 'Mined'), ('dropped', 'Dropped')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=1)),
+                ('broadcast_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('mined_at', models.DateTimeField(blank=True, null=True)),
+                ('batch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outgoing_transactions', to='chama.payoutbatch')),
+                ('payout', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outgoing_transactions', to='chama.payout')),
+            ],
+            options={
+                'verbose_name': 'Outgoing Transaction',
+                'verbose_name_plural': 'Outgoing Transactions',
+                'db_table': 'outgoing_transactions',
+                'ordering': ['from_address', 'nonce'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('from_address', 'nonce'), name='unique_pending_nonce')],
+            },
+        ),
+    ]
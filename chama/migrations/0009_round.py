@@ -0,0 +1,70 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:00
+
+import django.db.models.deletion
+import uuid
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chama', '0008_outgoingtransaction'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Round',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('number', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('open', 'Open'), ('completed', 'Completed')], default='open', max_length=20)),
+                ('expected_members', models.PositiveIntegerField(default=0)),
+                ('contributed_count', models.PositiveIntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('started_at', models.DateTimeField()),
+                ('ended_at', models.DateTimeField(blank=True, null=True)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rounds', to='chama.chamagroup')),
+                ('payout', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='round', to='chama.payout')),
+            ],
+            options={
+                'verbose_name': 'Round',
+                'verbose_name_plural': 'Rounds',
+                'db_table': 'rounds',
+                'ordering': ['group', '-number'],
+            },
+        ),
+        migrations.AddField(
+            model_name='contribution',
+            name='round',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='contributions', to='chama.round'),
+        ),
+        migrations.CreateModel(
+            name='RoundContributor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('contributed_at', models.DateTimeField()),
+                ('round', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contributors', to='chama.round')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='round_contributions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Round Contributor',
+                'verbose_name_plural': 'Round Contributors',
+                'db_table': 'round_contributors',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='round',
+            constraint=models.UniqueConstraint(fields=('group', 'number'), name='unique_group_round'),
+        ),
+        migrations.AddConstraint(
+            model_name='round',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'open')), fields=('group',), name='one_open_round_per_group'),
+        ),
+        migrations.AddConstraint(
+            model_name='roundcontributor',
+            constraint=models.UniqueConstraint(fields=('round', 'user'), name='unique_round_contributor'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Max, Sum
+
+
+def backfill_rounds(apps, schema_editor):
+    """Open the current round of every group from its contribution history"""
+    ChamaGroup = apps.get_model('chama', 'ChamaGroup')
+    Contribution = apps.get_model('chama', 'Contribution')
+    Payout = apps.get_model('chama', 'Payout')
+    Round = apps.get_model('chama', 'Round')
+    RoundContributor = apps.get_model('chama', 'RoundContributor')
+
+    for group in ChamaGroup.objects.all().iterator():
+        last_payout = (
+            Payout.objects.filter(group=group, status='completed', processed_at__isnull=False)
+            .order_by('-processed_at').first()
+        )
+        started_at = last_payout.processed_at if last_payout else group.created_at
+        last_number = Payout.objects.filter(group=group).aggregate(number=Max('round_number'))['number'] or 0
+
+        contributions = Contribution.objects.filter(
+            group=group, status='confirmed', contribution_date__gte=started_at
+        )
+        first_contributions = {}
+        for member_id, contributed_at in contributions.order_by('contribution_date').values_list(
+            'member_id', 'contribution_date'
+        ):
+            first_contributions.setdefault(member_id, contributed_at)
+
+        current = Round.objects.create(
+            group=group,
+            number=last_number + 1,
+            started_at=started_at,
+            expected_members=group.memberships.filter(status='active').count(),
+            contributed_count=len(first_contributions),
+            total_amount=contributions.aggregate(total=Sum('amount'))['total'] or Decimal('0.00'),
+        )
+        RoundContributor.objects.bulk_create([
+            RoundContributor(round=current, user_id=member_id, contributed_at=contributed_at)
+            for member_id, contributed_at in first_contributions.items()
+        ])
+        contributions.update(round=current)
+
+
+def remove_rounds(apps, schema_editor):
+    apps.get_model('chama', 'Round').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chama', '0009_round'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rounds, remove_rounds),
+    ]
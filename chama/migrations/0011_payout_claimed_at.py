@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chama', '0010_backfill_rounds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payout',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chama', '0012_contribution_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupLock',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='lock', serialize=False, to='chama.chamagroup')),
+                ('owner', models.CharField(blank=True, max_length=36)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Group Lock',
+                'verbose_name_plural': 'Group Locks',
+                'db_table': 'group_locks',
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chama', '0013_grouplock'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contribution',
+            index=models.Index(fields=['group', '-contribution_date', '-id'], name='contribution_group_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contribution',
+            index=models.Index(fields=['member', '-contribution_date', '-id'], name='contribution_member_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payout',
+            index=models.Index(fields=['group', '-scheduled_date', '-id'], name='payout_group_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='transaction_user_page_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chama', '0014_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contribution',
+            index=models.Index(fields=['group', 'status', 'contribution_date'], name='contribution_group_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contribution',
+            index=models.Index(fields=['member', 'status'], name='contribution_member_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contribution',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['contribution_date'], name='contribution_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contribution',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['due_date'], name='contribution_pending_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payout',
+            index=models.Index(fields=['group', 'status', 'processed_at'], name='payout_group_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payout',
+            index=models.Index(fields=['recipient', 'status'], name='payout_recipient_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payout',
+            index=models.Index(condition=models.Q(('status', 'scheduled')), fields=['scheduled_date'], name='payout_scheduled_due_idx'),
+        ),
+    ]
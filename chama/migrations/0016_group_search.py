@@ -0,0 +1,48 @@
+from django.db import migrations
+
+POSTGRES_CREATE = [
+    """
+    ALTER TABLE chama_groups ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX chama_group_search_idx ON chama_groups USING GIN (search_vector)',
+]
+POSTGRES_DROP = [
+    'DROP INDEX IF EXISTS chama_group_search_idx',
+    'ALTER TABLE chama_groups DROP COLUMN IF EXISTS search_vector',
+]
+
+SQLITE_CREATE = [
+    """
+    CREATE VIRTUAL TABLE chama_group_search USING fts5(
+        group_id UNINDEXED, name, description, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    'INSERT INTO chama_group_search (group_id, name, description) SELECT id, name, description FROM chama_groups',
+]
+SQLITE_DROP = [
+    'DROP TABLE IF EXISTS chama_group_search',
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chama', '0015_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({'postgresql': POSTGRES_CREATE, 'sqlite': SQLITE_CREATE}),
+            run_for_vendor({'postgresql': POSTGRES_DROP, 'sqlite': SQLITE_DROP}),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:32
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chama', '0016_group_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='contribution',
+            name='contribution_pending_idx',
+        ),
+        migrations.AddField(
+            model_name='contribution',
+            name='next_verification_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='contribution',
+            name='verification_attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='contribution',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['next_verification_at', 'contribution_date'], name='contribution_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chama', '0017_contribution_verification_backoff'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accountnonce',
+            name='reserved_nonces',
+            field=models.JSONField(blank=True, default=dict, help_text='Nonces handed out within the reservation lease, with when'),
+        ),
+    ]
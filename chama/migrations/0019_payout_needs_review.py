@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chama', '0018_nonce_reservations'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payout',
+            name='status',
+            field=models.CharField(choices=[('scheduled', 'Scheduled'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed'), ('needs_review', 'Needs Review')], default='scheduled', max_length=20),
+        ),
+    ]
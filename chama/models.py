@@ -1,11 +1,36 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
+from django.utils import timezone
 from decimal import Decimal
 import uuid
 
 User = get_user_model()
 
+
+class ChamaGroupQuerySet(models.QuerySet):
+    def with_group_stats(self):
+        """Annotate member and confirmed contribution counts, read by ChamaGroupSerializer"""
+        members = (
+            GroupMembership.objects.filter(group=models.OuterRef('pk'))
+            .order_by().values('group').annotate(count=models.Count('id')).values('count')
+        )
+        confirmed = (
+            Contribution.objects.filter(group=models.OuterRef('pk'), status='confirmed')
+            .order_by().values('group').annotate(count=models.Count('id')).values('count')
+        )
+        return self.select_related('created_by').annotate(
+            member_count=Coalesce(models.Subquery(members), 0),
+            confirmed_contribution_count=Coalesce(models.Subquery(confirmed), 0),
+        )
+
+
+def group_stats_prefetch(lookup: str = 'group') -> models.Prefetch:
+    """Prefetch a related group with its stats, for serializers nesting ChamaGroupSerializer"""
+    return models.Prefetch(lookup, queryset=ChamaGroup.objects.with_group_stats())
+
+
 class ChamaGroup(models.Model):
     """
     Main Chama Group model
@@ -64,6 +89,8 @@ class ChamaGroup(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_groups')
     members = models.ManyToManyField(User, through='GroupMembership', related_name='chama_groups')
     
+    objects = ChamaGroupQuerySet.as_manager()
+    
     class Meta:
         db_table = 'chama_groups'
         verbose_name = 'Chama Group'
@@ -88,6 +115,17 @@ class ChamaGroup(models.Model):
         return self.current_members_count < self.max_members and self.status == 'active'
 
 
+class GroupMembershipQuerySet(models.QuerySet):
+    def with_contribution_status(self):
+        """Annotate whether each member has contributed to their group's open round"""
+        contributed = RoundContributor.objects.filter(
+            round__group=models.OuterRef('group'),
+            round__status='open',
+            user=models.OuterRef('user'),
+        )
+        return self.annotate(contributed_this_round=models.Exists(contributed))
+
+
 class GroupMembership(models.Model):
     """
     Through model for User-ChamaGroup relationship
@@ -120,6 +158,8 @@ class GroupMembership(models.Model):
     joined_at = models.DateTimeField(auto_now_add=True)
     left_at = models.DateTimeField(null=True, blank=True)
     
+    objects = GroupMembershipQuerySet.as_manager()
+    
     class Meta:
         db_table = 'group_memberships'
         verbose_name = 'Group Membership'
@@ -158,12 +198,24 @@ class Contribution(models.Model):
     block_number = models.PositiveIntegerField(null=True, blank=True)
     gas_used = models.PositiveIntegerField(null=True, blank=True)
     
+    # Client-supplied key making resubmissions of the same contribution idempotent
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True)
+    
+    # Round the contribution counted towards, set once it is confirmed
+    round = models.ForeignKey(
+        'Round', on_delete=models.SET_NULL, related_name='contributions', null=True, blank=True
+    )
+    
     # Status and timing
     status = models.CharField(max_length=20, choices=CONTRIBUTION_STATUS, default='pending')
     contribution_date = models.DateTimeField(auto_now_add=True)
     due_date = models.DateField()
     confirmed_at = models.DateTimeField(null=True, blank=True)
     
+    # Bulk verification of a pending contribution backs off while its transaction stays unresolved
+    verification_attempts = models.PositiveIntegerField(default=0)
+    next_verification_at = models.DateTimeField(default=timezone.now)
+    
     # Metadata
     notes = models.TextField(blank=True)
     late_fee = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
@@ -173,6 +225,22 @@ class Contribution(models.Model):
         verbose_name = 'Contribution'
         verbose_name_plural = 'Contributions'
         ordering = ['-contribution_date']
+        constraints = [
+            models.UniqueConstraint(fields=['member', 'idempotency_key'], name='unique_contribution_idempotency_key'),
+        ]
+        indexes = [
+            # Keyset pagination order of the contribution lists
+            models.Index(fields=['group', '-contribution_date', '-id'], name='contribution_group_page_idx'),
+            models.Index(fields=['member', '-contribution_date', '-id'], name='contribution_member_page_idx'),
+            # Group and member totals by status
+            models.Index(fields=['group', 'status', 'contribution_date'], name='contribution_group_status_idx'),
+            models.Index(fields=['member', 'status'], name='contribution_member_status_idx'),
+            # Pending contributions are a small, hot slice: verification sweeps and overdue checks
+            models.Index(fields=['next_verification_at', 'contribution_date'], condition=models.Q(status='pending'),
+                         name='contribution_pending_idx'),
+            models.Index(fields=['due_date'], condition=models.Q(status='pending'),
+                         name='contribution_pending_due_idx'),
+        ]
         
     def __str__(self):
         return f"{self.member.email} - {self.group.name} - {self.amount} AVAX"
@@ -189,6 +257,43 @@ class Contribution(models.Model):
         return self.amount >= self.expected_amount
 
 
+class PayoutBatch(models.Model):
+    """
+    A single disperse-contract transaction paying out many Payouts at once
+    """
+    BATCH_STATUS = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    contract_address = models.CharField(max_length=42)
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2)
+    recipient_count = models.PositiveIntegerField()
+    
+    # Blockchain details
+    transaction_hash = models.CharField(max_length=66, unique=True, null=True, blank=True)
+    block_number = models.PositiveIntegerField(null=True, blank=True)
+    gas_used = models.PositiveIntegerField(null=True, blank=True)
+    
+    # Status and timing
+    status = models.CharField(max_length=20, choices=BATCH_STATUS, default='pending')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    confirmed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'payout_batches'
+        verbose_name = 'Payout Batch'
+        verbose_name_plural = 'Payout Batches'
+        ordering = ['-created_at']
+        
+    def __str__(self):
+        return f"Batch of {self.recipient_count} payouts - {self.total_amount} AVAX"
+
+
 class Payout(models.Model):
     """
     Model for tracking payouts in merry-go-round
@@ -198,6 +303,7 @@ class Payout(models.Model):
         ('processing', 'Processing'),
         ('completed', 'Completed'),
         ('failed', 'Failed'),
+        ('needs_review', 'Needs Review'),  # May have been sent; never retried automatically
     ]
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -207,8 +313,9 @@ class Payout(models.Model):
     # Financial details
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     
-    # Blockchain details
-    transaction_hash = models.CharField(max_length=66, unique=True, null=True, blank=True)
+    # Blockchain details; payouts sent in a batch share the batch transaction hash
+    batch = models.ForeignKey(PayoutBatch, on_delete=models.SET_NULL, related_name='payouts', null=True, blank=True)
+    transaction_hash = models.CharField(max_length=66, db_index=True, null=True, blank=True)
     block_number = models.PositiveIntegerField(null=True, blank=True)
     gas_used = models.PositiveIntegerField(null=True, blank=True)
     
@@ -216,6 +323,8 @@ class Payout(models.Model):
     status = models.CharField(max_length=20, choices=PAYOUT_STATUS, default='scheduled')
     scheduled_date = models.DateField()
     processed_at = models.DateTimeField(null=True, blank=True)
+    # Set while a sweeper worker is sending the payout; stale claims expire
+    claimed_at = models.DateTimeField(null=True, blank=True)
     
     # Round information
     round_number = models.PositiveIntegerField()
@@ -226,11 +335,87 @@ class Payout(models.Model):
         verbose_name_plural = 'Payouts'
         ordering = ['-scheduled_date']
         unique_together = ['group', 'round_number']
+        indexes = [
+            models.Index(fields=['group', '-scheduled_date', '-id'], name='payout_group_page_idx'),
+            models.Index(fields=['group', 'status', 'processed_at'], name='payout_group_status_idx'),
+            models.Index(fields=['recipient', 'status'], name='payout_recipient_status_idx'),
+            # Due payout sweeps
+            models.Index(fields=['scheduled_date'], condition=models.Q(status='scheduled'),
+                         name='payout_scheduled_due_idx'),
+        ]
         
     def __str__(self):
         return f"Round {self.round_number} - {self.recipient.email} - {self.amount} AVAX"
 
 
+class Round(models.Model):
+    """
+    A contribution round of a group, ending with one payout.
+    
+    Counters are maintained by the ledger as contributions are confirmed,
+    so round state is read without scanning contributions.
+    """
+    ROUND_STATUS = [
+        ('open', 'Open'),
+        ('completed', 'Completed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    group = models.ForeignKey(ChamaGroup, on_delete=models.CASCADE, related_name='rounds')
+    number = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=ROUND_STATUS, default='open')
+    
+    # Progress
+    expected_members = models.PositiveIntegerField(default=0)
+    contributed_count = models.PositiveIntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    
+    # Payout that closed the round
+    payout = models.OneToOneField(Payout, on_delete=models.SET_NULL, related_name='round', null=True, blank=True)
+    
+    # Timestamps
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'rounds'
+        verbose_name = 'Round'
+        verbose_name_plural = 'Rounds'
+        ordering = ['group', '-number']
+        constraints = [
+            models.UniqueConstraint(fields=['group', 'number'], name='unique_group_round'),
+            models.UniqueConstraint(fields=['group'], condition=models.Q(status='open'), name='one_open_round_per_group'),
+        ]
+        
+    def __str__(self):
+        return f"{self.group.name} - Round {self.number} ({self.contributed_count}/{self.expected_members})"
+    
+    @property
+    def is_complete(self):
+        """Check if every expected member has contributed"""
+        return self.expected_members > 0 and self.contributed_count >= self.expected_members
+
+
+class RoundContributor(models.Model):
+    """
+    A member who has contributed in a round
+    """
+    round = models.ForeignKey(Round, on_delete=models.CASCADE, related_name='contributors')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='round_contributions')
+    contributed_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'round_contributors'
+        verbose_name = 'Round Contributor'
+        verbose_name_plural = 'Round Contributors'
+        constraints = [
+            models.UniqueConstraint(fields=['round', 'user'], name='unique_round_contributor'),
+        ]
+        
+    def __str__(self):
+        return f"{self.user.email} - {self.round}"
+
+
 class Transaction(models.Model):
     """
     Model for tracking all blockchain transactions
@@ -249,7 +434,9 @@ class Transaction(models.Model):
     ]
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    transaction_hash = models.CharField(max_length=66, unique=True)
+    transaction_hash = models.CharField(max_length=66, db_index=True)
+    # Position of the transfer within a batch transaction (0 for single transfers)
+    batch_index = models.PositiveIntegerField(default=0)
     transaction_type = models.CharField(max_length=20, choices=TRANSACTION_TYPES)
     
     # Related objects
@@ -276,6 +463,173 @@ class Transaction(models.Model):
         verbose_name = 'Transaction'
         verbose_name_plural = 'Transactions'
         ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['transaction_hash', 'batch_index'], name='unique_transaction_transfer'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='transaction_user_page_idx'),
+        ]
         
     def __str__(self):
         return f"{self.get_transaction_type_display()} - {self.transaction_hash[:10]}..."
+
+
+class ChainCheckpoint(models.Model):
+    """
+    Last block processed by a chain indexer, so it can resume incrementally
+    """
+    name = models.CharField(max_length=50, unique=True)
+    last_block = models.PositiveBigIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'chain_checkpoints'
+        verbose_name = 'Chain Checkpoint'
+        verbose_name_plural = 'Chain Checkpoints'
+        
+    def __str__(self):
+        return f"{self.name} @ block {self.last_block}"
+
+
+class GroupLock(models.Model):
+    """
+    Lease row used to serialize work on a group on databases without
+    advisory locks
+    """
+    group = models.OneToOneField(ChamaGroup, on_delete=models.CASCADE, primary_key=True, related_name='lock')
+    owner = models.CharField(max_length=36, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'group_locks'
+        verbose_name = 'Group Lock'
+        verbose_name_plural = 'Group Locks'
+        
+    def __str__(self):
+        return f"{self.group_id} locked until {self.locked_until}" if self.locked_until else f"{self.group_id} (free)"
+
+
+class AccountNonce(models.Model):
+    """
+    Locally managed transaction nonce for a sending account, so payouts can
+    be signed and broadcast back-to-back without colliding
+    """
+    address = models.CharField(max_length=42, unique=True)
+    next_nonce = models.PositiveBigIntegerField()
+    released_nonces = models.JSONField(default=list, blank=True, help_text="Reserved nonces that were never broadcast")
+    reserved_nonces = models.JSONField(default=dict, blank=True,
+                                       help_text="Nonces handed out within the reservation lease, with when")
+    synced_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'account_nonces'
+        verbose_name = 'Account Nonce'
+        verbose_name_plural = 'Account Nonces'
+        
+    def __str__(self):
+        return f"{self.address} next nonce {self.next_nonce}"
+
+
+class CachedTransaction(models.Model):
+    """
+    Finalized transaction and receipt fetched from the chain, kept so they
+    never have to be requested from the node again
+    """
+    transaction_hash = models.CharField(max_length=66, unique=True)
+    block_number = models.PositiveBigIntegerField()
+    transaction = models.JSONField()
+    receipt = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'cached_transactions'
+        verbose_name = 'Cached Transaction'
+        verbose_name_plural = 'Cached Transactions'
+        
+    def __str__(self):
+        return f"{self.transaction_hash[:10]}... @ block {self.block_number}"
+
+
+class WalletBalanceSnapshot(models.Model):
+    """
+    Balance of a member or group wallet, recorded periodically so balances
+    can be shown without querying the chain
+    """
+    OWNER_TYPES = [
+        ('user', 'User'),
+        ('group', 'Group'),
+    ]
+    
+    address = models.CharField(max_length=42)
+    owner_type = models.CharField(max_length=10, choices=OWNER_TYPES)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='balance_snapshots', null=True, blank=True)
+    group = models.ForeignKey(ChamaGroup, on_delete=models.CASCADE, related_name='balance_snapshots', null=True, blank=True)
+    balance = models.DecimalField(max_digits=36, decimal_places=18)
+    block_number = models.PositiveBigIntegerField(null=True, blank=True)
+    taken_at = models.DateTimeField(db_index=True)
+    
+    class Meta:
+        db_table = 'wallet_balance_snapshots'
+        verbose_name = 'Wallet Balance Snapshot'
+        verbose_name_plural = 'Wallet Balance Snapshots'
+        ordering = ['-taken_at']
+        indexes = [
+            models.Index(fields=['address', '-taken_at'], name='balance_snapshot_address_idx'),
+        ]
+        
+    def __str__(self):
+        return f"{self.address} - {self.balance} AVAX @ {self.taken_at}"
+
+
+class OutgoingTransaction(models.Model):
+    """
+    A transaction broadcast from one of our accounts, tracked by nonce until
+    it is mined so it can be re-broadcast with a higher fee when it gets stuck
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('mined', 'Mined'),
+        ('dropped', 'Dropped'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    from_address = models.CharField(max_length=42)
+    nonce = models.PositiveBigIntegerField()
+    
+    # Signed fields, kept so the transaction can be re-signed with a higher fee
+    to_address = models.CharField(max_length=42)
+    value = models.DecimalField(max_digits=40, decimal_places=0)  # In wei
+    data = models.TextField(blank=True)
+    gas = models.PositiveBigIntegerField()
+    max_fee_per_gas = models.PositiveBigIntegerField(null=True, blank=True)
+    max_priority_fee_per_gas = models.PositiveBigIntegerField(null=True, blank=True)
+    gas_price = models.PositiveBigIntegerField(null=True, blank=True)  # Legacy transactions only
+    
+    # Latest broadcast hash, and the hashes it replaced
+    transaction_hash = models.CharField(max_length=66, unique=True)
+    replaced_hashes = models.JSONField(default=list, blank=True)
+    
+    # What the transaction pays for
+    payout = models.ForeignKey(Payout, on_delete=models.SET_NULL, related_name='outgoing_transactions', null=True, blank=True)
+    batch = models.ForeignKey(PayoutBatch, on_delete=models.SET_NULL, related_name='outgoing_transactions', null=True, blank=True)
+    
+    # Status and timing
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=1)
+    broadcast_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    mined_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'outgoing_transactions'
+        verbose_name = 'Outgoing Transaction'
+        verbose_name_plural = 'Outgoing Transactions'
+        ordering = ['from_address', 'nonce']
+        constraints = [
+            models.UniqueConstraint(fields=['from_address', 'nonce'], condition=models.Q(status='pending'),
+                                    name='unique_pending_nonce'),
+        ]
+        
+    def __str__(self):
+        return f"{self.from_address} nonce {self.nonce} - {self.status}"
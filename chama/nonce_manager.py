@@ -0,0 +1,166 @@
+import logging
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Callable, Iterator
+
+import requests
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import AccountNonce
+
+logger = logging.getLogger(__name__)
+
+# Fragments of node error messages that mean our local nonce is out of sync
+NONCE_ERROR_MARKERS = ('nonce too low', 'nonce too high', 'already known', 'replacement transaction underpriced',
+                       'invalid nonce')
+
+
+def is_nonce_error(exc: BaseException) -> bool:
+    """Check whether an RPC error was caused by a stale nonce"""
+    message = str(exc).lower()
+    return any(marker in message for marker in NONCE_ERROR_MARKERS)
+
+
+def is_ambiguous_error(exc: BaseException) -> bool:
+    """Check whether a send failed without telling us if the node accepted the transaction.
+
+    Transport failures (timeouts, dropped connections, HTTP errors) may come
+    after the node took the transaction; an error answer from the node, or a
+    failure before anything was sent, proves it was not.
+    """
+    return isinstance(exc, (requests.RequestException, OSError))
+
+
+class NonceManager:
+    """
+    Hands out transaction nonces for sending accounts from a locked DB row.
+
+    Concurrent senders (e.g. several payout sweepers) each get a
+    distinct nonce without asking the node, so transactions can be broadcast
+    back-to-back. A nonce stays reserved for ``NONCE_RESERVATION_LEASE_SECONDS``
+    after it is handed out. Nonces of transactions the node rejected are
+    released and reused first; after an ambiguous failure the nonce is kept,
+    since it may have been broadcast. The counter is reconciled with the
+    node's pending transaction count every ``NONCE_RESYNC_INTERVAL_SECONDS``
+    and whenever the node rejects a nonce; a nonce the node still lacks once
+    no reservation covers it is a gap, and is reused so later transactions
+    are not stuck behind it.
+    """
+
+    def __init__(self, fetch_chain_nonce: Callable[[str], int]):
+        # Returns the account's pending transaction count from the node
+        self.fetch_chain_nonce = fetch_chain_nonce
+
+    @contextmanager
+    def reserve(self, address: str) -> Iterator[int]:
+        """Reserve the next nonce for ``address`` for the duration of the block.
+
+        If the block raises, the nonce is released for reuse only when the
+        transaction was provably not accepted. A rejected nonce resyncs the
+        account instead.
+        """
+        nonce = self.acquire(address)
+        try:
+            yield nonce
+        except Exception as exc:
+            if is_nonce_error(exc):
+                logger.warning(f"Nonce {nonce} rejected for {address}, resyncing: {exc}")
+                self.resync(address)
+            elif is_ambiguous_error(exc):
+                # Left reserved: if it never reached the node, the gap check reclaims it once the lease lapses
+                logger.warning(f"Unknown whether nonce {nonce} of {address} was broadcast, keeping it reserved: {exc}")
+            else:
+                self.release(address, nonce)
+            raise
+
+    def acquire(self, address: str) -> int:
+        """Atomically take the lowest available nonce for ``address``"""
+        address = address.lower()
+        with transaction.atomic():
+            account = self._lock(address)
+            now = timezone.now()
+            self._expire_reservations(account, now)
+            stale_before = now - timedelta(seconds=settings.NONCE_RESYNC_INTERVAL_SECONDS)
+            if account.synced_at < stale_before:
+                self._sync(account, self.fetch_chain_nonce(address))
+
+            if account.released_nonces:
+                nonce = min(account.released_nonces)
+                account.released_nonces.remove(nonce)
+            else:
+                nonce = account.next_nonce
+                account.next_nonce += 1
+            account.reserved_nonces[str(nonce)] = now.isoformat()
+            account.save()
+        return nonce
+
+    def release(self, address: str, nonce: int) -> None:
+        """Return a reserved nonce whose transaction was never broadcast"""
+        address = address.lower()
+        with transaction.atomic():
+            account = self._lock(address)
+            account.reserved_nonces.pop(str(nonce), None)
+            if nonce >= account.next_nonce or nonce in account.released_nonces:
+                account.save()
+                return
+            if nonce == account.next_nonce - 1:
+                account.next_nonce = nonce
+            else:
+                account.released_nonces.append(nonce)
+            # Collapse released nonces sitting at the top of the range
+            while account.next_nonce - 1 in account.released_nonces:
+                account.released_nonces.remove(account.next_nonce - 1)
+                account.next_nonce -= 1
+            account.save()
+
+    def resync(self, address: str) -> int:
+        """Reconcile the local counter with the node's pending transaction count.
+
+        The count is read under the account's row lock, so no nonce is handed
+        out meanwhile, and the counter only moves back when no reservation is
+        in flight.
+        """
+        address = address.lower()
+        with transaction.atomic():
+            account = self._lock(address)
+            self._expire_reservations(account, timezone.now())
+            self._sync(account, self.fetch_chain_nonce(address))
+            account.save()
+        logger.info(f"Resynced nonce for {address}: next {account.next_nonce}, reusing {account.released_nonces}")
+        return account.next_nonce
+
+    def _lock(self, address: str) -> AccountNonce:
+        # Touch the row first: the UPDATE takes the row lock on every backend,
+        # including SQLite where SELECT ... FOR UPDATE is a no-op.
+        if not AccountNonce.objects.filter(address=address).update(updated_at=timezone.now()):
+            chain_nonce = self.fetch_chain_nonce(address)
+            try:
+                with transaction.atomic():
+                    AccountNonce.objects.create(address=address, next_nonce=chain_nonce, synced_at=timezone.now())
+            except IntegrityError:
+                # Created concurrently by another worker
+                pass
+        return AccountNonce.objects.select_for_update().get(address=address)
+
+    def _expire_reservations(self, account: AccountNonce, now) -> None:
+        lease_start = (now - timedelta(seconds=settings.NONCE_RESERVATION_LEASE_SECONDS)).isoformat()
+        account.reserved_nonces = {
+            nonce: reserved_at for nonce, reserved_at in account.reserved_nonces.items() if reserved_at > lease_start
+        }
+
+    def _sync(self, account: AccountNonce, chain_nonce: int) -> None:
+        # Nonces below the chain's count are used up, whether by us or by
+        # transactions sent from the account elsewhere
+        account.released_nonces = [nonce for nonce in account.released_nonces if nonce >= chain_nonce]
+        if chain_nonce >= account.next_nonce or not account.reserved_nonces:
+            # Nothing is in flight, so whatever the node lacks was never accepted
+            # (a crash between reserving and broadcasting, or a dropped transaction)
+            account.next_nonce = chain_nonce
+            account.released_nonces = []
+        elif str(chain_nonce) not in account.reserved_nonces and chain_nonce not in account.released_nonces:
+            # The node lacks a nonce no reservation covers: fill the gap first
+            logger.warning(f"Nonce gap at {chain_nonce} for {account.address}, reusing it")
+            account.released_nonces.append(chain_nonce)
+        account.synced_at = timezone.now()
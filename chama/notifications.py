@@ -0,0 +1,49 @@
+from typing import Dict, Iterable, List
+
+from users.models import EmailOutbox
+from users.outbox import queue_emails
+
+from .models import Payout
+
+
+def payout_scheduled_email(payout: Payout) -> Dict[str, str]:
+    return {
+        'to_email': payout.recipient.email,
+        'subject': f'Chama Payout Scheduled - {payout.group.name}',
+        'body': (
+            f'Hello {payout.recipient.first_name},\n\n'
+            f'Your payout from "{payout.group.name}" has been scheduled.\n\n'
+            f'Amount: {payout.amount} AVAX\n'
+            f'Scheduled Date: {payout.scheduled_date}\n\n'
+            'You will receive another notification once the payout is completed.\n\n'
+            'Best regards,\n'
+            'Chama Platform Team\n'
+        ),
+    }
+
+
+def payout_completed_email(payout: Payout) -> Dict[str, str]:
+    return {
+        'to_email': payout.recipient.email,
+        'subject': f'Chama Payout Completed - {payout.group.name}',
+        'body': (
+            f'Hello {payout.recipient.first_name},\n\n'
+            f'Your payout from "{payout.group.name}" has been completed successfully!\n\n'
+            f'Amount: {payout.amount} AVAX\n'
+            f'Transaction Hash: {payout.transaction_hash}\n'
+            f'Completed On: {payout.processed_at}\n\n'
+            'You can view the transaction on the Avalanche explorer.\n\n'
+            'Best regards,\n'
+            'Chama Platform Team\n'
+        ),
+    }
+
+
+def queue_payout_scheduled_emails(payouts: Iterable[Payout]) -> List[EmailOutbox]:
+    """Queue scheduled payout emails in the caller's transaction"""
+    return queue_emails(payout_scheduled_email(payout) for payout in payouts if payout.recipient.email)
+
+
+def queue_payout_completed_emails(payouts: Iterable[Payout]) -> List[EmailOutbox]:
+    """Queue completed payout emails in the caller's transaction"""
+    return queue_emails(payout_completed_email(payout) for payout in payouts if payout.recipient.email)
@@ -0,0 +1,137 @@
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on a (timestamp, id) key.
+
+    Pages are read with ``WHERE (timestamp, id) < (last timestamp, last id)``
+    instead of an ``OFFSET``, and no ``COUNT(*)`` is run, so every page costs
+    the same however deep it is. Views set ``cursor_ordering`` to the
+    descending key, e.g. ``('-contribution_date', '-id')``; the last field
+    must be unique. Cursors are opaque and carry the key of the row they
+    continue from.
+
+    Sending ``?page=`` instead of ``?cursor=`` switches the request to the
+    page-number pagination used by the rest of the API, with its counts.
+    """
+
+    cursor_query_param = 'cursor'
+    page_query_param = 'page'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request) -> int:
+        default = self.page_size
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, default))
+        except ValueError:
+            return default
+        return min(max(size, 1), self.max_page_size)
+
+    def get_ordering(self, view) -> Tuple[str, ...]:
+        return tuple(getattr(view, 'cursor_ordering', self.ordering))
+
+    def paginate_queryset(self, queryset, request, view=None) -> Optional[List[Any]]:
+        self.request = request
+        self.fields = [field.lstrip('-') for field in self.get_ordering(view)]
+        self.descending = self.get_ordering(view)[0].startswith('-')
+        self.page_mode = self.page_query_param in request.query_params
+        queryset = queryset.order_by(*self.get_ordering(view))
+
+        if self.page_mode:
+            self.page_paginator = PageNumberPagination()
+            self.page_paginator.page_size = self.get_page_size(request)
+            self.page_paginator.page_size_query_param = self.page_size_query_param
+            self.page_paginator.max_page_size = self.max_page_size
+            return self.page_paginator.paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        encoded = request.query_params.get(self.cursor_query_param)
+        self.reverse = False
+        if encoded:
+            self.reverse, key = self.decode_cursor(encoded, queryset.model)
+            # Previous pages are read towards the start of the list, then flipped
+            queryset = queryset.filter(self.key_filter(key, smaller=self.descending != self.reverse))
+            if self.reverse:
+                queryset = queryset.reverse()
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if self.reverse:
+            rows.reverse()
+
+        self.next_key = self.previous_key = None
+        if rows:
+            if has_more or self.reverse:
+                self.next_key = self.row_key(rows[-1])
+            if encoded and (has_more or not self.reverse):
+                self.previous_key = self.row_key(rows[0])
+        return rows
+
+    def key_filter(self, key: Sequence[Any], smaller: bool) -> Q:
+        """Rows with a key below (or above) ``key``: (a, b) < (x, y) is a < x OR (a = x AND b < y)"""
+        lookup = 'lt' if smaller else 'gt'
+        condition = Q()
+        for index in reversed(range(len(self.fields))):
+            equal = {field: value for field, value in zip(self.fields[:index], key[:index])}
+            condition |= Q(**equal, **{f'{self.fields[index]}__{lookup}': key[index]})
+        # The redundant bound on the leading field lets the database seek the index to the cursor
+        return Q(**{f'{self.fields[0]}__{lookup}e': key[0]}) & condition
+
+    def row_key(self, row) -> List[Any]:
+        return [getattr(row, field) for field in self.fields]
+
+    def encode_cursor(self, key: Sequence[Any], reverse: bool = False) -> str:
+        payload = json.dumps({'k': [str(value) for value in key], 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, encoded: str, model) -> Tuple[bool, List[Any]]:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            values = payload['k']
+            if len(values) != len(self.fields):
+                raise ValueError(encoded)
+            key = [model._meta.get_field(field).to_python(value) for field, value in zip(self.fields, values)]
+            return bool(payload.get('r')), key
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def cursor_url(self, key, reverse: bool) -> Optional[str]:
+        if key is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(key, reverse))
+
+    def get_paginated_response(self, data) -> Response:
+        if self.page_mode:
+            return self.page_paginator.get_paginated_response(data)
+        return Response({
+            'next': self.cursor_url(self.next_key, reverse=False),
+            'previous': self.cursor_url(self.previous_key, reverse=True),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
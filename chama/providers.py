@@ -0,0 +1,34 @@
+import logging
+from typing import Any, List, Tuple
+
+from web3._utils.batching import sort_batch_response_by_response_ids
+from web3.providers.base import JSONBaseProvider
+
+from .rpc_pool import IDEMPOTENT_METHODS, RPCPool
+
+logger = logging.getLogger(__name__)
+
+
+class PooledHTTPProvider(JSONBaseProvider):
+    """Web3 provider that sends every request through an ``RPCPool``"""
+
+    def __init__(self, pool: RPCPool, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.pool = pool
+
+    def __str__(self):
+        return f"Pooled RPC connection {[endpoint.url for endpoint in self.pool.endpoints]}"
+
+    def make_request(self, method, params):
+        raw_response = self.pool.request(self.encode_rpc_request(method, params),
+                                         idempotent=method in IDEMPOTENT_METHODS)
+        return self.decode_rpc_response(raw_response)
+
+    def make_batch_request(self, batch_requests: List[Tuple[str, Any]]):
+        idempotent = all(method in IDEMPOTENT_METHODS for method, _ in batch_requests)
+        raw_response = self.pool.request(self.encode_batch_rpc_request(batch_requests), idempotent=idempotent)
+        response = self.decode_rpc_response(raw_response)
+        if not isinstance(response, list):
+            # RPC errors return only one response with the error object
+            return response
+        return sort_batch_response_by_response_ids(response)
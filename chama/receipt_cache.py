@@ -0,0 +1,98 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable
+
+from django.conf import settings
+
+from . import metrics
+from .models import CachedTransaction
+
+logger = logging.getLogger(__name__)
+
+
+class ReceiptCache:
+    """
+    Two-level cache of finalized transactions and receipts, keyed by tx hash.
+
+    Lookups go to an in-process LRU first and then to the ``CachedTransaction``
+    table. Only results buried at least ``RECEIPT_CACHE_CONFIRMATIONS`` blocks
+    deep are stored, since those can no longer change. Hits and misses are
+    counted in the shared ``receipt_cache.*`` metrics.
+    """
+
+    def __init__(self, max_size: int = None):
+        self.max_size = max_size or settings.RECEIPT_CACHE_MEMORY_SIZE
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, tx_hashes: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Return cached ``{'transaction', 'receipt'}`` entries for the given hashes"""
+        found = {}
+        missing = []
+        with self._lock:
+            for tx_hash in tx_hashes:
+                entry = self._entries.get(tx_hash.lower())
+                if entry is None:
+                    missing.append(tx_hash)
+                else:
+                    self._entries.move_to_end(tx_hash.lower())
+                    found[tx_hash] = entry
+        memory_hits = len(found)
+
+        if missing:
+            by_key = {tx_hash.lower(): tx_hash for tx_hash in missing}
+            stored = CachedTransaction.objects.filter(transaction_hash__in=by_key.keys())
+            for cached in stored.only('transaction_hash', 'transaction', 'receipt'):
+                entry = {'transaction': cached.transaction, 'receipt': cached.receipt}
+                found[by_key[cached.transaction_hash]] = entry
+                self._remember(cached.transaction_hash, entry)
+
+        metrics.incr('receipt_cache.memory_hits', memory_hits)
+        metrics.incr('receipt_cache.db_hits', len(found) - memory_hits)
+        metrics.incr('receipt_cache.misses', len(missing) - (len(found) - memory_hits))
+        return found
+
+    def store_many(self, entries: Dict[str, Dict[str, Any]], head_block: int) -> int:
+        """Persist entries whose receipt is final relative to ``head_block``"""
+        final_block = head_block - settings.RECEIPT_CACHE_CONFIRMATIONS
+        rows = []
+        for tx_hash, entry in entries.items():
+            receipt = entry.get('receipt')
+            if entry.get('error') or not entry.get('transaction') or not receipt:
+                continue
+            if receipt.get('blockNumber') is None or receipt['blockNumber'] > final_block:
+                continue
+            cached = {'transaction': entry['transaction'], 'receipt': receipt}
+            self._remember(tx_hash, cached)
+            rows.append(CachedTransaction(
+                transaction_hash=tx_hash.lower(),
+                block_number=receipt['blockNumber'],
+                transaction=entry['transaction'],
+                receipt=receipt,
+            ))
+
+        if rows:
+            CachedTransaction.objects.bulk_create(rows, ignore_conflicts=True)
+            metrics.incr('receipt_cache.stores', len(rows))
+        return len(rows)
+
+    def clear(self) -> None:
+        """Forget the in-process entries (the DB level is left untouched)"""
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, tx_hash: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[tx_hash.lower()] = entry
+            self._entries.move_to_end(tx_hash.lower())
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+def receipt_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters, plus the number of RPC calls the hits saved"""
+    stats = metrics.get_counters(name for name in metrics.COUNTERS if name.startswith('receipt_cache.'))
+    # Every hit replaces an eth_getTransactionByHash and an eth_getTransactionReceipt call
+    stats['rpc_calls_saved'] = 2 * (stats['receipt_cache.memory_hits'] + stats['receipt_cache.db_hits'])
+    return stats
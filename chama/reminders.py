@@ -0,0 +1,76 @@
+import logging
+from typing import Dict, Iterator, List
+
+from django.conf import settings
+from django.db import transaction
+
+from users.outbox import queue_emails
+
+from . import metrics
+from .models import GroupMembership
+
+logger = logging.getLogger(__name__)
+
+
+def owing_memberships():
+    """Active memberships with no contribution in their group's open round"""
+    return (
+        GroupMembership.objects
+        .filter(status='active', group__status='active', user__is_active=True)
+        .exclude(user__email='')
+        .with_contribution_status()
+        .filter(contributed_this_round=False)
+        .select_related('user', 'group')
+        .only('id', 'user__email', 'user__first_name', 'group__name', 'group__contribution_amount')
+    )
+
+
+def iter_owing_batches(batch_size: int) -> Iterator[List[GroupMembership]]:
+    """Yield owing memberships in batches, using keyset pagination on the primary key"""
+    queryset = owing_memberships().order_by('id')
+    last_id = None
+    while True:
+        page = queryset if last_id is None else queryset.filter(id__gt=last_id)
+        batch = list(page[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].id
+
+
+def build_reminder(membership: GroupMembership) -> Dict[str, str]:
+    user, group = membership.user, membership.group
+    return {
+        'to_email': user.email,
+        'subject': f'Contribution Reminder - {group.name}',
+        'body': (
+            f'Hello {user.first_name},\n\n'
+            f'This is a friendly reminder that your contribution to "{group.name}" is due.\n\n'
+            f'Contribution Amount: {group.contribution_amount} AVAX\n\n'
+            'Please make your contribution to keep the group active.\n\n'
+            'Best regards,\n'
+            'Chama Platform Team\n'
+        ),
+    }
+
+
+def send_contribution_reminders(batch_size: int = None) -> Dict[str, int]:
+    """Queue a reminder for every member still owing for the current round.
+
+    Members are streamed in batches of ``REMINDER_BATCH_SIZE`` and each batch
+    is written to the email outbox with one insert; the outbox worker
+    delivers them over pooled SMTP connections.
+    """
+    batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+    summary = {'batches': 0, 'queued': 0}
+
+    for batch in iter_owing_batches(batch_size):
+        with transaction.atomic():
+            queued = len(queue_emails(build_reminder(membership) for membership in batch))
+
+        summary['batches'] += 1
+        summary['queued'] += queued
+        metrics.incr('reminders.queued', queued)
+        logger.info(f"Reminder batch {summary['batches']}: {queued} queued")
+
+    return summary
@@ -0,0 +1,46 @@
+import logging
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY_PREFIX = 'chama:round_check:pending:'
+
+
+def pending_key(group_id) -> str:
+    return f'{PENDING_KEY_PREFIX}{group_id}'
+
+
+def request_round_check(group_id) -> bool:
+    """Schedule a round completion check for a group, coalescing repeated requests.
+
+    The first request sets a pending marker and schedules the check
+    ``ROUND_CHECK_DELAY_SECONDS`` later; requests arriving while the marker
+    is set are folded into that check. Returns whether a check was scheduled.
+    """
+    from .tasks import check_round_completion
+
+    # The marker outlives the delay so a lost task cannot block checks for good
+    timeout = settings.ROUND_CHECK_DELAY_SECONDS + settings.ROUND_CHECK_MARKER_GRACE_SECONDS
+    if not cache.add(pending_key(group_id), 1, timeout=timeout):
+        metrics.incr('round_checks.coalesced')
+        return False
+
+    check_round_completion.apply_async(args=[str(group_id)], countdown=settings.ROUND_CHECK_DELAY_SECONDS)
+    metrics.incr('round_checks.scheduled')
+    return True
+
+
+def request_round_checks(group_ids: Iterable) -> int:
+    """Request a check for every group; returns the number of checks scheduled"""
+    return sum(request_round_check(group_id) for group_id in set(group_ids))
+
+
+def clear_pending(group_id) -> None:
+    """Called when a check starts, so later contributions trigger a new one"""
+    cache.delete(pending_key(group_id))
+    metrics.incr('round_checks.evaluated')
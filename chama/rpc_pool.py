@@ -0,0 +1,204 @@
+import json
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Read-only calls that are safe to send to several nodes at once
+IDEMPOTENT_METHODS = frozenset({
+    'web3_clientVersion', 'net_version', 'eth_chainId', 'eth_blockNumber', 'eth_gasPrice',
+    'eth_feeHistory', 'eth_maxPriorityFeePerGas', 'eth_getBalance', 'eth_getTransactionCount',
+    'eth_getTransactionByHash', 'eth_getTransactionReceipt', 'eth_getBlockByNumber',
+    'eth_getBlockByHash', 'eth_getLogs', 'eth_call', 'eth_estimateGas',
+})
+
+
+class NoHealthyEndpointError(ConnectionError):
+    """Raised when every RPC endpoint failed to answer a request"""
+
+
+class RPCEndpoint:
+    """A single JSON-RPC node with its own keep-alive session and health state"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.RPC_POOL_MAXSIZE)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Content-Type'] = 'application/json'
+
+        # Exponentially weighted moving average of response time, in seconds
+        self.latency: Optional[float] = None
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self.block_number: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'<RPCEndpoint {self.url} latency={self.latency} failures={self.consecutive_failures}>'
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    def post(self, data: bytes, timeout: float) -> bytes:
+        started = time.monotonic()
+        try:
+            response = self.session.post(self.url, data=data, timeout=timeout)
+            response.raise_for_status()
+        except requests.RequestException:
+            self.record_failure()
+            raise
+        self.record_success(time.monotonic() - started)
+        return response.content
+
+    def record_success(self, latency: float) -> None:
+        alpha = settings.RPC_EWMA_ALPHA
+        with self._lock:
+            self.latency = latency if self.latency is None else alpha * latency + (1 - alpha) * self.latency
+            self.consecutive_failures = 0
+            self.unhealthy_until = 0.0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            excess = self.consecutive_failures - settings.RPC_FAILURE_THRESHOLD
+            if excess >= 0:
+                # Back off exponentially while the node keeps failing
+                cooldown = min(settings.RPC_COOLDOWN_SECONDS * 2 ** excess, settings.RPC_MAX_COOLDOWN_SECONDS)
+                self.unhealthy_until = time.monotonic() + cooldown
+
+    def mark_unhealthy(self, seconds: float) -> None:
+        with self._lock:
+            self.unhealthy_until = max(self.unhealthy_until, time.monotonic() + seconds)
+
+
+class RPCPool:
+    """
+    Routes JSON-RPC requests across several nodes.
+
+    Healthy endpoints are tried fastest first by EWMA latency (untried ones
+    first, so every node gets measured). Failed requests fail over to the next
+    endpoint, and endpoints that keep failing sit out a growing cooldown.
+    Idempotent reads are hedged: if the fastest node has not answered within
+    ``RPC_HEDGE_DELAY_SECONDS`` the request also goes to the runner-up and the
+    first answer wins. A health check runs in the background every
+    ``RPC_HEALTH_CHECK_INTERVAL_SECONDS`` and benches nodes that fall more than
+    ``RPC_MAX_BLOCK_LAG`` blocks behind the others.
+    """
+
+    def __init__(self, urls: List[str], timeout: float = None, hedge_delay: float = None):
+        if not urls:
+            raise ValueError('At least one RPC endpoint is required')
+        self.endpoints = [RPCEndpoint(url) for url in urls]
+        self.timeout = timeout if timeout is not None else settings.RPC_TIMEOUT_SECONDS
+        self.hedge_delay = hedge_delay if hedge_delay is not None else settings.RPC_HEDGE_DELAY_SECONDS
+        self._executor = ThreadPoolExecutor(max_workers=2 * len(self.endpoints), thread_name_prefix='rpc-pool')
+        self._last_health_check = time.monotonic()
+        self._health_check_running = threading.Lock()
+
+    def ranked(self) -> List[RPCEndpoint]:
+        """Endpoints in the order they should be tried"""
+        healthy = [endpoint for endpoint in self.endpoints if endpoint.healthy]
+        healthy.sort(key=lambda endpoint: -1 if endpoint.latency is None else endpoint.latency)
+        # Benched endpoints remain a last resort, soonest back first
+        benched = sorted((endpoint for endpoint in self.endpoints if not endpoint.healthy),
+                         key=lambda endpoint: endpoint.unhealthy_until)
+        return healthy + benched
+
+    def request(self, data: bytes, idempotent: bool = False) -> bytes:
+        """Send an encoded JSON-RPC request (single or batch) and return the raw response"""
+        self._maybe_check_health()
+        endpoints = self.ranked()
+        if idempotent and self.hedge_delay and len(endpoints) > 1:
+            return self._hedged(data, endpoints)
+        return self._failover(data, endpoints)
+
+    def _failover(self, data: bytes, endpoints: List[RPCEndpoint]) -> bytes:
+        last_error = None
+        for endpoint in endpoints:
+            try:
+                return endpoint.post(data, self.timeout)
+            except requests.RequestException as e:
+                logger.warning(f"RPC endpoint {endpoint.url} failed, failing over: {e}")
+                last_error = e
+        raise NoHealthyEndpointError(f'All RPC endpoints failed: {last_error}')
+
+    def _hedged(self, data: bytes, endpoints: List[RPCEndpoint]) -> bytes:
+        primary, *backups = endpoints
+        pending = {self._executor.submit(primary.post, data, self.timeout)}
+        done, pending = wait(pending, timeout=self.hedge_delay)
+
+        last_error = None
+        while True:
+            for future in done:
+                try:
+                    return future.result()
+                except requests.RequestException as e:
+                    last_error = e
+            if backups:
+                # Primary is slow or failed: race the next endpoint against it
+                pending.add(self._executor.submit(backups.pop(0).post, data, self.timeout))
+            if not pending:
+                raise NoHealthyEndpointError(f'All RPC endpoints failed: {last_error}')
+            done, pending = wait(pending, timeout=self.hedge_delay if backups else None,
+                                 return_when=FIRST_COMPLETED)
+
+    def check_health(self) -> List[Dict[str, Any]]:
+        """Probe every endpoint with ``eth_blockNumber`` and bench failing or lagging ones"""
+        data = json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': 'eth_blockNumber', 'params': []}).encode()
+        for endpoint in self.endpoints:
+            try:
+                endpoint.block_number = int(json.loads(endpoint.post(data, self.timeout))['result'], 16)
+            except Exception as e:
+                logger.warning(f"RPC endpoint {endpoint.url} failed health check: {e}")
+                endpoint.block_number = None
+
+        heads = [endpoint.block_number for endpoint in self.endpoints if endpoint.block_number is not None]
+        best_head = max(heads, default=None)
+        for endpoint in self.endpoints:
+            if endpoint.block_number is not None and best_head - endpoint.block_number > settings.RPC_MAX_BLOCK_LAG:
+                logger.warning(f"RPC endpoint {endpoint.url} is {best_head - endpoint.block_number} blocks behind")
+                endpoint.mark_unhealthy(settings.RPC_HEALTH_CHECK_INTERVAL_SECONDS)
+
+        self._last_health_check = time.monotonic()
+        return [
+            {'url': endpoint.url, 'healthy': endpoint.healthy, 'latency': endpoint.latency,
+             'block_number': endpoint.block_number, 'consecutive_failures': endpoint.consecutive_failures}
+            for endpoint in self.endpoints
+        ]
+
+    def _maybe_check_health(self) -> None:
+        if len(self.endpoints) < 2:
+            return
+        if time.monotonic() - self._last_health_check < settings.RPC_HEALTH_CHECK_INTERVAL_SECONDS:
+            return
+        if self._health_check_running.acquire(blocking=False):
+            def run():
+                try:
+                    self.check_health()
+                finally:
+                    self._health_check_running.release()
+            threading.Thread(target=run, daemon=True).start()
+
+
+_rpc_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_rpc_pool() -> RPCPool:
+    """Get the process-wide pool for ``AVALANCHE_RPC_URLS``"""
+    global _rpc_pool
+    if _rpc_pool is None:
+        with _pool_lock:
+            if _rpc_pool is None:
+                _rpc_pool = RPCPool(settings.AVALANCHE_RPC_URLS)
+    return _rpc_pool
@@ -0,0 +1,167 @@
+import logging
+import re
+import uuid
+from typing import Iterable, List
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, Case, FloatField, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+from .models import ChamaGroup
+
+logger = logging.getLogger(__name__)
+
+# Groups' full text index: a generated tsvector column on PostgreSQL, an FTS5 table on SQLite
+SEARCH_VECTOR_COLUMN = 'search_vector'
+FTS_TABLE = 'chama_group_search'
+
+
+def search_terms(query: str) -> List[str]:
+    """Words of a search box query; punctuation is dropped so it cannot reach the query syntax"""
+    return re.findall(r'\w+', query.lower())[:10]
+
+
+class SearchBackend:
+    """
+    Finds groups by name and description.
+
+    ``search`` narrows a ChamaGroup queryset to the matches, best first, with
+    every word of the query matched as a prefix. Backends keeping their own
+    index are updated through ``index`` and ``remove`` from the ChamaGroup
+    save and delete signals; ``rebuild`` repopulates it after bulk updates,
+    which send no signals.
+    """
+
+    name = None
+
+    def search(self, queryset, query: str):
+        raise NotImplementedError
+
+    def index(self, groups: Iterable[ChamaGroup]) -> None:
+        pass
+
+    def remove(self, group_ids: Iterable) -> None:
+        pass
+
+    def rebuild(self) -> None:
+        pass
+
+
+class LikeSearchBackend(SearchBackend):
+    """Substring matching with LIKE; groups whose name starts with a word come first"""
+
+    name = 'like'
+
+    def search(self, queryset, query: str):
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+
+        for term in terms:
+            queryset = queryset.filter(Q(name__icontains=term) | Q(description__icontains=term))
+        return queryset.annotate(
+            search_rank=Case(When(name__istartswith=terms[0], then=Value(0)), default=Value(1),
+                             output_field=IntegerField())
+        ).order_by('search_rank', 'name')
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    PostgreSQL full text search on a GIN-indexed tsvector column.
+
+    The column is generated from the name (weight A) and description
+    (weight B), so the database keeps it current on every write.
+    """
+
+    name = 'postgres'
+
+    def search(self, queryset, query: str):
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        column = f'"{ChamaGroup._meta.db_table}"."{SEARCH_VECTOR_COLUMN}"'
+        return queryset.filter(
+            RawSQL(f"{column} @@ to_tsquery('simple', %s)", [tsquery], output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(f"ts_rank({column}, to_tsquery('simple', %s))", [tsquery], output_field=FloatField())
+        ).order_by('-search_rank', 'name')
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    SQLite FTS5 ranked with BM25, for development databases.
+
+    The FTS5 table is searched among the queryset's groups, and the best
+    ``CHAMA_SEARCH_MAX_RESULTS`` of them are returned in rank order.
+    """
+
+    name = 'sqlite'
+
+    def search(self, queryset, query: str):
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+
+        match = ' '.join(f'"{term}"*' for term in terms)
+        # The caller's filters are applied inside the FTS query, so the limit
+        # only counts groups the caller could see
+        visible_sql, visible_params = queryset.order_by().values('id').query.sql_with_params()
+        with connection.cursor() as cursor:
+            # Name matches weigh ten times description matches; lower bm25 is better
+            cursor.execute(
+                f'SELECT group_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND group_id IN ({visible_sql}) '
+                f'ORDER BY bm25({FTS_TABLE}, 0, 10.0, 1.0) LIMIT %s',
+                [match, *visible_params, settings.CHAMA_SEARCH_MAX_RESULTS],
+            )
+            ids = [uuid.UUID(row[0]) for row in cursor.fetchall()]
+
+        if not ids:
+            return queryset.none()
+        return queryset.filter(id__in=ids).annotate(
+            search_rank=Case(*[When(id=group_id, then=Value(position)) for position, group_id in enumerate(ids)],
+                             output_field=IntegerField())
+        ).order_by('search_rank')
+
+    def index(self, groups: Iterable[ChamaGroup]) -> None:
+        rows = [(group.id.hex, group.name, group.description or '') for group in groups]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE group_id = %s', [(row[0],) for row in rows])
+            cursor.executemany(f'INSERT INTO {FTS_TABLE} (group_id, name, description) VALUES (%s, %s, %s)', rows)
+
+    def remove(self, group_ids: Iterable) -> None:
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE group_id = %s',
+                               [(uuid.UUID(str(group_id)).hex,) for group_id in group_ids])
+
+    def rebuild(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (group_id, name, description) '
+                f'SELECT id, name, description FROM {ChamaGroup._meta.db_table}'
+            )
+
+
+BACKENDS = {backend.name: backend for backend in (LikeSearchBackend, PostgresSearchBackend, SQLiteSearchBackend)}
+VENDOR_BACKENDS = {'postgresql': 'postgres', 'sqlite': 'sqlite'}
+
+_backend = None
+
+
+def get_search_backend() -> SearchBackend:
+    """Get the group search backend chosen by ``CHAMA_SEARCH_BACKEND``"""
+    global _backend
+    if _backend is None:
+        name = settings.CHAMA_SEARCH_BACKEND
+        if name == 'auto':
+            name = VENDOR_BACKENDS.get(connection.vendor, 'like')
+        if name not in BACKENDS:
+            logger.warning(f"Unknown search backend {name!r}, using substring matching")
+            name = 'like'
+        _backend = BACKENDS[name]()
+    return _backend
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.db import transaction
+from .ledger import has_contributed_this_round
 from .models import ChamaGroup, GroupMembership, Contribution, Payout, Transaction
 from users.serializers import UserProfileSerializer
 
@@ -16,10 +17,15 @@ class ChamaGroupSerializer(serializers.ModelSerializer):
                  'contract_address', 'status', 'created_by', 'created_at', 'updated_at')
         read_only_fields = ('id', 'created_by', 'created_at', 'updated_at', 'contract_address')
 
+    # Counts come from ChamaGroup.objects.with_group_stats() when the queryset has them
     def get_total_members(self, obj):
+        if hasattr(obj, 'member_count'):
+            return obj.member_count
         return obj.members.count()
 
     def get_current_contributions(self, obj):
+        if hasattr(obj, 'confirmed_contribution_count'):
+            return obj.confirmed_contribution_count
         return obj.contributions.filter(status='confirmed').count()
 
     def create(self, validated_data):
@@ -73,9 +79,9 @@ class ContributionSerializer(serializers.ModelSerializer):
 
 
 class MakeContributionSerializer(serializers.Serializer):
-    group_id = serializers.IntegerField()
-    amount = serializers.DecimalField(max_digits=18, decimal_places=8)
-    transaction_hash = serializers.CharField(max_length=66)
+    group_id = serializers.UUIDField()
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    transaction_hash = serializers.RegexField(r'^0x[0-9a-fA-F]{64}$', max_length=66)
 
     def validate_group_id(self, value):
         try:
@@ -84,7 +90,7 @@ class MakeContributionSerializer(serializers.Serializer):
             raise serializers.ValidationError("Group does not exist")
         
         user = self.context['request'].user
-        if not group.members.filter(user=user).exists():
+        if not group.memberships.filter(user=user, status='active').exists():
             raise serializers.ValidationError("You are not a member of this group")
         
         return value
@@ -94,6 +100,9 @@ class MakeContributionSerializer(serializers.Serializer):
             raise serializers.ValidationError("Amount must be greater than 0")
         return value
 
+    def validate_transaction_hash(self, value):
+        return value.lower()
+
 
 class PayoutSerializer(serializers.ModelSerializer):
     recipient = UserProfileSerializer(read_only=True)
@@ -122,7 +131,7 @@ class GroupStatsSerializer(serializers.Serializer):
     total_contributions = serializers.DecimalField(max_digits=18, decimal_places=8)
     total_members = serializers.IntegerField()
     completed_rounds = serializers.IntegerField()
-    next_payout_date = serializers.DateTimeField()
+    next_payout_date = serializers.DateField()
     next_recipient = UserProfileSerializer()
 
 
@@ -136,18 +145,9 @@ class UserGroupsSerializer(serializers.ModelSerializer):
                  'role', 'contribution_status', 'joined_at')
 
     def get_contribution_status(self, obj):
-        # Check if user has contributed this round
-        latest_payout = obj.group.payouts.filter(status='completed').order_by('-processed_at').first()
-        if latest_payout:
-            contributions_after_payout = obj.group.contributions.filter(
-                member=obj.user,
-                contribution_date__gt=latest_payout.processed_at,
-                status='confirmed'
-            ).exists()
+        # Check if user has contributed in the group's open round
+        if hasattr(obj, 'contributed_this_round'):
+            contributed = obj.contributed_this_round
         else:
-            contributions_after_payout = obj.group.contributions.filter(
-                member=obj.user,
-                status='confirmed'
-            ).exists()
-        
-        return "contributed" if contributions_after_payout else "pending"
+            contributed = has_contributed_this_round(obj.group_id, obj.user_id)
+        return "contributed" if contributed else "pending"
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ChamaGroup
+from .search import get_search_backend
+
+
+@receiver(post_save, sender=ChamaGroup)
+def index_group(sender, instance, **kwargs):
+    """Keep the group search index in step with the group"""
+    get_search_backend().index([instance])
+
+
+@receiver(post_delete, sender=ChamaGroup)
+def unindex_group(sender, instance, **kwargs):
+    get_search_backend().remove([instance.pk])
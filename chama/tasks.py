@@ -1,390 +1,364 @@
 import logging
-from datetime import datetime, timedelta
-from decimal import Decimal
+from collections import defaultdict
+from datetime import timedelta
 from celery import shared_task
-from django.utils import timezone
 from django.db import transaction
-from django.db.models import Sum
-from django.core.mail import send_mail
+from django.utils import timezone
 from django.conf import settings
-from .models import ChamaGroup, GroupMembership, Contribution, Payout, Transaction
-from .web3_utils import verify_contribution_transaction, send_payout_transaction, get_transaction_details
+from .models import Contribution, OutgoingTransaction, Payout, PayoutBatch, Round
+from .web3_utils import (
+    get_web3_helper, send_payout_transaction, send_batch_payout_transaction, get_transaction_details
+)
+from . import metrics
+from .indexer import ContributionIndexer, settle_contributions
+from .locks import GroupLockUnavailable, group_lock
+from .balances import BalanceService
+from .tx_monitor import PendingTransactionMonitor
+from .reminders import send_contribution_reminders
+from .round_checks import clear_pending, request_round_check, request_round_checks
+from .verification import clear_pending as clear_pending_verification
+from .notifications import queue_payout_completed_emails, queue_payout_scheduled_emails
+from .ledger import (
+    batch_payouts, claim_due_payouts, close_round, confirm_payout_batch, create_payout_batch, fail_payout_batch,
+    next_payout_recipient, release_payout_batch
+)
 
 logger = logging.getLogger(__name__)
 
 
-@shared_task(bind=True, max_retries=3)
-def verify_blockchain_transaction(self, contribution_id):
-    """Verify a contribution transaction on the blockchain"""
+def verification_retry_delay(attempts):
+    seconds = settings.CONTRIBUTION_VERIFY_RETRY_BASE_SECONDS * 2 ** min(attempts, 20)
+    return timedelta(seconds=min(seconds, settings.CONTRIBUTION_VERIFY_RETRY_MAX_SECONDS))
+
+
+@shared_task
+def dispatch_contribution_verification():
+    """Split due pending contributions into bulk verification tasks.
+
+    Each pick pushes a contribution's next check back exponentially, so
+    transactions that never get mined sink behind new submissions instead
+    of taking every batch.
+    """
+    clear_pending_verification()
     try:
-        contribution = Contribution.objects.get(id=contribution_id)
-        
-        if contribution.is_confirmed:
-            logger.info(f"Contribution {contribution_id} already confirmed")
-            return
-        
-        # Verify transaction on blockchain
-        verification_result = verify_contribution_transaction(
-            contribution.transaction_hash,
-            contribution.amount,
-            contribution.group.smart_contract_address or settings.CHAMA_CONTRACT_ADDRESS
+        batch_size = settings.CONTRIBUTION_VERIFY_BATCH_SIZE
+        now = timezone.now()
+        due = list(
+            Contribution.objects.filter(status='pending', transaction_hash__isnull=False, next_verification_at__lte=now)
+            .order_by('next_verification_at', 'contribution_date')
+            .values_list('id', 'verification_attempts')[:batch_size * settings.CONTRIBUTION_VERIFY_MAX_BATCHES]
         )
-        
-        if verification_result['is_valid']:
-            # Update contribution as confirmed
-            contribution.is_confirmed = True
-            contribution.block_number = verification_result.get('block_number')
-            contribution.gas_used = verification_result.get('gas_used')
-            contribution.save()
-            
-            # Update user's total contributions
-            membership = GroupMembership.objects.get(
-                user=contribution.user, 
-                group=contribution.group
+        by_attempts = defaultdict(list)
+        for contribution_id, attempts in due:
+            by_attempts[attempts].append(contribution_id)
+        for attempts, ids in by_attempts.items():
+            Contribution.objects.filter(id__in=ids).update(
+                verification_attempts=attempts + 1,
+                next_verification_at=now + verification_retry_delay(attempts),
             )
-            membership.total_contributions += contribution.amount
-            membership.save()
-            
-            # Create transaction record
-            Transaction.objects.create(
-                user=contribution.user,
-                group=contribution.group,
-                transaction_type='CONTRIBUTION',
-                amount=contribution.amount,
-                transaction_hash=contribution.transaction_hash,
-                block_number=verification_result.get('block_number'),
-                gas_used=verification_result.get('gas_used'),
-                status='CONFIRMED'
-            )
-            
-            logger.info(f"Contribution {contribution_id} verified and confirmed")
-            
-            # Check if all members have contributed for this round
-            check_round_completion.delay(contribution.group.id)
-            
-        else:
-            logger.warning(f"Contribution {contribution_id} verification failed: {verification_result.get('errors')}")
-            # Retry after some time
-            raise Exception(f"Transaction verification failed: {verification_result.get('errors')}")
+        
+        pending_ids = [str(contribution_id) for contribution_id, _ in due]
+        for start in range(0, len(pending_ids), batch_size):
+            verify_contributions_bulk.delay(pending_ids[start:start + batch_size])
             
-    except Contribution.DoesNotExist:
-        logger.error(f"Contribution {contribution_id} not found")
-    except Exception as exc:
-        logger.error(f"Error verifying contribution {contribution_id}: {exc}")
-        # Retry the task
-        raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
+    except Exception as e:
+        logger.error(f"Error dispatching contribution verification: {e}")
 
 
 @shared_task
-def check_round_completion(group_id):
-    """Check if a contribution round is complete and schedule next payout"""
+def verify_contributions_bulk(contribution_ids):
+    """Verify many pending contributions with one query, one batched chain lookup and one write.
+
+    Contributions whose transaction is not mined yet stay pending for the
+    confirmation tracker and the chain indexer.
+    """
     try:
-        group = ChamaGroup.objects.get(id=group_id)
-        
-        # Get all active members
-        active_members = group.members.all()
-        total_members = active_members.count()
-        
-        if total_members == 0:
-            return
-        
-        # Check contributions for current round
-        # Get last payout date or group start date
-        last_payout = group.payouts.filter(is_completed=True).order_by('-actual_date').first()
-        round_start_date = last_payout.actual_date if last_payout else group.start_date
+        contributions = list(
+            Contribution.objects.filter(
+                id__in=contribution_ids[:settings.CONTRIBUTION_VERIFY_BATCH_SIZE],
+                status='pending',
+                transaction_hash__isnull=False
+            ).select_related('group')
+        )
+        summary = settle_contributions(get_web3_helper(), contributions)
+        request_round_checks(summary['groups'])
+        metrics.incr('verifications.bulk_tasks')
+        metrics.incr('verifications.contributions', len(contributions))
+        logger.info(
+            f"Verified {len(contributions)} contributions: {summary['confirmed']} confirmed, "
+            f"{summary['failed']} failed"
+        )
         
-        # Count confirmed contributions since last payout
-        contributions_this_round = group.contributions.filter(
-            created_at__gt=round_start_date,
-            is_confirmed=True
-        ).values('user').distinct().count()
+    except Exception as e:
+        logger.error(f"Error verifying contributions in bulk: {e}")
+
+
+@shared_task
+def index_chain_contributions():
+    """Scan new blocks once and confirm every matching pending contribution"""
+    try:
+        summary = ContributionIndexer().run()
+        request_round_checks(summary['groups'])
+    except Exception as e:
+        logger.error(f"Error indexing chain contributions: {e}")
+
+
+@shared_task
+def snapshot_wallet_balances():
+    """Record the balance of every member and group wallet"""
+    try:
+        BalanceService().snapshot()
+    except Exception as e:
+        logger.error(f"Error snapshotting wallet balances: {e}")
+
+
+@shared_task
+def check_round_completion(group_id):
+    """Check if a contribution round is complete and schedule next payout.
+
+    Requested through ``request_round_check`` so that bursts of confirmed
+    contributions in one group lead to a single check.
+    """
+    clear_pending(group_id)
+    try:
+        current = Round.objects.filter(group_id=group_id, status='open').first()
         
         # If all members have contributed, schedule next payout
-        if contributions_this_round >= total_members:
+        if current and current.is_complete:
             schedule_next_payout.delay(group_id)
             
-    except ChamaGroup.DoesNotExist:
-        logger.error(f"Group {group_id} not found")
     except Exception as e:
         logger.error(f"Error checking round completion for group {group_id}: {e}")
 
 
 @shared_task
 def schedule_next_payout(group_id):
-    """Schedule the next payout for a group"""
+    """Close the group's completed round with a payout to the next member in rotation.
+
+    Runs under the group's lock, so concurrent invocations for one group
+    return straight away instead of racing to create the same payout.
+    """
     try:
-        with transaction.atomic():
-            group = ChamaGroup.objects.get(id=group_id)
+        with group_lock(group_id):
+            current = Round.objects.select_for_update().select_related('group').filter(
+                group_id=group_id, status='open'
+            ).first()
+            if current is None or not current.is_complete:
+                logger.info(f"Round of group {group_id} is not complete, no payout scheduled")
+                return
             
-            # Get next recipient based on rotation
-            last_payout = group.payouts.filter(is_completed=True).order_by('-actual_date').first()
+            recipient_membership = next_payout_recipient(group_id)
+            if recipient_membership is None:
+                logger.warning(f"Group {group_id} has no active members to pay out to")
+                return
             
-            if last_payout:
-                # Find next person in rotation
-                next_position = (last_payout.recipient.groupmembership_set.get(group=group).position_in_rotation % 
-                               group.members.count()) + 1
-            else:
-                # First payout goes to position 1
-                next_position = 1
-            
-            # Get recipient
-            try:
-                recipient_membership = group.members.get(position_in_rotation=next_position)
-                recipient = recipient_membership.user
-            except GroupMembership.DoesNotExist:
-                # Fallback to first available member
-                recipient_membership = group.members.order_by('position_in_rotation').first()
-                recipient = recipient_membership.user
-              # Calculate payout amount (total contributions since last payout minus any fees)
-            last_payout_date = last_payout.actual_date if last_payout else group.start_date
-            total_amount = group.contributions.filter(
-                created_at__gt=last_payout_date,
-                is_confirmed=True
-            ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-            
-            # Create payout record
             payout = Payout.objects.create(
-                group=group,
-                recipient=recipient,
-                amount=total_amount,
-                scheduled_date=timezone.now() + timedelta(days=1)  # Schedule for next day
+                group=current.group,
+                recipient=recipient_membership.user,
+                amount=current.total_amount,
+                scheduled_date=(timezone.now() + timedelta(days=1)).date(),  # Schedule for next day
+                round_number=current.number,
             )
+            close_round(current, payout)
             
-            logger.info(f"Scheduled payout {payout.id} for group {group_id}")
+            logger.info(f"Scheduled payout {payout.id} for round {current.number} of group {group_id}")
             
-            # Schedule the actual payout execution
-            execute_payout.apply_async(
-                args=[payout.id],
-                eta=payout.scheduled_date
-            )
+            # The payout is sent by sweep_due_payouts (execute_batch_payouts in
+            # batch mode) once due; notify the recipient in this transaction
+            queue_payout_scheduled_emails([payout])
             
-            # Send notification
-            send_payout_notification.delay(payout.id)
-            
-    except ChamaGroup.DoesNotExist:
-        logger.error(f"Group {group_id} not found")
+    except GroupLockUnavailable:
+        logger.info(f"Payout for group {group_id} is already being scheduled by another worker")
     except Exception as e:
         logger.error(f"Error scheduling payout for group {group_id}: {e}")
 
 
-@shared_task(bind=True, max_retries=3)
-def execute_payout(self, payout_id):
-    """Execute a scheduled payout"""
+def send_claimed_payout(payout):
+    """Send the transaction of a payout claimed with ``claim_due_payouts``.
+
+    If the transaction was not sent the claim is left to expire, so the
+    payout is retried by a later sweep. If it may have been sent (a timeout
+    while broadcasting, or any unexpected error) the payout moves to
+    ``needs_review`` instead, since sending it again could pay twice.
+    """
     try:
-        payout = Payout.objects.get(id=payout_id)
-        
-        if payout.is_completed:
-            logger.info(f"Payout {payout_id} already completed")
-            return
-        
-        # Send transaction to blockchain
         tx_hash = send_payout_transaction(
             payout.recipient.wallet_address,
             payout.amount
         )
-        
-        if tx_hash:
-            # Update payout record
-            payout.transaction_hash = tx_hash
-            payout.actual_date = timezone.now()
-            payout.save()
-            
-            # Verify transaction in background
-            verify_payout_transaction.delay(payout_id)
-            
-            logger.info(f"Payout {payout_id} transaction sent: {tx_hash}")
-        else:
-            logger.error(f"Failed to send payout transaction for {payout_id}")
-            # Retry
-            raise Exception("Failed to send payout transaction")
+    except Exception as e:
+        logger.error(f"Payout {payout.id} may have been sent, holding it for review: {e}")
+        Payout.objects.filter(id=payout.id).update(
+            status='needs_review', transaction_hash=getattr(e, 'tx_hash', None), claimed_at=None
+        )
+        return None
+    
+    if not tx_hash:
+        logger.error(f"Failed to send payout transaction for {payout.id}, retrying after the claim expires")
+        return None
+    
+    # The transaction is out: record it in its own savepoint straight away, so
+    # the claim cannot expire into a second send
+    try:
+        with transaction.atomic():
+            # The pending transaction monitor completes the payout once mined
+            Payout.objects.filter(id=payout.id).update(transaction_hash=tx_hash, status='processing', claimed_at=None)
+            OutgoingTransaction.objects.filter(transaction_hash=tx_hash).update(payout=payout)
+    except Exception as e:
+        logger.critical(f"Payout {payout.id} was sent as {tx_hash} but could not be recorded: {e}")
+        Payout.objects.filter(id=payout.id).update(status='needs_review', transaction_hash=tx_hash)
+        return tx_hash
+    logger.info(f"Payout {payout.id} transaction sent: {tx_hash}")
+    return tx_hash
+
+
+@shared_task
+def sweep_due_payouts():
+    """Send every due payout, claiming them in bounded batches.
+
+    Several workers can sweep at once: each claims a disjoint set of rows,
+    and nothing is held in worker memory between sweeps.
+    """
+    if settings.PAYOUT_BATCH_MODE:
+        return
+    
+    try:
+        sent = 0
+        for _ in range(settings.PAYOUT_SWEEP_MAX_BATCHES):
+            payouts = claim_due_payouts(settings.PAYOUT_SWEEP_BATCH_SIZE)
+            if not payouts:
+                break
+            sent += sum(1 for payout in payouts if send_claimed_payout(payout))
+        if sent:
+            logger.info(f"Sent {sent} due payouts")
             
-    except Payout.DoesNotExist:
-        logger.error(f"Payout {payout_id} not found")
-    except Exception as exc:
-        logger.error(f"Error executing payout {payout_id}: {exc}")
-        # Retry the task
-        raise self.retry(exc=exc, countdown=300 * (2 ** self.request.retries))
+    except Exception as e:
+        logger.error(f"Error sweeping due payouts: {e}")
 
 
-@shared_task(bind=True, max_retries=5)
-def verify_payout_transaction(self, payout_id):
-    """Verify a payout transaction on the blockchain"""
+@shared_task
+def execute_payout(payout_id):
+    """Send one scheduled payout now, if it is due and not claimed by a sweeper"""
     try:
-        payout = Payout.objects.get(id=payout_id)
-        
-        if not payout.transaction_hash:
-            logger.error(f"Payout {payout_id} has no transaction hash")
+        claimed = claim_due_payouts(1, payout_ids=[payout_id])
+        if not claimed:
+            logger.info(f"Payout {payout_id} is not due or is already being processed")
             return
+        send_claimed_payout(claimed[0])
         
-        # Get transaction details
-        tx_details = get_transaction_details(payout.transaction_hash)
-        
-        if tx_details and tx_details.get('status') == 1:
-            # Transaction successful
-            payout.is_completed = True
-            payout.block_number = tx_details.get('blockNumber')
-            payout.gas_used = tx_details.get('gasUsed')
-            payout.save()
+    except Exception as e:
+        logger.error(f"Error executing payout {payout_id}: {e}")
+
+
+@shared_task
+def execute_batch_payouts():
+    """Pay all due payouts, across groups, with one disperse transaction per batch"""
+    if not settings.PAYOUT_BATCH_MODE:
+        return
+    
+    try:
+        while True:
+            batch = create_payout_batch(settings.PAYOUT_BATCH_MAX_RECIPIENTS)
+            if batch is None:
+                break
             
-            # Update recipient's payout status
-            membership = GroupMembership.objects.get(
-                user=payout.recipient,
-                group=payout.group
+            payouts = batch_payouts(batch)
+            tx_hash = send_batch_payout_transaction(
+                [(payout.recipient.wallet_address, payout.amount) for payout in payouts]
             )
-            membership.has_received_payout = True
-            membership.save()
             
-            # Create transaction record
-            Transaction.objects.create(
-                user=payout.recipient,
-                group=payout.group,
-                transaction_type='PAYOUT',
-                amount=payout.amount,
-                transaction_hash=payout.transaction_hash,
-                block_number=payout.block_number,
-                gas_used=payout.gas_used,
-                status='CONFIRMED'
-            )
+            if not tx_hash:
+                released = release_payout_batch(batch)
+                logger.error(f"Failed to send payout batch {batch.id}, {released} payouts rescheduled")
+                break
             
-            logger.info(f"Payout {payout_id} verified and completed")
+            PayoutBatch.objects.filter(id=batch.id).update(
+                transaction_hash=tx_hash, status='sent', sent_at=timezone.now()
+            )
+            batch.payouts.update(transaction_hash=tx_hash)
+            OutgoingTransaction.objects.filter(transaction_hash=tx_hash).update(batch=batch)
+            logger.info(f"Payout batch {batch.id} sent with {len(payouts)} payouts: {tx_hash}")
             
-            # Send completion notification
-            send_payout_completion_notification.delay(payout_id)
+            verify_payout_batch.apply_async(args=[str(batch.id)], countdown=settings.PAYOUT_BATCH_VERIFY_DELAY_SECONDS)
             
-        elif tx_details:
-            # Transaction failed
-            logger.error(f"Payout transaction {payout.transaction_hash} failed")
-            payout.is_completed = False
-            payout.save()
+    except Exception as e:
+        logger.error(f"Error executing batch payouts: {e}")
+
+
+@shared_task
+def verify_payout_batch(batch_id):
+    """Complete or fail every payout of a batch from the batch transaction receipt.
+
+    Batches that are not mined yet are completed by the pending transaction
+    monitor.
+    """
+    try:
+        batch = PayoutBatch.objects.get(id=batch_id)
+        
+        if batch.status != 'sent':
+            logger.info(f"Payout batch {batch_id} already {batch.status}")
+            return
+        
+        receipt = get_transaction_details(batch.transaction_hash)
+        
+        if receipt is None:
+            logger.info(f"Payout batch transaction {batch.transaction_hash} not mined yet, "
+                        f"leaving it to the pending transaction monitor")
+        elif receipt.get('status') == 1:
+            confirm_payout_batch(batch, receipt)
         else:
-            # Transaction not yet mined, retry
-            logger.info(f"Payout transaction {payout.transaction_hash} not yet mined, retrying...")
-            raise Exception("Transaction not yet mined")
+            failed = fail_payout_batch(batch, receipt)
+            logger.error(f"Payout batch transaction {batch.transaction_hash} reverted, {failed} payouts failed")
             
-    except Payout.DoesNotExist:
-        logger.error(f"Payout {payout_id} not found")
-    except Exception as exc:
-        logger.error(f"Error verifying payout {payout_id}: {exc}")
-        # Retry the task
-        raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
+    except PayoutBatch.DoesNotExist:
+        logger.error(f"Payout batch {batch_id} not found")
+    except Exception as e:
+        logger.error(f"Error verifying payout batch {batch_id}: {e}")
+
+
+@shared_task
+def monitor_pending_transactions():
+    """Settle mined payout transactions and replace stuck ones with higher-fee versions"""
+    try:
+        PendingTransactionMonitor().run()
+    except Exception as e:
+        logger.error(f"Error monitoring pending transactions: {e}")
 
 
 @shared_task
 def send_payout_notification(payout_id):
-    """Send notification about scheduled payout"""
+    """Queue the notification about a scheduled payout"""
     try:
-        payout = Payout.objects.get(id=payout_id)
-        
-        # Send email notification
-        if payout.recipient.email:
-            send_mail(
-                subject=f'Chama Payout Scheduled - {payout.group.name}',
-                message=f'''
-                Hello {payout.recipient.first_name},
-                
-                Your payout from "{payout.group.name}" has been scheduled.
-                
-                Amount: {payout.amount} AVAX
-                Scheduled Date: {payout.scheduled_date}
-                
-                You will receive another notification once the payout is completed.
-                
-                Best regards,
-                Chama Platform Team
-                ''',
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[payout.recipient.email],
-                fail_silently=True
-            )
-        
-        logger.info(f"Payout notification sent for {payout_id}")
+        payout = Payout.objects.select_related('recipient', 'group').get(id=payout_id)
+        queue_payout_scheduled_emails([payout])
+        logger.info(f"Payout notification queued for {payout_id}")
         
     except Payout.DoesNotExist:
         logger.error(f"Payout {payout_id} not found")
     except Exception as e:
-        logger.error(f"Error sending payout notification for {payout_id}: {e}")
+        logger.error(f"Error queueing payout notification for {payout_id}: {e}")
 
 
 @shared_task
 def send_payout_completion_notification(payout_id):
-    """Send notification about completed payout"""
+    """Queue the notification about a completed payout"""
     try:
-        payout = Payout.objects.get(id=payout_id)
-        
-        # Send email notification
-        if payout.recipient.email:
-            send_mail(
-                subject=f'Chama Payout Completed - {payout.group.name}',
-                message=f'''
-                Hello {payout.recipient.first_name},
-                
-                Your payout from "{payout.group.name}" has been completed successfully!
-                
-                Amount: {payout.amount} AVAX
-                Transaction Hash: {payout.transaction_hash}
-                Completed On: {payout.actual_date}
-                
-                You can view the transaction on the Avalanche explorer.
-                
-                Best regards,
-                Chama Platform Team
-                ''',
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[payout.recipient.email],
-                fail_silently=True
-            )
-        
-        logger.info(f"Payout completion notification sent for {payout_id}")
+        payout = Payout.objects.select_related('recipient', 'group').get(id=payout_id)
+        queue_payout_completed_emails([payout])
+        logger.info(f"Payout completion notification queued for {payout_id}")
         
     except Payout.DoesNotExist:
         logger.error(f"Payout {payout_id} not found")
     except Exception as e:
-        logger.error(f"Error sending payout completion notification for {payout_id}: {e}")
+        logger.error(f"Error queueing payout completion notification for {payout_id}: {e}")
 
 
 @shared_task
 def send_contribution_reminder():
     """Send reminders to users who haven't contributed in current round"""
     try:
-        # Get all active groups
-        active_groups = ChamaGroup.objects.filter(is_active=True)
-        
-        for group in active_groups:
-            # Get last payout date
-            last_payout = group.payouts.filter(is_completed=True).order_by('-actual_date').first()
-            round_start_date = last_payout.actual_date if last_payout else group.start_date
-            
-            # Get members who haven't contributed this round
-            contributed_users = group.contributions.filter(
-                created_at__gt=round_start_date,
-                is_confirmed=True
-            ).values_list('user', flat=True)
-            
-            pending_members = group.members.exclude(user__in=contributed_users)
-            
-            for membership in pending_members:
-                user = membership.user
-                if user.email:
-                    send_mail(
-                        subject=f'Contribution Reminder - {group.name}',
-                        message=f'''
-                        Hello {user.first_name},
-                        
-                        This is a friendly reminder that your contribution to "{group.name}" is due.
-                        
-                        Contribution Amount: {group.contribution_amount} AVAX
-                        
-                        Please make your contribution to keep the group active.
-                        
-                        Best regards,
-                        Chama Platform Team
-                        ''',
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        recipient_list=[user.email],
-                        fail_silently=True
-                    )
-        
-        logger.info("Contribution reminders sent")
+        summary = send_contribution_reminders()
+        logger.info(f"Contribution reminders queued: {summary['queued']} in {summary['batches']} batches")
         
     except Exception as e:
         logger.error(f"Error sending contribution reminders: {e}")
@@ -0,0 +1,278 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+class RPCError(Exception):
+    """Answered as a JSON-RPC error object instead of a result"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class FakeRPCNode:
+    """Minimal in-process JSON-RPC node used by tests and benchmarks.
+
+    Serves a small subset of the Ethereum JSON-RPC API from in-memory
+    transactions, receipts and balances. ``latency`` delays every HTTP
+    request (batch or single) to mimic a remote node, and ``fail`` makes
+    the node answer every request with an HTTP 500.
+
+    Usage::
+
+        with FakeRPCNode(latency=0.05) as node:
+            node.add_transaction(tx_hash, to_address, value_wei)
+            helper = AvalancheWeb3Helper(rpc_url=node.url)
+    """
+
+    def __init__(self, latency: float = 0.0, chain_id: int = 43113, host: str = '127.0.0.1'):
+        self.latency = latency
+        self.fail = False
+        self.chain_id = chain_id
+        self.block_number = 1
+        self.transactions: Dict[str, Dict[str, Any]] = {}
+        self.receipts: Dict[str, Dict[str, Any]] = {}
+        self.balances: Dict[str, int] = {}
+        self.base_fee = 25 * 10 ** 9
+        # Extra gas charged by contract wallets' receive functions, by address
+        self.receive_gas: Dict[str, int] = {}
+        # Broadcast transactions waiting to be mined, and per-account nonces
+        self.mempool: Dict[str, Dict[str, Any]] = {}
+        self.nonces: Dict[str, int] = {}
+        # Block number -> fork it belongs to, for blocks replaced by ``reorg``
+        self.block_forks: Dict[int, int] = {}
+        self.fork_id = 0
+        self.request_count = 0
+        self.call_count = 0
+        self.method_counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'FakeRPCNode':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> 'FakeRPCNode':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def add_transaction(self, tx_hash: str, to_address: str, value_wei: int,
+                        from_address: str = '0x' + '11' * 20, status: int = 1,
+                        mined: bool = True) -> None:
+        """Register a native transfer, optionally already mined"""
+        tx_hash = tx_hash.lower()
+        self.transactions[tx_hash] = {
+            'hash': tx_hash,
+            'from': from_address.lower(),
+            'to': to_address.lower() if to_address else None,
+            'value': hex(value_wei),
+            'gas': hex(21000),
+            'gasPrice': hex(25 * 10 ** 9),
+            'nonce': '0x0',
+            'blockNumber': hex(self.block_number) if mined else None,
+        }
+        if mined:
+            self.receipts[tx_hash] = {
+                'transactionHash': tx_hash,
+                'status': hex(status),
+                'gasUsed': hex(21000),
+                'cumulativeGasUsed': hex(21000),
+                'blockNumber': hex(self.block_number),
+            }
+
+    def mine(self, blocks: int = 1, include_mempool: bool = True) -> int:
+        """Advance the chain head; new transactions land in the new head block.
+
+        Broadcast transactions in the mempool are mined into the first new block.
+        """
+        self.block_number += 1
+        if include_mempool:
+            for tx_hash, tx in list(self.mempool.items()):
+                self.add_transaction(tx_hash, tx['to'], int(tx['value'], 16), from_address=tx['from'])
+                self.transactions[tx_hash].update(tx, blockNumber=hex(self.block_number))
+                self.receipts[tx_hash].update(gasUsed=tx['gas'], cumulativeGasUsed=tx['gas'])
+                del self.mempool[tx_hash]
+        self.block_number += blocks - 1
+        return self.block_number
+
+    def send_raw_transaction(self, raw_hex: str) -> str:
+        """Accept a signed transaction into the mempool, enforcing nonce order"""
+        from eth_account import Account
+        from eth_account.typed_transactions import TypedTransaction
+        from eth_utils import keccak
+        from hexbytes import HexBytes
+
+        raw = HexBytes(raw_hex)
+        sender = Account.recover_transaction(raw).lower()
+        fields = TypedTransaction.from_bytes(raw).as_dict()
+        nonce = fields['nonce']
+        if nonce < self.mined_nonce(sender):
+            raise ValueError('nonce too low')
+
+        # A pending transaction with the same nonce is replaced if it pays more
+        for tx_hash, pending in list(self.mempool.items()):
+            if pending['from'] == sender and int(pending['nonce'], 16) == nonce:
+                if fields['maxFeePerGas'] <= int(pending['maxFeePerGas'], 16):
+                    raise ValueError('replacement transaction underpriced')
+                del self.mempool[tx_hash]
+
+        tx_hash = '0x' + keccak(raw).hex()
+        self.mempool[tx_hash] = {
+            'hash': tx_hash,
+            'from': sender,
+            'to': '0x' + bytes(fields['to']).hex() if fields['to'] else None,
+            'value': hex(fields['value']),
+            'input': '0x' + bytes(fields['data']).hex(),
+            'gas': hex(fields['gas']),
+            'nonce': hex(nonce),
+            'maxFeePerGas': hex(fields['maxFeePerGas']),
+            'maxPriorityFeePerGas': hex(fields['maxPriorityFeePerGas']),
+            'blockNumber': None,
+        }
+        self.nonces[sender] = max(self.nonces.get(sender, 0), nonce + 1)
+        return tx_hash
+
+    def mined_nonce(self, address: str) -> int:
+        """Next nonce of ``address`` counting only mined transactions"""
+        mined = [int(tx['nonce'], 16) for tx in self.transactions.values() if tx['from'] == address]
+        return max(mined) + 1 if mined else 0
+
+    def block_hash(self, number: int) -> str:
+        # Blocks replaced by a reorg get a different hash at the same height
+        return '0x' + f'{self.block_forks.get(number, 0):08x}{number:056x}'
+
+    def reorg(self, from_block: int) -> None:
+        """Replace blocks from ``from_block`` to the head with empty ones.
+
+        Transactions mined in the replaced blocks go back to the mempool, so
+        the next ``mine`` includes them again in a different block.
+        """
+        self.fork_id += 1
+        for number in range(from_block, self.block_number + 1):
+            self.block_forks[number] = self.fork_id
+        for tx_hash, tx in list(self.transactions.items()):
+            if tx['blockNumber'] is not None and int(tx['blockNumber'], 16) >= from_block:
+                self.mempool[tx_hash] = dict(self.transactions.pop(tx_hash), blockNumber=None)
+                self.receipts.pop(tx_hash, None)
+
+    def get_block(self, number: int, full_transactions: bool) -> Optional[Dict[str, Any]]:
+        if number > self.block_number:
+            return None
+        transactions = [tx for tx in self.transactions.values() if tx['blockNumber'] == hex(number)]
+        return {
+            'number': hex(number),
+            'hash': self.block_hash(number),
+            'parentHash': self.block_hash(number - 1),
+            'timestamp': hex(1700000000 + number),
+            'transactions': transactions if full_transactions else [tx['hash'] for tx in transactions],
+        }
+
+    def set_balance(self, address: str, balance_wei: int) -> None:
+        self.balances[address.lower()] = balance_wei
+
+    def handle_call(self, method: str, params: List[Any]) -> Any:
+        """Return the result of a single JSON-RPC call"""
+        if method == 'web3_clientVersion':
+            return 'FakeRPCNode/1.0'
+        if method == 'eth_chainId':
+            return hex(self.chain_id)
+        if method == 'net_version':
+            return str(self.chain_id)
+        if method == 'eth_blockNumber':
+            return hex(self.block_number)
+        if method == 'eth_gasPrice':
+            return hex(self.base_fee)
+        if method == 'eth_feeHistory':
+            block_count = int(params[0], 16) if isinstance(params[0], str) else params[0]
+            return {
+                'oldestBlock': hex(max(self.block_number - block_count + 1, 0)),
+                'baseFeePerGas': [hex(self.base_fee)] * (block_count + 1),
+                'gasUsedRatio': [0.5] * block_count,
+                'reward': [[hex(10 ** 9)] for _ in range(block_count)],
+            }
+        if method == 'eth_getTransactionCount':
+            if params[1] == 'pending':
+                return hex(self.nonces.get(params[0].lower(), 0))
+            return hex(self.mined_nonce(params[0].lower()))
+        if method == 'eth_estimateGas':
+            # Intrinsic gas plus a flat cost per calldata byte and the recipient's receive function
+            data = params[0].get('data') or params[0].get('input') or '0x'
+            receive_gas = self.receive_gas.get((params[0].get('to') or '').lower(), 0)
+            return hex(21000 + 16 * (len(data) - 2) // 2 + receive_gas)
+        if method == 'eth_sendRawTransaction':
+            return self.send_raw_transaction(params[0])
+        if method == 'eth_getBalance':
+            return hex(self.balances.get(params[0].lower(), 0))
+        if method == 'eth_getTransactionByHash':
+            return self.transactions.get(params[0].lower()) or self.mempool.get(params[0].lower())
+        if method == 'eth_getTransactionReceipt':
+            return self.receipts.get(params[0].lower())
+        if method == 'eth_getBlockByNumber':
+            number = self.block_number if params[0] == 'latest' else int(params[0], 16)
+            return self.get_block(number, params[1])
+        raise RPCError(-32601, f'Method not found: {method}')
+
+    def _respond(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = {'jsonrpc': '2.0', 'id': payload.get('id')}
+        with self._lock:
+            self.call_count += 1
+            self.method_counts[payload['method']] += 1
+        try:
+            response['result'] = self.handle_call(payload['method'], payload.get('params') or [])
+        except RPCError as e:
+            response['error'] = {'code': e.code, 'message': str(e)}
+        except ValueError as e:
+            response['error'] = {'code': -32000, 'message': str(e)}
+        return response
+
+    def _handler_class(self):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                with node._lock:
+                    node.request_count += 1
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if node.latency:
+                    time.sleep(node.latency)
+                if node.fail:
+                    self.send_error(500, 'Node unavailable')
+                    return
+
+                payload = json.loads(body)
+                if isinstance(payload, list):
+                    result = [node._respond(item) for item in payload]
+                else:
+                    result = node._respond(payload)
+
+                data = json.dumps(result).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -1,8 +1,55 @@
-from django.test import TestCase
+import asyncio
+import os
+import re
+import subprocess
+import sys
+import uuid
+from datetime import timedelta
+from io import StringIO
+from decimal import Decimal
+from unittest import mock
+import requests
+from django.apps import apps
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import get_connection
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
-from chama.models import ChamaGroup, GroupMembership
+from chama.balances import BalanceService
+from chama.confirmations import ConfirmationTracker
+from chama.dedup import BloomFilter, ContributionDeduplicator
+from chama.indexer import ContributionIndexer
+from chama.locks import GroupLockUnavailable, group_lock
+from chama.nonce_manager import NonceManager
+from chama.receipt_cache import receipt_cache_stats
+from chama.reminders import send_contribution_reminders
+from chama.round_checks import request_round_check
+from chama.search import LikeSearchBackend, get_search_backend
+from chama.rpc_pool import RPCPool
+from chama.verification import request_contribution_verification
+from chama.tx_monitor import PendingTransactionMonitor
+from chama.gas_oracle import GWEI, GasOracle
+from chama.metrics import get_counters, reset_counters
+from chama.models import (
+    AccountNonce, CachedTransaction, OutgoingTransaction, ChainCheckpoint, ChamaGroup, Contribution, GroupLock, GroupMembership, Payout, PayoutBatch,
+    Round, Transaction, WalletBalanceSnapshot
+)
+from chama.ledger import claim_due_payouts, confirm_contributions, has_contributed_this_round, revert_orphaned_blocks, sync_expected_members
+from chama.tasks import (
+    check_round_completion, dispatch_contribution_verification, execute_batch_payouts, execute_payout,
+    schedule_next_payout, sweep_due_payouts, verify_contributions_bulk, verify_payout_batch
+)
+from chama.testing.fake_rpc import FakeRPCNode
+from chama.web3_utils import AsyncAvalancheWeb3Helper, AvalancheWeb3Helper, web3_helper, verify_contribution_transactions
+from users.models import EmailOutbox
+from users.outbox import drain_outbox
 
 User = get_user_model()
 
@@ -129,3 +176,1348 @@ class ChamaAPITest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('groups_count', response.data)
         self.assertIn('total_contributions', response.data)
+
+
+class BatchVerificationTest(TestCase):
+    """Tests for batched JSON-RPC transaction verification"""
+
+    GROUP_WALLET = '0x000000000000000000000000000000000000dEaD'
+
+    def _raw_transaction(self, tx_hash, value_wei, to=GROUP_WALLET):
+        return {'hash': tx_hash, 'from': '0x' + '11' * 20, 'to': to.lower(),
+                'value': hex(value_wei), 'gasPrice': hex(25 * 10 ** 9), 'blockNumber': '0x10'}
+
+    def _raw_receipt(self, tx_hash, status=1):
+        return {'transactionHash': tx_hash, 'status': hex(status), 'gasUsed': hex(21000), 'blockNumber': '0x10'}
+
+    def test_verifies_many_hashes_in_one_batch_request(self):
+        chain = {
+            '0xaa': (self._raw_transaction('0xaa', 10 ** 18), self._raw_receipt('0xaa')),
+            '0xbb': (self._raw_transaction('0xbb', 2 * 10 ** 18), self._raw_receipt('0xbb')),
+            '0xcc': (self._raw_transaction('0xcc', 10 ** 18), self._raw_receipt('0xcc', status=0)),
+            '0xdd': (None, None),
+        }
+
+        def make_batch_request(batch):
+            responses = []
+            for index, (method, params) in enumerate(batch):
+                if method == 'eth_blockNumber':
+                    responses.append({'jsonrpc': '2.0', 'id': index, 'result': '0x10'})
+                    continue
+                tx, receipt = chain[params[0]]
+                result = tx if method == 'eth_getTransactionByHash' else receipt
+                responses.append({'jsonrpc': '2.0', 'id': index, 'result': result})
+            return responses
+
+        with mock.patch.object(web3_helper.w3.provider, 'make_batch_request',
+                               side_effect=make_batch_request) as batch_request:
+            results = verify_contribution_transactions([
+                ('0xaa', Decimal('1'), self.GROUP_WALLET),
+                ('0xbb', Decimal('1'), self.GROUP_WALLET),
+                ('0xcc', Decimal('1'), self.GROUP_WALLET),
+                ('0xdd', Decimal('1'), self.GROUP_WALLET),
+            ])
+
+        self.assertEqual(batch_request.call_count, 1)
+        self.assertTrue(results['0xaa']['is_valid'])
+        self.assertEqual(results['0xaa']['block_number'], 16)
+        self.assertEqual(results['0xaa']['gas_used'], 21000)
+        self.assertEqual(results['0xbb']['errors'], ['Amount mismatch'])
+        self.assertEqual(results['0xcc']['errors'], ['Transaction failed'])
+        self.assertEqual(results['0xdd']['errors'], ['Transaction not found'])
+
+    def test_batch_level_error_is_reported_per_hash(self):
+        error_response = {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32600, 'message': 'batch too large'}}
+        with mock.patch.object(web3_helper.w3.provider, 'make_batch_request', return_value=error_response):
+            result = web3_helper.verify_transaction('0xaa', Decimal('1'), self.GROUP_WALLET)
+
+        self.assertFalse(result['is_valid'])
+        self.assertEqual(result['errors'], ['Verification error: batch too large'])
+
+
+class AsyncVerificationTest(TestCase):
+    """Tests for the asyncio-based verification client"""
+
+    GROUP_WALLET = '0x000000000000000000000000000000000000dEaD'
+
+    def setUp(self):
+        self.node = FakeRPCNode().start()
+        self.addCleanup(self.node.stop)
+        self.helper = AsyncAvalancheWeb3Helper(rpc_url=self.node.url, max_concurrency=4)
+
+    def _run(self, coro):
+        async def run():
+            try:
+                return await coro
+            finally:
+                await self.helper.disconnect()
+        return asyncio.run(run())
+
+    def test_verifies_transactions_concurrently(self):
+        checks = []
+        for index in range(10):
+            tx_hash = '0x' + f'{index:064x}'
+            self.node.add_transaction(tx_hash, self.GROUP_WALLET, 10 ** 18, mined=index % 2 == 0)
+            checks.append((tx_hash, Decimal('1'), self.GROUP_WALLET))
+
+        results = self._run(self.helper.verify_transactions(checks))
+
+        self.assertEqual(self.node.request_count, 1)
+        self.assertEqual(sum(result['is_valid'] for result in results.values()), 5)
+        self.assertEqual(results[checks[1][0]]['errors'], ['Transaction not yet mined'])
+
+    def test_get_balance(self):
+        self.node.set_balance(self.GROUP_WALLET, 3 * 10 ** 18)
+
+        balance = self._run(self.helper.get_balance(self.GROUP_WALLET))
+
+        self.assertEqual(balance, Decimal('3'))
+
+
+class ChamaFixturesMixin:
+    """Shared helpers for building users, groups and contributions"""
+
+    GROUP_WALLET = '0x000000000000000000000000000000000000dEaD'
+
+    def make_user(self, index=1, **kwargs):
+        return User.objects.create_user(
+            email=f'member{index}@example.com',
+            username=f'member{index}',
+            phone_number=f'+2547{index:08d}',
+            password='testpass123',
+            **kwargs
+        )
+
+    def make_group(self, creator, name='Test Chama', **kwargs):
+        kwargs.setdefault('contribution_amount', Decimal('1.00'))
+        kwargs.setdefault('contract_address', self.GROUP_WALLET)
+        return ChamaGroup.objects.create(name=name, created_by=creator, **kwargs)
+
+    def make_contribution(self, group, member, tx_hash, **kwargs):
+        kwargs.setdefault('amount', group.contribution_amount)
+        kwargs.setdefault('expected_amount', group.contribution_amount)
+        kwargs.setdefault('due_date', timezone.now().date())
+        return Contribution.objects.create(group=group, member=member, transaction_hash=tx_hash, **kwargs)
+
+
+@override_settings(CHAIN_INDEXER_CONFIRMATIONS=0, CHAIN_INDEXER_START_BLOCK=1)
+class ContributionIndexerTest(ChamaFixturesMixin, TestCase):
+    """Tests for the block-scanning contribution indexer"""
+
+    def setUp(self):
+        self.node = FakeRPCNode().start()
+        self.addCleanup(self.node.stop)
+        self.indexer = ContributionIndexer(helper=AvalancheWeb3Helper(rpc_url=self.node.url))
+        self.member = self.make_user()
+        self.group = self.make_group(self.member)
+
+    def test_confirms_matching_contributions_and_resumes_from_checkpoint(self):
+        paid = self.make_contribution(self.group, self.member, '0x' + 'a' * 64)
+        elsewhere = self.make_contribution(self.group, self.member, '0x' + 'b' * 64, amount=Decimal('2.00'))
+        self.node.add_transaction(paid.transaction_hash, self.GROUP_WALLET, 10 ** 18)
+        self.node.add_transaction(elsewhere.transaction_hash, '0x' + '22' * 20, 2 * 10 ** 18)
+
+        summary = self.indexer.run()
+
+        self.assertEqual(summary['confirmed'], 1)
+        self.assertEqual(summary['groups'], {self.group.id})
+        paid.refresh_from_db()
+        self.assertEqual(paid.status, 'confirmed')
+        self.assertEqual(paid.block_number, 1)
+        self.assertTrue(Transaction.objects.filter(contribution=paid, status='confirmed').exists())
+        self.assertEqual(ChainCheckpoint.objects.get(name='contributions').last_block, 1)
+
+        late = self.make_contribution(self.group, self.member, '0x' + 'c' * 64)
+        self.node.mine()
+        self.node.add_transaction(late.transaction_hash, self.GROUP_WALLET, 10 ** 18)
+
+        summary = self.indexer.run()
+
+        self.assertEqual(summary['blocks'], 1)
+        self.assertEqual(summary['confirmed'], 1)
+        elsewhere.refresh_from_db()
+        self.assertEqual(elsewhere.status, 'pending')
+
+    def test_reverted_contribution_is_marked_failed(self):
+        reverted = self.make_contribution(self.group, self.member, '0x' + 'd' * 64)
+        self.node.add_transaction(reverted.transaction_hash, self.GROUP_WALLET, 10 ** 18, status=0)
+
+        summary = self.indexer.run()
+
+        self.assertEqual(summary['failed'], 1)
+        reverted.refresh_from_db()
+        self.assertEqual(reverted.status, 'failed')
+
+    def test_blocks_are_fetched_outside_a_transaction_and_a_moved_checkpoint_wins(self):
+        paid = self.make_contribution(self.group, self.member, '0x' + 'e' * 64)
+        self.node.add_transaction(paid.transaction_hash, self.GROUP_WALLET, 10 ** 18)
+        ChainCheckpoint.objects.create(name='contributions', last_block=0)
+        outer_blocks = len(connection.atomic_blocks)
+        get_blocks = self.indexer.helper.get_blocks
+
+        def fetch_while_another_worker_indexes(*args, **kwargs):
+            self.assertEqual(len(connection.atomic_blocks), outer_blocks)
+            ChainCheckpoint.objects.filter(name='contributions').update(last_block=1)
+            return get_blocks(*args, **kwargs)
+
+        with mock.patch.object(self.indexer.helper, 'get_blocks', side_effect=fetch_while_another_worker_indexes):
+            summary = self.indexer.run()
+
+        self.assertEqual(summary['blocks'], 0)
+        paid.refresh_from_db()
+        self.assertEqual(paid.status, 'pending')
+
+
+@override_settings(NONCE_RESYNC_INTERVAL_SECONDS=300)
+class NonceManagerTest(TestCase):
+    """Tests for the local payout nonce manager"""
+
+    ADDRESS = '0x' + 'ab' * 20
+
+    def setUp(self):
+        self.chain_nonce = 7
+        self.manager = NonceManager(lambda address: self.chain_nonce)
+
+    def test_reserves_consecutive_nonces_without_asking_the_node(self):
+        fetches = []
+        manager = NonceManager(lambda address: fetches.append(address) or self.chain_nonce)
+
+        nonces = [manager.acquire(self.ADDRESS) for _ in range(3)]
+
+        self.assertEqual(nonces, [7, 8, 9])
+        self.assertEqual(len(fetches), 1)
+
+    def test_rejected_broadcast_releases_nonce_for_reuse(self):
+        first = self.manager.acquire(self.ADDRESS)
+        with self.assertRaises(ValueError):
+            with self.manager.reserve(self.ADDRESS):
+                raise ValueError('insufficient funds for gas * price + value')
+        third = self.manager.acquire(self.ADDRESS)
+        self.manager.release(self.ADDRESS, first)
+
+        self.assertEqual((first, third), (7, 8))
+        self.assertEqual(self.manager.acquire(self.ADDRESS), 7)
+        self.assertEqual(self.manager.acquire(self.ADDRESS), 9)
+
+    def test_rejected_nonce_resyncs_with_chain(self):
+        self.manager.acquire(self.ADDRESS)
+        self.chain_nonce = 12
+
+        with self.assertRaises(ValueError):
+            with self.manager.reserve(self.ADDRESS):
+                raise ValueError('nonce too low')
+
+        self.assertEqual(self.manager.acquire(self.ADDRESS), 12)
+        self.assertEqual(AccountNonce.objects.get(address=self.ADDRESS).next_nonce, 13)
+
+    def test_resync_does_not_hand_out_nonces_still_in_flight(self):
+        in_flight = [self.manager.acquire(self.ADDRESS) for _ in range(2)]
+
+        # The node has not seen the two in-flight transactions yet
+        with self.assertRaises(ValueError):
+            with self.manager.reserve(self.ADDRESS):
+                raise ValueError('nonce too high')
+
+        self.assertEqual(in_flight, [7, 8])
+        self.assertEqual(self.manager.acquire(self.ADDRESS), 10)
+
+    def test_ambiguous_failure_keeps_the_nonce_until_a_gap_shows_it_was_never_sent(self):
+        with self.assertRaises(TimeoutError):
+            with self.manager.reserve(self.ADDRESS):
+                raise TimeoutError('read timed out')
+        self.assertEqual(self.manager.acquire(self.ADDRESS), 8)
+
+        # Once the reservations lapse, the node still lacking nonce 7 proves it was never accepted
+        later = timezone.now() + timedelta(seconds=settings.NONCE_RESYNC_INTERVAL_SECONDS + 1)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertEqual(self.manager.acquire(self.ADDRESS), 7)
+            self.assertEqual(self.manager.acquire(self.ADDRESS), 8)
+
+    def test_gap_below_nonces_in_flight_is_reused_first(self):
+        for _ in range(3):
+            self.manager.acquire(self.ADDRESS)
+        AccountNonce.objects.filter(address=self.ADDRESS).update(reserved_nonces={'9': timezone.now().isoformat()})
+
+        # Nonces 7 and 8 were mined; the 8 never arrived, 9 is still in flight
+        self.chain_nonce = 8
+        self.manager.resync(self.ADDRESS)
+
+        self.assertEqual(self.manager.acquire(self.ADDRESS), 8)
+        self.assertEqual(self.manager.acquire(self.ADDRESS), 10)
+
+
+@override_settings(RECEIPT_CACHE_CONFIRMATIONS=3)
+class ReceiptCacheTest(TestCase):
+    """Tests for the finalized receipt/transaction cache"""
+
+    GROUP_WALLET = '0x000000000000000000000000000000000000dEaD'
+
+    def setUp(self):
+        reset_counters()
+        self.node = FakeRPCNode().start()
+        self.addCleanup(self.node.stop)
+        self.helper = AvalancheWeb3Helper(rpc_url=self.node.url)
+
+    def test_only_finalized_receipts_are_cached(self):
+        final_hash, recent_hash = '0x' + 'a' * 64, '0x' + 'b' * 64
+        self.node.add_transaction(final_hash, self.GROUP_WALLET, 10 ** 18)
+        self.node.mine(2)
+        self.node.add_transaction(recent_hash, self.GROUP_WALLET, 10 ** 18)
+        self.node.mine(2)
+
+        self.helper.fetch_transactions([final_hash, recent_hash])
+        self.node.request_count = 0
+        second = self.helper.fetch_transactions([final_hash, recent_hash])
+
+        self.assertEqual(self.node.request_count, 1)
+        self.assertEqual(second[final_hash]['receipt']['blockNumber'], 1)
+        self.assertTrue(CachedTransaction.objects.filter(transaction_hash=final_hash).exists())
+        self.assertFalse(CachedTransaction.objects.filter(transaction_hash=recent_hash).exists())
+
+    def test_database_level_survives_a_new_process(self):
+        tx_hash = '0x' + 'c' * 64
+        self.node.add_transaction(tx_hash, self.GROUP_WALLET, 10 ** 18)
+        self.node.mine(5)
+        self.helper.verify_transaction(tx_hash, Decimal('1'), self.GROUP_WALLET)
+
+        fresh_helper = AvalancheWeb3Helper(rpc_url=self.node.url)
+        self.node.request_count = 0
+        result = fresh_helper.verify_transaction(tx_hash, Decimal('1'), self.GROUP_WALLET)
+
+        self.assertTrue(result['is_valid'])
+        self.assertEqual(self.node.request_count, 0)
+        stats = receipt_cache_stats()
+        self.assertEqual(stats['receipt_cache.db_hits'], 1)
+        self.assertEqual(stats['receipt_cache.misses'], 1)
+        self.assertEqual(stats['rpc_calls_saved'], 2)
+
+
+@override_settings(GAS_ORACLE_TTL_SECONDS=60, GAS_BASE_FEE_MULTIPLIER=2, GAS_MIN_PRIORITY_FEE_GWEI=0)
+class GasOracleTest(TestCase):
+    """Tests for the shared EIP-1559 gas oracle"""
+
+    def setUp(self):
+        cache.clear()
+        self.fee_history_calls = 0
+        self.history = {
+            'baseFeePerGas': [20 * GWEI, 25 * GWEI, 30 * GWEI],
+            'reward': [[1 * GWEI], [3 * GWEI]],
+        }
+
+    def _fetch_fee_history(self, block_count, percentiles):
+        self.fee_history_calls += 1
+        if isinstance(self.history, Exception):
+            raise self.history
+        return self.history
+
+    def test_fees_are_computed_from_fee_history_and_cached(self):
+        oracle = GasOracle(self._fetch_fee_history, lambda: 99 * GWEI)
+
+        fees = oracle.get_fees()
+        again = GasOracle(self._fetch_fee_history, lambda: 99 * GWEI).get_fees()
+
+        self.assertEqual(fees, {'maxFeePerGas': 62 * GWEI, 'maxPriorityFeePerGas': 2 * GWEI})
+        self.assertEqual(again, fees)
+        self.assertEqual(self.fee_history_calls, 1)
+
+    def test_legacy_node_falls_back_to_gas_price(self):
+        self.history = ValueError('the method eth_feeHistory does not exist')
+
+        fees = GasOracle(self._fetch_fee_history, lambda: 30 * GWEI).get_fees()
+
+        self.assertEqual(fees, {'gasPrice': 30 * GWEI})
+
+    def test_unreachable_node_reuses_last_known_fees(self):
+        oracle = GasOracle(self._fetch_fee_history, lambda: 30 * GWEI)
+        fees = oracle.get_fees()
+        oracle.invalidate()
+
+        def unreachable():
+            raise ConnectionError('node down')
+        self.history = ConnectionError('node down')
+
+        self.assertEqual(GasOracle(self._fetch_fee_history, unreachable).get_fees(), fees)
+
+
+@override_settings(ADMIN_PRIVATE_KEY='0x' + '4c' * 32, GAS_ORACLE_TTL_SECONDS=60)
+class SendTransactionTest(TestCase):
+    """Tests for signing and broadcasting payouts"""
+
+    def setUp(self):
+        cache.clear()
+        self.node = FakeRPCNode().start()
+        self.addCleanup(self.node.stop)
+        self.helper = AvalancheWeb3Helper(rpc_url=self.node.url)
+
+    def test_back_to_back_payouts_share_fee_estimate_and_get_distinct_nonces(self):
+        hashes = [self.helper.send_transaction('0x' + f'{index:040x}', Decimal('0.5')) for index in range(1, 4)]
+
+        self.assertNotIn(None, hashes)
+        sent = [self.node.mempool[tx_hash] for tx_hash in hashes]
+        self.assertEqual([int(tx['nonce'], 16) for tx in sent], [0, 1, 2])
+        self.assertEqual(int(sent[0]['maxFeePerGas'], 16), 2 * 25 * GWEI + GWEI)
+        self.assertEqual(int(sent[0]['gas'], 16), 25200)
+        self.assertEqual(self.node.method_counts['eth_feeHistory'], 1)
+        self.assertEqual(self.node.method_counts['eth_getTransactionCount'], 1)
+
+    def test_transfer_to_a_contract_wallet_is_estimated_with_headroom(self):
+        wallet = '0x' + 'ab' * 20
+        self.node.receive_gas[wallet] = 9000
+
+        with override_settings(GAS_LIMIT_MULTIPLIER=1.5):
+            tx_hash = self.helper.send_transaction(wallet, Decimal('0.5'))
+
+        self.assertEqual(int(self.node.mempool[tx_hash]['gas'], 16), 45000)
+        self.assertEqual(self.node.method_counts['eth_estimateGas'], 1)
+
+    def test_broadcast_counts_as_sent_when_it_cannot_be_recorded(self):
+        with mock.patch('chama.web3_utils.OutgoingTransaction.objects.create', side_effect=Exception('database down')):
+            tx_hash = self.helper.send_transaction('0x' + '1' * 40, Decimal('0.5'))
+
+        # Reporting it as unsent would let the payout sweeper pay it again
+        self.assertIn(tx_hash, self.node.mempool)
+        self.assertFalse(OutgoingTransaction.objects.exists())
+
+
+class LazyWeb3ImportTest(TestCase):
+    """Importing the app must not load web3 until a chain call is made"""
+
+    def test_views_and_tasks_do_not_import_web3(self):
+        code = (
+            'import sys, django\n'
+            'django.setup()\n'
+            'import chama.views, chama.tasks\n'
+            'print(sorted(module for module in ("web3", "eth_account") if module in sys.modules))'
+        )
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='chama_backend.settings')
+        result = subprocess.run([sys.executable, '-c', code], cwd=settings.BASE_DIR, env=env,
+                                capture_output=True, text=True, check=True)
+
+        self.assertEqual(result.stdout.strip().splitlines()[-1], '[]')
+
+
+@override_settings(RPC_FAILURE_THRESHOLD=1, RPC_COOLDOWN_SECONDS=60, RPC_HEALTH_CHECK_INTERVAL_SECONDS=3600)
+class RPCPoolTest(TestCase):
+    """Tests for routing requests across several RPC endpoints"""
+
+    def start_node(self, **kwargs):
+        node = FakeRPCNode(**kwargs).start()
+        self.addCleanup(node.stop)
+        return node
+
+    def test_fails_over_and_benches_a_failing_endpoint(self):
+        broken, healthy = self.start_node(), self.start_node()
+        broken.fail = True
+        helper = AvalancheWeb3Helper(pool=RPCPool([broken.url, healthy.url], hedge_delay=0))
+
+        self.assertEqual(helper.get_block_number(), 1)
+        self.assertEqual(helper.get_block_number(), 1)
+
+        # The broken node is benched after its first failure and not retried
+        self.assertEqual(broken.request_count, 1)
+        self.assertEqual(healthy.request_count, 2)
+        self.assertEqual(helper.rpc_pool.ranked()[0].url, healthy.url)
+
+    def test_routes_to_the_lowest_latency_endpoint(self):
+        slow, fast = self.start_node(latency=0.1), self.start_node()
+        pool = RPCPool([slow.url, fast.url], hedge_delay=0)
+        helper = AvalancheWeb3Helper(pool=pool)
+
+        for _ in range(5):
+            helper.get_block_number()
+
+        # Each endpoint is measured once, then the faster one takes the traffic
+        self.assertEqual(slow.request_count, 1)
+        self.assertEqual(fast.request_count, 4)
+
+    def test_hedges_idempotent_reads_to_a_second_endpoint(self):
+        slow, fast = self.start_node(), self.start_node()
+        pool = RPCPool([slow.url, fast.url], hedge_delay=0.05)
+        pool.endpoints[0].latency, pool.endpoints[1].latency = 0.01, 0.02
+        slow.latency = 1.0
+        helper = AvalancheWeb3Helper(pool=pool)
+
+        node_calls = fast.request_count
+        helper.get_block_number()
+
+        self.assertEqual(fast.request_count, node_calls + 1)
+        self.assertLess(pool.endpoints[1].latency, 0.5)
+
+    def test_health_check_benches_endpoints_lagging_behind(self):
+        lagging, synced = self.start_node(), self.start_node()
+        synced.mine(10)
+        pool = RPCPool([lagging.url, synced.url])
+
+        with override_settings(RPC_MAX_BLOCK_LAG=5):
+            report = pool.check_health()
+
+        self.assertEqual([entry['healthy'] for entry in report], [False, True])
+        self.assertEqual([entry['block_number'] for entry in report], [1, 11])
+        self.assertEqual(pool.ranked()[0].url, synced.url)
+
+    def test_unsupported_method_is_answered_with_a_json_rpc_error(self):
+        node = self.start_node()
+
+        response = requests.post(node.url, json={'jsonrpc': '2.0', 'id': 7, 'method': 'debug_traceCall',
+                                                 'params': []}, timeout=5)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['id'], 7)
+        self.assertEqual(response.json()['error']['code'], -32601)
+
+
+@override_settings(ADMIN_PRIVATE_KEY='0x' + '4c' * 32, PAYOUT_BATCH_MODE=True,
+                   DISPERSE_CONTRACT_ADDRESS='0xD152f549545093347A162Dce210e7293f1452150')
+class BatchPayoutTest(ChamaFixturesMixin, TestCase):
+    """Tests for paying due payouts of many groups in one disperse transaction"""
+
+    def setUp(self):
+        cache.clear()
+        self.node = FakeRPCNode().start()
+        self.addCleanup(self.node.stop)
+        helper = AvalancheWeb3Helper(rpc_url=self.node.url)
+        patcher = mock.patch('chama.web3_utils.get_web3_helper', return_value=helper)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        creator = self.make_user(0)
+        self.payouts = []
+        for index in range(1, 4):
+            recipient = self.make_user(index, wallet_address='0x' + f'{index:040x}')
+            group = self.make_group(creator, name=f'Chama {index}')
+            GroupMembership.objects.create(user=recipient, group=group)
+            self.payouts.append(Payout.objects.create(
+                group=group, recipient=recipient, amount=Decimal(index), round_number=1,
+                scheduled_date=timezone.now().date()
+            ))
+
+    @mock.patch('chama.tasks.verify_payout_batch.apply_async')
+    def test_due_payouts_are_sent_and_completed_in_one_transaction(self, verify_later):
+        execute_batch_payouts()
+
+        batch = PayoutBatch.objects.get()
+        self.assertEqual(batch.status, 'sent')
+        self.assertEqual((batch.recipient_count, batch.total_amount), (3, Decimal('6.00')))
+        self.assertEqual(self.node.method_counts['eth_sendRawTransaction'], 1)
+        sent = self.node.mempool[batch.transaction_hash]
+        self.assertEqual(int(sent['value'], 16), 6 * 10 ** 18)
+        verify_later.assert_called_once_with(args=[str(batch.id)], countdown=settings.PAYOUT_BATCH_VERIFY_DELAY_SECONDS)
+
+        self.node.mine()
+        verify_payout_batch(str(batch.id))
+
+        batch.refresh_from_db()
+        self.assertEqual(batch.status, 'completed')
+        self.assertEqual(set(Payout.objects.values_list('status', 'transaction_hash')),
+                         {('completed', batch.transaction_hash)})
+        self.assertEqual(GroupMembership.objects.filter(has_received_payout=True).count(), 3)
+        ledger = Transaction.objects.filter(transaction_type='payout', transaction_hash=batch.transaction_hash)
+        self.assertEqual(sorted(ledger.values_list('batch_index', flat=True)), [0, 1, 2])
+        self.assertEqual(set(ledger.values_list('payout__amount', 'amount')),
+                         {(payout.amount, payout.amount) for payout in self.payouts})
+        # Completion emails are queued in the outbox with the ledger update
+        self.assertEqual(EmailOutbox.objects.filter(subject__startswith='Chama Payout Completed').count(), 3)
+
+    def test_payouts_are_rescheduled_when_the_batch_cannot_be_sent(self):
+        with override_settings(DISPERSE_CONTRACT_ADDRESS=''):
+            execute_batch_payouts()
+
+        self.assertEqual(PayoutBatch.objects.get().status, 'failed')
+        self.assertEqual(set(Payout.objects.values_list('status', 'batch')), {('scheduled', None)})
+
+
+@override_settings(WEB3_BATCH_MAX_SIZE=2)
+class BalanceServiceTest(ChamaFixturesMixin, TestCase):
+    """Tests for bulk wallet balances and snapshots"""
+
+    def setUp(self):
+        cache.clear()
+        self.node = FakeRPCNode().start()
+        self.addCleanup(self.node.stop)
+        self.service = BalanceService(helper=AvalancheWeb3Helper(rpc_url=self.node.url))
+
+        self.treasurer = self.make_user(1, wallet_address='0x' + '01' * 20)
+        self.member = self.make_user(2, wallet_address='0x' + '02' * 20)
+        self.group = self.make_group(self.treasurer)
+        GroupMembership.objects.create(user=self.treasurer, group=self.group, role='treasurer')
+        GroupMembership.objects.create(user=self.member, group=self.group)
+        for index, address in enumerate([self.treasurer.wallet_address, self.member.wallet_address, self.GROUP_WALLET]):
+            self.node.set_balance(address, (index + 1) * 10 ** 18)
+
+    def test_balances_are_batched_and_cached(self):
+        addresses = [self.treasurer.wallet_address, self.member.wallet_address, self.GROUP_WALLET]
+
+        first = self.service.get_balances(addresses)
+        second = self.service.get_balances(addresses)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first[self.GROUP_WALLET.lower()], Decimal(3))
+        # Three addresses in batches of two, and nothing more for the cached lookup
+        self.assertEqual(self.node.method_counts['eth_getBalance'], 3)
+        self.assertEqual(self.node.request_count, 2)
+
+    def test_treasurer_reads_snapshot_balances_without_chain_calls(self):
+        self.assertEqual(self.service.snapshot(), 3)
+        self.assertEqual(WalletBalanceSnapshot.objects.filter(owner_type='group', group=self.group).count(), 1)
+
+        client = APIClient()
+        requests_before = self.node.request_count
+        client.force_authenticate(self.member)
+        self.assertEqual(client.get(f'/api/groups/{self.group.id}/balances/').status_code,
+                         status.HTTP_403_FORBIDDEN)
+
+        client.force_authenticate(self.treasurer)
+        response = client.get(f'/api/groups/{self.group.id}/balances/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Decimal(response.data['group']['balance']), Decimal(3))
+        self.assertEqual(response.data['total_member_balance'], Decimal(3))
+        self.assertEqual(self.node.request_count, requests_before)
+
+
+@override_settings(CONFIRMATION_TRACKER_CONFIRMATIONS=2)
+class ConfirmationTrackerTest(ChamaFixturesMixin, TestCase):
+    """Tests for resolving awaited transactions as new blocks arrive"""
+
+    def setUp(self):
+        self.node = FakeRPCNode().start()
+        self.addCleanup(self.node.stop)
+        self.tracker = ConfirmationTracker(helper=AvalancheWeb3Helper(rpc_url=self.node.url))
+        self.member = self.make_user(1, wallet_address='0x' + '01' * 20)
+        self.group = self.make_group(self.member)
+        GroupMembership.objects.create(user=self.member, group=self.group)
+        self.tracker.process_head(self.node.block_number)
+
+    def test_resolves_contributions_and_payouts_once_deep_enough(self):
+        contribution = self.make_contribution(self.group, self.member, '0x' + 'a' * 64)
+        payout = Payout.objects.create(
+            group=self.group, recipient=self.member, amount=Decimal('1.00'), round_number=1,
+            scheduled_date=timezone.now().date(), status='processing', transaction_hash='0x' + 'b' * 64
+        )
+        self.node.mine()
+        self.node.add_transaction(contribution.transaction_hash, self.GROUP_WALLET, 10 ** 18)
+        self.node.add_transaction(payout.transaction_hash, self.member.wallet_address, 10 ** 18)
+
+        summary = self.tracker.process_head(self.node.block_number)
+        self.assertEqual(summary['confirmed'], 0)
+        self.assertEqual(self.tracker.depth(contribution.transaction_hash), 1)
+
+        self.node.mine()
+        calls = self.node.call_count
+        summary = self.tracker.process_head(self.node.block_number)
+
+        self.assertEqual(summary['confirmed'], 2)
+        self.assertEqual(summary['groups'], {self.group.id})
+        contribution.refresh_from_db()
+        payout.refresh_from_db()
+        self.assertEqual((contribution.status, payout.status), ('confirmed', 'completed'))
+        self.assertTrue(GroupMembership.objects.get(user=self.member).has_received_payout)
+        # One block fetch, one contribution batch and one payout batch for both hashes
+        self.assertEqual(self.node.call_count - calls, 1 + 3 + 3)
+
+    @override_settings(CONFIRMATION_TRACKER_CONFIRMATIONS=1)
+    def test_reorg_reverts_and_then_reconfirms_contribution(self):
+        contribution = self.make_contribution(self.group, self.member, '0x' + 'c' * 64)
+        self.node.mine()
+        self.node.add_transaction(contribution.transaction_hash, self.GROUP_WALLET, 10 ** 18)
+        mined_in = self.node.block_number
+        self.tracker.process_head(mined_in)
+        contribution.refresh_from_db()
+        self.assertEqual((contribution.status, contribution.block_number), ('confirmed', mined_in))
+
+        # The block is replaced and the transaction goes back to the mempool
+        self.node.reorg(mined_in)
+        self.node.mine(include_mempool=False)
+        summary = self.tracker.process_head(self.node.block_number)
+
+        self.assertEqual(summary['reorged_from'], mined_in)
+        contribution.refresh_from_db()
+        self.assertEqual((contribution.status, contribution.block_number), ('pending', None))
+        self.assertFalse(Transaction.objects.filter(contribution=contribution).exists())
+
+        self.node.mine()
+        self.tracker.process_head(self.node.block_number)
+        contribution.refresh_from_db()
+        self.assertEqual((contribution.status, contribution.block_number), ('confirmed', self.node.block_number))
+
+
+@override_settings(ADMIN_PRIVATE_KEY='0x' + '4c' * 32, PAYOUT_STUCK_AFTER_SECONDS=0, PAYOUT_FEE_BUMP_PERCENT=20)
+class PendingTransactionMonitorTest(ChamaFixturesMixin, TestCase):
+    """Tests for replacing stuck payout transactions"""
+
+    def setUp(self):
+        cache.clear()
+        self.node = FakeRPCNode().start()
+        self.addCleanup(self.node.stop)
+        self.helper = AvalancheWeb3Helper(rpc_url=self.node.url)
+        self.monitor = PendingTransactionMonitor(helper=self.helper)
+
+        recipient = self.make_user(1, wallet_address='0x' + '01' * 20)
+        self.payout = Payout.objects.create(
+            group=self.make_group(recipient), recipient=recipient, amount=Decimal('1.00'), round_number=1,
+            scheduled_date=timezone.now().date(), status='processing'
+        )
+        tx_hash = self.helper.send_transaction(recipient.wallet_address, self.payout.amount)
+        Payout.objects.filter(id=self.payout.id).update(transaction_hash=tx_hash)
+        OutgoingTransaction.objects.filter(transaction_hash=tx_hash).update(payout=self.payout)
+
+    def test_stuck_payout_is_replaced_with_higher_fee_and_then_mined(self):
+        outgoing = OutgoingTransaction.objects.get()
+        with override_settings(PAYOUT_STUCK_AFTER_SECONDS=3600):
+            self.assertEqual(self.monitor.run()['replaced'], 0)
+
+        self.assertEqual(self.monitor.run()['replaced'], 1)
+
+        replaced = OutgoingTransaction.objects.get()
+        self.payout.refresh_from_db()
+        self.assertEqual(replaced.replaced_hashes, [outgoing.transaction_hash])
+        self.assertEqual(self.payout.transaction_hash, replaced.transaction_hash)
+        self.assertEqual(list(self.node.mempool), [replaced.transaction_hash])
+        self.assertEqual(int(self.node.mempool[replaced.transaction_hash]['nonce'], 16), outgoing.nonce)
+        self.assertGreaterEqual(replaced.max_fee_per_gas, outgoing.max_fee_per_gas * 1.2)
+
+        self.node.mine()
+        self.assertEqual(self.monitor.run()['mined'], 1)
+        self.assertEqual(OutgoingTransaction.objects.get().status, 'mined')
+        self.payout.refresh_from_db()
+        self.assertEqual((self.payout.status, self.payout.transaction_hash), ('completed', replaced.transaction_hash))
+        self.assertTrue(Transaction.objects.filter(payout=self.payout, status='confirmed').exists())
+
+    @override_settings(CONFIRMATION_TRACKER_CONFIRMATIONS=3)
+    def test_payout_is_completed_once_its_transaction_is_deep_enough(self):
+        self.node.mine()
+        self.assertEqual(self.monitor.run()['mined'], 0)
+        self.assertEqual(self.monitor.run()['replaced'], 0)
+
+        self.node.mine(2)
+        self.assertEqual(self.monitor.run()['mined'], 1)
+        self.payout.refresh_from_db()
+        self.assertEqual(self.payout.status, 'completed')
+
+    def test_used_nonce_with_a_lagging_receipt_is_not_marked_dropped(self):
+        self.node.mine()
+        calls = []
+        fetch, count = self.helper.fetch_transactions, self.helper.get_transaction_count
+
+        def lagging_fetch(hashes):
+            calls.append('receipts')
+            results = fetch(hashes)
+            if calls.count('receipts') == 1:
+                # The first node asked has not seen the block yet
+                results = {tx_hash: {**result, 'receipt': None} for tx_hash, result in results.items()}
+            return results
+
+        def counting_nonce(address):
+            calls.append('nonce')
+            return count(address)
+
+        with mock.patch.object(self.helper, 'fetch_transactions', side_effect=lagging_fetch), \
+                mock.patch.object(self.helper, 'get_transaction_count', side_effect=counting_nonce):
+            summary = self.monitor.run()
+
+        self.assertEqual(calls, ['nonce', 'receipts', 'receipts'])
+        self.assertEqual((summary['mined'], summary['dropped']), (1, 0))
+        self.payout.refresh_from_db()
+        self.assertEqual(self.payout.status, 'completed')
+
+
+class ContributionReminderTest(ChamaFixturesMixin, TestCase):
+    """Tests for the batched contribution reminder pipeline"""
+
+    def setUp(self):
+        cache.clear()
+        reset_counters()
+        creator = self.make_user(0)
+        self.members = [self.make_user(index) for index in range(1, 4)]
+        for index in range(3):
+            group = self.make_group(creator, name=f'Chama {index}')
+            for member in self.members:
+                GroupMembership.objects.create(user=member, group=group)
+        # One member already paid in the first group
+        self.paid = self.make_contribution(ChamaGroup.objects.get(name='Chama 0'), self.members[0], '0x' + 'd' * 64)
+        confirm_contributions([(self.paid, {'block_number': 1})])
+
+    def test_owing_members_are_queued_in_batches_and_drained_over_one_connection(self):
+        summary = send_contribution_reminders(batch_size=4)
+
+        self.assertEqual(summary, {'batches': 2, 'queued': 8})
+        self.assertEqual(get_counters(['reminders.queued'])['reminders.queued'], 8)
+        self.assertNotIn(('member1@example.com', 'Contribution Reminder - Chama 0'),
+                         list(EmailOutbox.objects.values_list('to_email', 'subject')))
+        self.assertEqual(len(mail.outbox), 0)
+
+        with mock.patch('users.outbox.get_connection', wraps=get_connection) as connection_factory:
+            delivered = drain_outbox(batch_size=3)
+
+        connection_factory.assert_called_once()
+        self.assertEqual((delivered['batches'], delivered['sent']), (3, 8))
+        self.assertEqual(len(mail.outbox), 8)
+
+
+class RoundTest(ChamaFixturesMixin, TestCase):
+    """Tests for incrementally maintained contribution rounds"""
+
+    def setUp(self):
+        cache.clear()
+        creator = self.make_user(0)
+        self.group = self.make_group(creator)
+        self.members = [self.make_user(index) for index in range(1, 4)]
+        for position, member in enumerate(self.members, start=1):
+            GroupMembership.objects.create(user=member, group=self.group, payout_position=position)
+        sync_expected_members(self.group.id)
+
+    def contribute(self, member, index, block_number=1):
+        contribution = self.make_contribution(self.group, member, '0x' + f'{index:064x}')
+        confirm_contributions([(contribution, {'block_number': block_number})])
+        return contribution
+
+    def test_confirmed_contributions_update_the_open_round(self):
+        self.contribute(self.members[0], 1)
+        self.contribute(self.members[0], 2)
+        self.contribute(self.members[1], 3, block_number=5)
+
+        current = Round.objects.get(group=self.group, status='open')
+        self.assertEqual((current.number, current.expected_members, current.contributed_count),
+                         (1, 3, 2))
+        self.assertEqual(current.total_amount, 3 * self.group.contribution_amount)
+        self.assertTrue(has_contributed_this_round(self.group.id, self.members[0].id))
+        self.assertFalse(has_contributed_this_round(self.group.id, self.members[2].id))
+
+        revert_orphaned_blocks(5)
+        current.refresh_from_db()
+        self.assertEqual((current.contributed_count, current.total_amount), (1, 2 * self.group.contribution_amount))
+
+    @mock.patch('chama.tasks.execute_payout.apply_async')
+    def test_complete_round_is_closed_with_a_payout(self, execute_later):
+        for index, member in enumerate(self.members, start=1):
+            self.contribute(member, index)
+
+        with mock.patch('chama.tasks.schedule_next_payout.delay') as schedule:
+            # The completion check reads the round, not the contributions
+            with self.assertNumQueries(1):
+                check_round_completion(str(self.group.id))
+        schedule.assert_called_once_with(str(self.group.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule_next_payout(str(self.group.id))
+
+        payout = Payout.objects.get()
+        self.assertEqual((payout.recipient, payout.round_number, payout.amount),
+                         (self.members[0], 1, 3 * self.group.contribution_amount))
+        closed, opened = Round.objects.filter(group=self.group).order_by('number')
+        self.assertEqual((closed.status, closed.payout), ('completed', payout))
+        self.assertEqual((opened.number, opened.status, opened.contributed_count), (2, 'open', 0))
+        self.assertFalse(has_contributed_this_round(self.group.id, self.members[0].id))
+        # The payout is left for the sweeper rather than held as an ETA task
+        execute_later.assert_not_called()
+
+    def test_payouts_rotate_through_members_across_cycles(self):
+        recipients = []
+        for number in range(7):
+            for index, member in enumerate(self.members):
+                self.contribute(member, number * len(self.members) + index + 1)
+            schedule_next_payout(str(self.group.id))
+            recipients.append(Payout.objects.get(group=self.group, round_number=number + 1).recipient)
+
+        # Unconfirmed payouts and has_received_payout play no part in the rotation
+        self.assertEqual(recipients, (self.members * 3)[:7])
+
+        # A member who left is skipped and the rotation continues after their position
+        GroupMembership.objects.filter(user=self.members[1]).update(status='left')
+        sync_expected_members(self.group.id)
+        for index, member in enumerate((self.members[0], self.members[2]), start=100):
+            self.contribute(member, index)
+        schedule_next_payout(str(self.group.id))
+        self.assertEqual(Payout.objects.get(group=self.group, round_number=8).recipient, self.members[2])
+
+
+class GroupLockTest(ChamaFixturesMixin, TestCase):
+    """Tests for the per-group lock serializing payout scheduling"""
+
+    def setUp(self):
+        self.group = self.make_group(self.make_user(0))
+        member = self.make_user(1)
+        GroupMembership.objects.create(user=member, group=self.group)
+        contribution = self.make_contribution(self.group, member, '0x' + 'e' * 64)
+        confirm_contributions([(contribution, {'block_number': 1})])
+
+    def test_concurrent_scheduling_fails_fast_instead_of_racing(self):
+        with group_lock(self.group.id):
+            with self.assertRaises(GroupLockUnavailable):
+                with group_lock(self.group.id):
+                    pass
+            schedule_next_payout(str(self.group.id))
+            self.assertFalse(Payout.objects.exists())
+
+        schedule_next_payout(str(self.group.id))
+        schedule_next_payout(str(self.group.id))
+        self.assertEqual(Payout.objects.count(), 1)
+
+    def test_lease_of_a_dead_holder_expires(self):
+        GroupLock.objects.create(group=self.group, owner='gone', locked_until=timezone.now() - timedelta(seconds=1))
+
+        with group_lock(self.group.id):
+            self.assertNotEqual(GroupLock.objects.get(group=self.group).owner, 'gone')
+        self.assertIsNone(GroupLock.objects.get(group=self.group).locked_until)
+
+
+@override_settings(ADMIN_PRIVATE_KEY='0x' + '4c' * 32, PAYOUT_BATCH_MODE=False, PAYOUT_CLAIM_LEASE_SECONDS=600)
+class PayoutSweeperTest(ChamaFixturesMixin, TestCase):
+    """Tests for sending due payouts from the database sweeper"""
+
+    def setUp(self):
+        cache.clear()
+        self.node = FakeRPCNode().start()
+        self.addCleanup(self.node.stop)
+        self.helper = AvalancheWeb3Helper(rpc_url=self.node.url)
+        patcher = mock.patch('chama.web3_utils.get_web3_helper', return_value=self.helper)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        creator = self.make_user(0)
+        now = timezone.now()
+        self.payouts = {}
+        cases = {
+            'due': (now.date(), None),
+            'overdue': (now.date() - timedelta(days=2), None),
+            'claimed': (now.date(), now - timedelta(minutes=1)),
+            'abandoned': (now.date(), now - timedelta(hours=1)),
+            'future': (now.date() + timedelta(days=1), None),
+        }
+        for index, (name, (scheduled_date, claimed_at)) in enumerate(cases.items(), start=1):
+            recipient = self.make_user(index, wallet_address='0x' + f'{index:040x}')
+            self.payouts[name] = Payout.objects.create(
+                group=self.make_group(creator, name=f'Chama {index}'), recipient=recipient, amount=Decimal(index),
+                round_number=1, scheduled_date=scheduled_date, claimed_at=claimed_at
+            )
+
+    def test_sweep_sends_due_unclaimed_payouts_in_batches(self):
+        with override_settings(PAYOUT_SWEEP_BATCH_SIZE=2):
+            sweep_due_payouts()
+
+        statuses = {name: Payout.objects.get(id=payout.id) for name, payout in self.payouts.items()}
+        self.assertEqual({name for name, payout in statuses.items() if payout.status == 'processing'},
+                         {'due', 'overdue', 'abandoned'})
+        self.assertEqual(self.node.method_counts['eth_sendRawTransaction'], 3)
+        self.assertIsNone(statuses['abandoned'].claimed_at)
+        self.assertEqual(OutgoingTransaction.objects.filter(payout__isnull=False).count(), 3)
+
+        # Nothing is left to claim, so a second sweep is a no-op
+        sweep_due_payouts()
+        self.assertEqual(self.node.method_counts['eth_sendRawTransaction'], 3)
+
+    def test_failed_send_keeps_the_claim_until_it_expires(self):
+        with mock.patch('chama.tasks.send_payout_transaction', return_value=None):
+            execute_payout(self.payouts['due'].id)
+
+        payout = Payout.objects.get(id=self.payouts['due'].id)
+        self.assertEqual(payout.status, 'scheduled')
+        self.assertIsNotNone(payout.claimed_at)
+        self.assertEqual(claim_due_payouts(10, payout_ids=[payout.id]), [])
+
+    def test_send_that_may_have_reached_the_node_is_held_for_review(self):
+        send = self.helper.w3.eth.send_raw_transaction
+
+        def accepted_then_timed_out(raw):
+            send(raw)
+            raise requests.exceptions.ReadTimeout('read timed out')
+
+        with mock.patch.object(self.helper.w3.eth, 'send_raw_transaction', side_effect=accepted_then_timed_out):
+            execute_payout(self.payouts['due'].id)
+
+        payout = Payout.objects.get(id=self.payouts['due'].id)
+        self.assertEqual(payout.status, 'needs_review')
+        self.assertEqual([payout.transaction_hash], list(self.node.mempool))
+        with override_settings(PAYOUT_CLAIM_LEASE_SECONDS=0):
+            self.assertEqual(claim_due_payouts(10, payout_ids=[payout.id]), [])
+
+    def test_sent_payout_that_cannot_be_recorded_is_not_sent_again(self):
+        with mock.patch('chama.tasks.OutgoingTransaction.objects.filter', side_effect=DatabaseError('database down')):
+            execute_payout(self.payouts['due'].id)
+
+        payout = Payout.objects.get(id=self.payouts['due'].id)
+        self.assertEqual((payout.status, [payout.transaction_hash]), ('needs_review', list(self.node.mempool)))
+        with override_settings(PAYOUT_CLAIM_LEASE_SECONDS=0):
+            execute_payout(payout.id)
+        self.assertEqual(self.node.method_counts['eth_sendRawTransaction'], 1)
+
+
+class BulkContributionVerificationTest(ChamaFixturesMixin, TestCase):
+    """Tests for verifying many pending contributions in one task"""
+
+    def setUp(self):
+        cache.clear()
+        reset_counters()
+        self.node = FakeRPCNode().start()
+        self.addCleanup(self.node.stop)
+        patcher = mock.patch('chama.tasks.get_web3_helper', return_value=AvalancheWeb3Helper(rpc_url=self.node.url))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.member = self.make_user(1)
+        self.group = self.make_group(self.member)
+
+    def submit(self, count, offset=0, **transaction_kwargs):
+        contributions = []
+        for index in range(offset + 1, offset + count + 1):
+            contribution = self.make_contribution(self.group, self.member, '0x' + f'{index:064x}')
+            self.node.add_transaction(contribution.transaction_hash, self.GROUP_WALLET, 10 ** 18, **transaction_kwargs)
+            contributions.append(contribution)
+        self.node.mine()
+        return [str(contribution.id) for contribution in contributions]
+
+    @mock.patch('chama.tasks.check_round_completion.apply_async')
+    def test_database_and_rpc_work_does_not_grow_with_the_batch(self, round_check):
+        # The first confirmation also opens the group's round
+        verify_contributions_bulk(self.submit(1))
+
+        small = self.submit(2, offset=1) + self.submit(1, offset=3, status=0)
+        with CaptureQueriesContext(connection) as small_queries:
+            verify_contributions_bulk(small)
+        large = self.submit(15, offset=4) + self.submit(1, offset=19, status=0)
+        requests_before = self.node.request_count
+        with CaptureQueriesContext(connection) as large_queries:
+            verify_contributions_bulk(large + [str(uuid.uuid4())])
+
+        self.assertEqual(len(large_queries), len(small_queries))
+        self.assertLessEqual(self.node.request_count - requests_before, 2)
+        self.assertEqual(Contribution.objects.filter(status='confirmed').count(), 18)
+        self.assertEqual(Contribution.objects.filter(status='failed').count(), 2)
+        self.assertEqual(Transaction.objects.filter(transaction_type='contribution').count(), 18)
+        round_check.assert_called_once()
+
+    @mock.patch('chama.tasks.verify_contributions_bulk.delay')
+    def test_submissions_are_coalesced_into_bulk_tasks(self, verify):
+        pending = [self.make_contribution(self.group, self.member, '0x' + f'{index:064x}') for index in range(1, 21)]
+        with mock.patch('chama.tasks.dispatch_contribution_verification.apply_async') as dispatch:
+            for _ in pending:
+                request_contribution_verification()
+        dispatch.assert_called_once()
+
+        with override_settings(CONTRIBUTION_VERIFY_BATCH_SIZE=8):
+            dispatch_contribution_verification()
+        self.assertEqual([len(call.args[0]) for call in verify.call_args_list], [8, 8, 4])
+        self.assertEqual(get_counters(['verifications.coalesced'])['verifications.coalesced'], 19)
+
+    @mock.patch('chama.tasks.verify_contributions_bulk.delay')
+    @override_settings(CONTRIBUTION_VERIFY_BATCH_SIZE=2, CONTRIBUTION_VERIFY_MAX_BATCHES=2)
+    def test_unresolved_contributions_back_off_instead_of_starving_new_ones(self, verify):
+        stuck = [self.make_contribution(self.group, self.member, '0x' + f'{index:064x}') for index in range(1, 7)]
+
+        def dispatched():
+            verify.reset_mock()
+            dispatch_contribution_verification()
+            return {contribution_id for call in verify.call_args_list for contribution_id in call.args[0]}
+
+        first = dispatched()
+        self.assertEqual(first, {str(contribution.id) for contribution in stuck[:4]})
+
+        fresh = [self.make_contribution(self.group, self.member, '0x' + f'{index:064x}') for index in range(7, 9)]
+        second = dispatched()
+        self.assertEqual(second, {str(contribution.id) for contribution in stuck[4:] + fresh})
+        self.assertEqual(dispatched(), set())
+
+        backed_off = Contribution.objects.get(id=stuck[0].id)
+        self.assertEqual(backed_off.verification_attempts, 1)
+        self.assertGreater(backed_off.next_verification_at, timezone.now())
+
+    @mock.patch('chama.tasks.verify_contributions_bulk.delay')
+    def test_beat_redispatches_a_backed_off_contribution_once_it_is_due(self, verify):
+        from chama_backend.celery import app
+
+        scheduled = {entry['task'] for entry in app.conf.beat_schedule.values()}
+        self.assertIn('chama.tasks.dispatch_contribution_verification', scheduled)
+
+        contribution = self.make_contribution(self.group, self.member, '0x' + 'c' * 64)
+        dispatch_contribution_verification()
+        verify.reset_mock()
+        dispatch_contribution_verification()
+        verify.assert_not_called()
+
+        Contribution.objects.filter(id=contribution.id).update(next_verification_at=timezone.now() - timedelta(seconds=1))
+        dispatch_contribution_verification()
+        verify.assert_called_once_with([str(contribution.id)])
+        self.assertEqual(Contribution.objects.get(id=contribution.id).verification_attempts, 2)
+
+
+class ContributionIntakeTest(ChamaFixturesMixin, TestCase):
+    """Tests for idempotent contribution submission"""
+
+    def setUp(self):
+        cache.clear()
+        self.member = self.make_user(1)
+        self.group = self.make_group(self.make_user(0))
+        GroupMembership.objects.create(user=self.member, group=self.group)
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+        self.deduplicator = ContributionDeduplicator()
+        patcher = mock.patch('chama.views.get_contribution_deduplicator', return_value=self.deduplicator)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def submit(self, tx_hash, **headers):
+        return self.client.post('/api/contributions/make/', {
+            'group_id': str(self.group.id), 'amount': '1.00', 'transaction_hash': tx_hash
+        }, format='json', **headers)
+
+    @mock.patch('chama.views.request_contribution_verification')
+    def test_resubmitted_transaction_returns_the_existing_contribution(self, verify):
+        tx_hash = '0x' + 'AB' * 32
+        created = self.submit(tx_hash)
+        self.assertEqual(created.status_code, status.HTTP_201_CREATED)
+
+        with CaptureQueriesContext(connection) as queries:
+            repeated = self.submit(tx_hash.lower(), HTTP_IDEMPOTENCY_KEY='retry-1')
+        self.assertFalse([query for query in queries if not query['sql'].startswith('SELECT')])
+        # The new idempotency key is ruled out by the filter without a query
+        self.assertFalse([query for query in queries if 'idempotency_key" =' in query['sql']])
+
+        self.assertEqual(repeated.status_code, status.HTTP_200_OK)
+        self.assertEqual(repeated.data['id'], created.data['id'])
+        self.assertEqual(Contribution.objects.count(), 1)
+        verify.assert_called_once()
+
+    @mock.patch('chama.views.request_contribution_verification')
+    def test_idempotency_key_replays_the_first_response(self, verify):
+        first = self.submit('0x' + '01' * 32, HTTP_IDEMPOTENCY_KEY='submit-42')
+        replay = self.submit('0x' + '02' * 32, HTTP_IDEMPOTENCY_KEY='submit-42')
+
+        self.assertEqual(replay.status_code, status.HTTP_200_OK)
+        self.assertEqual(replay.data['id'], first.data['id'])
+        self.assertEqual(Contribution.objects.get().idempotency_key, 'submit-42')
+        verify.assert_called_once()
+
+    @mock.patch('chama.views.request_contribution_verification')
+    def test_duplicates_missed_by_the_filter_are_caught_by_the_unique_index(self, verify):
+        existing = self.make_contribution(self.group, self.member, '0x' + 'cd' * 32)
+        self.deduplicator.filter = BloomFilter(1000, 0.01)  # warmed before the row existed
+
+        response = self.submit(existing.transaction_hash)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], str(existing.id))
+        verify.assert_not_called()
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(1000, 0.01)
+        items = [f'tx:{index}' for index in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        self.assertTrue(all(bloom.might_contain(item) for item in items))
+        false_positives = sum(bloom.might_contain(f'other:{index}') for index in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_filter_is_preloaded_when_a_server_or_worker_starts(self):
+        existing = self.make_contribution(self.group, self.member, '0x' + 'ef' * 32)
+        config = apps.get_app_config('chama')
+        with mock.patch('chama.dedup.get_contribution_deduplicator', return_value=self.deduplicator), \
+                mock.patch('chama.dedup.connection'), \
+                mock.patch('threading.Thread.start', lambda thread: thread.run()), \
+                mock.patch.object(sys, 'argv', ['celery', '-A', 'chama_backend', 'worker']):
+            config.ready()
+
+        with self.assertNumQueries(1):  # only the possible match is checked
+            self.assertEqual(self.deduplicator.find_by_transaction_hash(existing.transaction_hash), existing)
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.deduplicator.find_by_transaction_hash('0x' + '12' * 32))
+
+    def test_filter_is_not_preloaded_by_management_commands(self):
+        with mock.patch('chama.dedup.preload_in_background') as preload, \
+                mock.patch.object(sys, 'argv', ['manage.py', 'migrate']):
+            apps.get_app_config('chama').ready()
+
+        preload.assert_not_called()
+
+
+class RoundCheckCoalescingTest(ChamaFixturesMixin, TestCase):
+    """Tests for coalesced round completion checks"""
+
+    def setUp(self):
+        cache.clear()
+        reset_counters()
+        self.group = self.make_group(self.make_user(0))
+
+    @mock.patch('chama.tasks.check_round_completion.apply_async')
+    def test_burst_of_requests_schedules_one_check(self, schedule):
+        scheduled = [request_round_check(self.group.id) for _ in range(50)]
+
+        self.assertEqual(scheduled.count(True), 1)
+        schedule.assert_called_once_with(args=[str(self.group.id)], countdown=settings.ROUND_CHECK_DELAY_SECONDS)
+        self.assertEqual(get_counters(['round_checks.scheduled', 'round_checks.coalesced']),
+                         {'round_checks.scheduled': 1, 'round_checks.coalesced': 49})
+
+        # Once the check starts, new contributions need a new check
+        check_round_completion(str(self.group.id))
+        self.assertTrue(request_round_check(self.group.id))
+        self.assertEqual(schedule.call_count, 2)
+
+
+class GroupStatsQueryTest(ChamaFixturesMixin, TestCase):
+    """Tests that group lists serialize their counts without a query per row"""
+
+    def setUp(self):
+        self.member = self.make_user(1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def add_group(self, index):
+        group = self.make_group(self.member, name=f'Chama {index}')
+        GroupMembership.objects.create(user=self.member, group=group, status='active')
+        self.make_contribution(group, self.member, f'0x{index:064x}', status='confirmed')
+        return group
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries), response.data['results']
+
+    def test_list_query_count_does_not_grow_with_rows(self):
+        self.add_group(1)
+        single = {url: self.count_queries(url)[0] for url in ('/api/groups/', '/api/contributions/')}
+
+        for index in range(2, 6):
+            self.add_group(index)
+        for url, expected in single.items():
+            count, results = self.count_queries(url)
+            self.assertEqual(count, expected, url)
+            self.assertEqual(len(results), 5)
+
+        group = self.count_queries('/api/groups/')[1][0]
+        self.assertEqual((group['total_members'], group['current_contributions']), (1, 1))
+
+    def test_group_routes_serialize_stats_in_constant_queries(self):
+        group = self.add_group(1)
+        members_url = f'/api/groups/{group.id}/members/'
+        single = self.count_queries(members_url)[0]
+
+        for index in range(2, 6):
+            GroupMembership.objects.create(user=self.make_user(index), group=group, status='active')
+        count, results = self.count_queries(members_url)
+        self.assertEqual(count, single)
+        self.assertEqual({row['group']['total_members'] for row in results}, {5})
+
+        with CaptureQueriesContext(connection) as queries:
+            detail = self.client.get(f'/api/groups/{group.id}/')
+        self.assertEqual(detail.data['total_members'], 5)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(self.client.get(f'/api/groups/{group.id}/stats/').data['total_members'], 5)
+
+    def test_my_groups_contribution_status_in_constant_queries(self):
+        groups = [self.add_group(index) for index in range(1, 6)]
+        confirm_contributions([(self.make_contribution(groups[0], self.member, '0x' + 'a' * 64), {'block_number': 1})])
+
+        # Page count, memberships with their status, then the prefetched groups
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/my-groups/')
+
+        statuses = {row['group']['name']: row['contribution_status'] for row in response.data['results']}
+        self.assertEqual(statuses.pop('Chama 1'), 'contributed')
+        self.assertEqual(set(statuses.values()), {'pending'})
+
+
+class KeysetPaginationTest(ChamaFixturesMixin, TestCase):
+    """Tests for cursor pagination of the ledger endpoints"""
+
+    def setUp(self):
+        self.member = self.make_user(1)
+        self.group = self.make_group(self.member)
+        GroupMembership.objects.create(user=self.member, group=self.group, status='active')
+        for index in range(5):
+            self.make_contribution(self.group, self.member, f'0x{index:064x}')
+        # Ties on the timestamp must be broken by id
+        Contribution.objects.update(contribution_date=timezone.now())
+        self.expected = [str(pk) for pk in Contribution.objects.order_by('-contribution_date', '-id').values_list('id', flat=True)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def walk(self, url, link):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([row['id'] for row in response.data['results']])
+            url = response.data[link]
+        return pages
+
+    def test_cursor_walks_every_row_once_in_both_directions(self):
+        with CaptureQueriesContext(connection) as queries:
+            forward = self.walk('/api/contributions/?page_size=2', 'next')
+        self.assertEqual([row for page in forward for row in page], self.expected)
+        self.assertEqual([len(page) for page in forward], [2, 2, 1])
+        self.assertFalse([query for query in queries if query['sql'].startswith('SELECT COUNT(*)')])
+
+        last_page = self.client.get('/api/contributions/?page_size=2').data['next']
+        last_page = self.client.get(last_page).data['next']
+        backward = self.walk(self.client.get(last_page).data['previous'], 'previous')
+        self.assertEqual(backward, [self.expected[2:4], self.expected[0:2]])
+
+    def test_group_contributions_and_payouts_page_by_cursor(self):
+        for round_number in range(1, 4):
+            Payout.objects.create(group=self.group, recipient=self.member, amount=Decimal('5.00'),
+                                  round_number=round_number, scheduled_date=timezone.now().date())
+        payouts = [str(pk) for pk in Payout.objects.order_by('-scheduled_date', '-id').values_list('id', flat=True)]
+
+        contributions = self.walk(f'/api/groups/{self.group.id}/contributions/?page_size=2', 'next')
+        self.assertEqual(contributions, [self.expected[0:2], self.expected[2:4], self.expected[4:]])
+        self.assertEqual(self.walk(f'/api/groups/{self.group.id}/payouts/?page_size=2', 'next'),
+                         [payouts[0:2], payouts[2:]])
+
+    def test_page_number_mode_is_opt_in(self):
+        response = self.client.get('/api/contributions/?page=2&page_size=2')
+
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual([row['id'] for row in response.data['results']], self.expected[2:4])
+        self.assertEqual(self.client.get('/api/contributions/?cursor=garbage').status_code, status.HTTP_404_NOT_FOUND)
+
+
+class HotQueryIndexTest(TestCase):
+    """Tests that the hot ledger queries are planned on their indexes"""
+
+    def test_every_hot_query_uses_a_ledger_index(self):
+        out = StringIO()
+        call_command('explain_hot_queries', seed=2000, stdout=out)
+
+        headings = [line for line in out.getvalue().splitlines() if re.match(r'^[a-z ]+: ', line)]
+        self.assertEqual(len(headings), 11)
+        self.assertFalse([heading for heading in headings if heading.endswith('no ledger index')])
+        self.assertFalse(Contribution.objects.exists())
+
+
+class GroupSearchTest(ChamaFixturesMixin, TestCase):
+    """Tests for ranked prefix search over groups"""
+
+    def setUp(self):
+        self.creator = self.make_user(1)
+        self.make_group(self.creator, name='Mombasa Traders', description='Saving towards a plot of land')
+        self.make_group(self.creator, name='Savannah Investors', description='Monthly investment club')
+        self.make_group(self.creator, name='Kisumu Fishers', description='Boat repairs fund')
+        self.client = APIClient()
+        self.client.force_authenticate(self.creator)
+
+    def search(self, query):
+        response = self.client.get('/api/groups/', {'search': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [group['name'] for group in response.data['results']]
+
+    def test_prefix_matches_are_ranked_and_follow_saves(self):
+        self.assertEqual(get_search_backend().name, 'sqlite')
+        self.assertEqual(self.search('sav'), ['Savannah Investors', 'Mombasa Traders'])
+        self.assertEqual(self.search('mon inv'), ['Savannah Investors'])
+        self.assertEqual(self.search('%'), [])
+
+        group = ChamaGroup.objects.get(name='Kisumu Fishers')
+        group.description = 'Savings for new nets'
+        group.save()
+        ChamaGroup.objects.get(name='Mombasa Traders').delete()
+        self.assertEqual(self.search('sav'), ['Savannah Investors', 'Kisumu Fishers'])
+
+    @override_settings(CHAMA_SEARCH_MAX_RESULTS=1)
+    def test_result_limit_counts_only_visible_groups(self):
+        self.make_group(self.creator, name='Savers Sacco', description='Savings savings savings', status='completed')
+
+        self.assertEqual(self.search('sav'), ['Savannah Investors'])
+
+    def test_like_backend_matches_every_word(self):
+        results = LikeSearchBackend().search(ChamaGroup.objects.all(), 'sav land')
+        self.assertEqual([group.name for group in results], ['Mombasa Traders'])
@@ -0,0 +1,191 @@
+import logging
+import math
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .gas_oracle import GWEI
+from .ledger import confirm_payout_batch, confirm_payouts, fail_payout_batch, fail_payouts
+from .models import OutgoingTransaction, Payout, PayoutBatch
+from .web3_utils import get_web3_helper
+
+logger = logging.getLogger(__name__)
+
+
+class PendingTransactionMonitor:
+    """
+    Watches broadcast transactions until they are mined, and settles the
+    payouts they pay.
+
+    Every pending ``OutgoingTransaction`` is checked with one batched lookup of
+    its current and replaced hashes. Once a version is mined
+    ``CONFIRMATION_TRACKER_CONFIRMATIONS`` deep, its payout or batch is
+    completed (or failed, if it reverted), so payouts resolve from this beat
+    task even without the confirmation tracker running. One that stays unmined for
+    ``PAYOUT_STUCK_AFTER_SECONDS`` (or was dropped from the mempool) is
+    re-signed with the same nonce and fees raised by at least
+    ``PAYOUT_FEE_BUMP_PERCENT``, and the payout or batch is pointed at the new
+    hash. Fees never exceed ``PAYOUT_MAX_FEE_GWEI``. A transaction whose nonce
+    was used up by a transaction we do not know about is marked dropped.
+    """
+
+    def __init__(self, helper=None):
+        self.helper = helper or get_web3_helper()
+
+    def run(self) -> Dict[str, int]:
+        summary = {'pending': 0, 'mined': 0, 'replaced': 0, 'dropped': 0}
+        pending = list(OutgoingTransaction.objects.filter(status='pending'))
+        if not pending:
+            return summary
+        summary['pending'] = len(pending)
+
+        # Nonces are read before receipts: a transaction mined in between then
+        # shows up with its receipt instead of as a used nonce with none
+        chain_nonces = {address: self.helper.get_transaction_count(address)
+                        for address in {outgoing.from_address for outgoing in pending}}
+        hashes = [tx_hash for outgoing in pending for tx_hash in all_hashes(outgoing)]
+        fetched = self.helper.fetch_transactions(hashes)
+        stuck_before = timezone.now() - timedelta(seconds=settings.PAYOUT_STUCK_AFTER_SECONDS)
+        fees = head = None
+
+        for outgoing in pending:
+            mined_hash = mined_version(outgoing, fetched)
+            if not mined_hash and chain_nonces[outgoing.from_address] > outgoing.nonce:
+                # Check again before giving up: the receipt may not have reached
+                # the node that answered the batched lookup
+                fetched.update(self.helper.fetch_transactions(all_hashes(outgoing)))
+                mined_hash = mined_version(outgoing, fetched)
+                if not mined_hash:
+                    # The nonce was used by a transaction we never sent or lost track of
+                    logger.error(f"Nonce {outgoing.nonce} of {outgoing.from_address} was used by an unknown transaction")
+                    self._mark_dropped(outgoing)
+                    summary['dropped'] += 1
+                    continue
+            if mined_hash:
+                receipt = fetched[mined_hash]['receipt']
+                if head is None:
+                    head = self.helper.get_block_number()
+                if head is None or head - receipt['blockNumber'] + 1 < settings.CONFIRMATION_TRACKER_CONFIRMATIONS:
+                    # Mined but not deep enough to settle yet; never replaced from here on
+                    continue
+                self._mark_mined(outgoing, mined_hash, receipt)
+                summary['mined'] += 1
+            elif outgoing.broadcast_at <= stuck_before or not fetched[outgoing.transaction_hash]['transaction']:
+                if outgoing.attempts > settings.PAYOUT_MAX_FEE_BUMPS:
+                    logger.error(f"Transaction {outgoing.transaction_hash} still stuck after {outgoing.attempts} attempts")
+                    continue
+                if fees is None:
+                    # Fee estimates may be stale during a spike, refresh them once per run
+                    self.helper.gas_oracle.invalidate()
+                    fees = self.helper.get_fees()
+                if self._replace(outgoing, fees):
+                    summary['replaced'] += 1
+
+        logger.info(
+            f"Monitored {summary['pending']} pending transactions: {summary['mined']} mined, "
+            f"{summary['replaced']} replaced, {summary['dropped']} dropped"
+        )
+        return summary
+
+    def _replace(self, outgoing: OutgoingTransaction, current_fees: Dict[str, int]) -> bool:
+        fees = bumped_fees(outgoing, current_fees)
+        if fees is None:
+            logger.error(f"Not replacing {outgoing.transaction_hash}: fee would exceed PAYOUT_MAX_FEE_GWEI")
+            return False
+
+        try:
+            new_hash = self.helper.replace_transaction(outgoing, fees)
+        except Exception as e:
+            # 'nonce too low' means one of the versions was just mined; the next run will see it
+            if 'nonce too low' not in str(e).lower():
+                logger.error(f"Error replacing transaction {outgoing.transaction_hash}: {e}")
+            return False
+
+        with transaction.atomic():
+            outgoing.replaced_hashes = [*outgoing.replaced_hashes, outgoing.transaction_hash]
+            outgoing.transaction_hash = new_hash
+            outgoing.max_fee_per_gas = fees.get('maxFeePerGas')
+            outgoing.max_priority_fee_per_gas = fees.get('maxPriorityFeePerGas')
+            outgoing.gas_price = fees.get('gasPrice')
+            outgoing.attempts += 1
+            outgoing.broadcast_at = timezone.now()
+            outgoing.save()
+            self._point_payments_at(outgoing, new_hash)
+
+        logger.warning(f"Replaced stuck transaction {outgoing.replaced_hashes[-1]} with {new_hash}")
+        return True
+
+    def _mark_mined(self, outgoing: OutgoingTransaction, mined_hash: str, receipt: Dict) -> None:
+        with transaction.atomic():
+            if mined_hash != outgoing.transaction_hash:
+                # An earlier, cheaper version won the race
+                logger.info(f"Replaced transaction {mined_hash} was mined instead of {outgoing.transaction_hash}")
+                outgoing.transaction_hash = mined_hash
+                self._point_payments_at(outgoing, mined_hash)
+            outgoing.status = 'mined'
+            outgoing.mined_at = timezone.now()
+            outgoing.save(update_fields=['transaction_hash', 'status', 'mined_at'])
+            self._settle_payments(outgoing, receipt)
+
+    def _mark_dropped(self, outgoing: OutgoingTransaction) -> None:
+        with transaction.atomic():
+            outgoing.status = 'dropped'
+            outgoing.save(update_fields=['status'])
+            # Left for manual review rather than paid again automatically
+            Payout.objects.filter(id=outgoing.payout_id, status='processing').update(status='failed')
+            if outgoing.batch_id:
+                Payout.objects.filter(batch_id=outgoing.batch_id, status='processing').update(status='failed')
+                PayoutBatch.objects.filter(id=outgoing.batch_id, status='sent').update(status='failed')
+
+    @staticmethod
+    def _settle_payments(outgoing: OutgoingTransaction, receipt: Dict) -> None:
+        """Complete or fail what a mined transaction paid; ones already settled by the tracker are skipped"""
+        succeeded = receipt.get('status') == 1
+        if outgoing.payout_id:
+            paid = [(payout, receipt) for payout in Payout.objects.filter(id=outgoing.payout_id, status='processing')]
+            if succeeded:
+                confirm_payouts(paid)
+            else:
+                fail_payouts(paid)
+        batch = PayoutBatch.objects.filter(id=outgoing.batch_id, status='sent').first() if outgoing.batch_id else None
+        if batch is not None:
+            if succeeded:
+                confirm_payout_batch(batch, receipt)
+            else:
+                fail_payout_batch(batch, receipt)
+
+    @staticmethod
+    def _point_payments_at(outgoing: OutgoingTransaction, tx_hash: str) -> None:
+        if outgoing.payout_id:
+            Payout.objects.filter(id=outgoing.payout_id).update(transaction_hash=tx_hash)
+        if outgoing.batch_id:
+            PayoutBatch.objects.filter(id=outgoing.batch_id).update(transaction_hash=tx_hash)
+            Payout.objects.filter(batch_id=outgoing.batch_id).update(transaction_hash=tx_hash)
+
+
+def all_hashes(outgoing: OutgoingTransaction):
+    return [outgoing.transaction_hash, *outgoing.replaced_hashes]
+
+
+def mined_version(outgoing: OutgoingTransaction, fetched) -> Optional[str]:
+    """The hash of whichever version of the transaction has a receipt, if any"""
+    return next((tx_hash for tx_hash in all_hashes(outgoing) if (fetched.get(tx_hash) or {}).get('receipt')), None)
+
+
+def bumped_fees(outgoing: OutgoingTransaction, current_fees: Dict[str, int]) -> Optional[Dict[str, int]]:
+    """Fees for a replacement: the current estimate, but at least the configured bump over the old fees"""
+    bump = 1 + settings.PAYOUT_FEE_BUMP_PERCENT / 100
+    max_fee = int(settings.PAYOUT_MAX_FEE_GWEI * GWEI)
+
+    if outgoing.max_fee_per_gas is not None:
+        fee = max(math.ceil(outgoing.max_fee_per_gas * bump), current_fees.get('maxFeePerGas', 0))
+        tip = max(math.ceil(outgoing.max_priority_fee_per_gas * bump), current_fees.get('maxPriorityFeePerGas', 0))
+        if fee > max_fee:
+            return None
+        return {'maxFeePerGas': fee, 'maxPriorityFeePerGas': min(tip, fee)}
+
+    gas_price = max(math.ceil(outgoing.gas_price * bump), current_fees.get('gasPrice', current_fees.get('maxFeePerGas', 0)))
+    return {'gasPrice': gas_price} if gas_price <= max_fee else None
@@ -0,0 +1,36 @@
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = 'chama:verification:pending'
+
+
+def request_contribution_verification() -> bool:
+    """Schedule a bulk verification of pending contributions, coalescing repeated requests.
+
+    Submitted contributions are not verified one task each: the first
+    request schedules ``dispatch_contribution_verification`` after
+    ``CONTRIBUTION_VERIFY_DELAY_SECONDS`` and later requests ride along with
+    it. Beat also runs the dispatch every minute, so contributions whose
+    back-off has passed are checked again without new submissions. Returns
+    whether a dispatch was scheduled.
+    """
+    from .tasks import dispatch_contribution_verification
+
+    timeout = settings.CONTRIBUTION_VERIFY_DELAY_SECONDS + settings.CONTRIBUTION_VERIFY_MARKER_GRACE_SECONDS
+    if not cache.add(PENDING_KEY, 1, timeout=timeout):
+        metrics.incr('verifications.coalesced')
+        return False
+
+    dispatch_contribution_verification.apply_async(countdown=settings.CONTRIBUTION_VERIFY_DELAY_SECONDS)
+    return True
+
+
+def clear_pending() -> None:
+    """Called when a dispatch starts, so contributions submitted later trigger a new one"""
+    cache.delete(PENDING_KEY)
@@ -2,11 +2,20 @@ from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.db import IntegrityError, transaction
 from django.db.models import Sum, Q, Max
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
-from .models import ChamaGroup, GroupMembership, Contribution, Payout, Transaction
-from .tasks import verify_blockchain_transaction
+from .models import ChamaGroup, GroupMembership, Contribution, Payout, Transaction, group_stats_prefetch
+from .verification import request_contribution_verification
+from .dedup import get_contribution_deduplicator
+from .ledger import sync_expected_members
+from .pagination import KeysetPagination
+from .search import get_search_backend
+from . import metrics
+from .metrics import get_counters
+from .balances import latest_snapshots
+from .receipt_cache import receipt_cache_stats
 from .serializers import (
     ChamaGroupSerializer,
     GroupMembershipSerializer,
@@ -25,12 +34,10 @@ class ChamaGroupListCreateView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        queryset = ChamaGroup.objects.filter(status='active')
+        queryset = ChamaGroup.objects.filter(status='active').with_group_stats()
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) | Q(description__icontains=search)
-            )
+            queryset = get_search_backend().search(queryset, search)
         return queryset
 
 
@@ -41,8 +48,8 @@ class ChamaGroupDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         return ChamaGroup.objects.filter(
-            Q(created_by=self.request.user) | Q(members__user=self.request.user)
-        ).distinct()
+            Q(created_by=self.request.user) | Q(memberships__user=self.request.user)
+        ).distinct().with_group_stats()
 
 
 class JoinGroupView(APIView):
@@ -63,6 +70,7 @@ class JoinGroupView(APIView):
             group=group,
             position_in_rotation=last_position + 1
         )
+        sync_expected_members(group.id)
         
         return Response(
             GroupMembershipSerializer(membership).data,
@@ -86,8 +94,8 @@ class LeaveGroupView(APIView):
             
             # Check for pending contributions
             pending_contributions = membership.group.contributions.filter(
-                user=request.user,
-                is_confirmed=False
+                member=request.user,
+                status='pending'
             ).exists()
             
             if pending_contributions:
@@ -97,6 +105,7 @@ class LeaveGroupView(APIView):
                 )
             
             membership.delete()
+            sync_expected_members(group_id)
             return Response({'message': 'Successfully left the group'})
             
         except GroupMembership.DoesNotExist:
@@ -111,7 +120,10 @@ class UserGroupsView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return GroupMembership.objects.filter(user=self.request.user).select_related('group')
+        return (
+            GroupMembership.objects.filter(user=self.request.user)
+            .with_contribution_status().prefetch_related(group_stats_prefetch())
+        )
 
 
 class GroupMembersView(generics.ListAPIView):
@@ -123,83 +135,154 @@ class GroupMembersView(generics.ListAPIView):
         # Ensure user is a member of the group or is the creator
         group = get_object_or_404(ChamaGroup, id=group_id)
         if not (group.created_by == self.request.user or 
-                group.members.filter(user=self.request.user).exists()):
+                group.memberships.filter(user=self.request.user).exists()):
             return GroupMembership.objects.none()
         
-        return GroupMembership.objects.filter(group_id=group_id).select_related('user')
+        return (
+            GroupMembership.objects.filter(group_id=group_id)
+            .select_related('user').prefetch_related(group_stats_prefetch())
+        )
 
 
 class MakeContributionView(APIView):
+    """
+    Record a contribution transaction submitted by a member.
+
+    Resubmissions are idempotent: a request carrying an ``Idempotency-Key``
+    header already used by the member, or a transaction hash that was
+    already submitted, returns the existing contribution without writing or
+    queueing anything.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
+        deduplicator = get_contribution_deduplicator()
+        idempotency_key = request.headers.get('Idempotency-Key', '').strip() or None
+        if idempotency_key and len(idempotency_key) > 64:
+            return Response({'error': 'Idempotency-Key must be at most 64 characters'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        if idempotency_key:
+            existing = deduplicator.find_by_idempotency_key(request.user, idempotency_key)
+            if existing:
+                return self.existing_response(existing, request.user)
+        
         serializer = MakeContributionSerializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
+        transaction_hash = serializer.validated_data['transaction_hash']
+        
+        existing = deduplicator.find_by_transaction_hash(transaction_hash)
+        if existing:
+            return self.existing_response(existing, request.user)
         
         group = get_object_or_404(ChamaGroup, id=serializer.validated_data['group_id'])
-          # Create contribution record
-        contribution = Contribution.objects.create(
-            user=request.user,
-            group=group,
-            amount=serializer.validated_data['amount'],
-            transaction_hash=serializer.validated_data['transaction_hash']
-        )
+        try:
+            # Create contribution record; the unique constraints catch
+            # resubmissions the in-process filter has not seen
+            with transaction.atomic():
+                contribution = Contribution.objects.create(
+                    member=request.user,
+                    group=group,
+                    amount=serializer.validated_data['amount'],
+                    expected_amount=group.contribution_amount,
+                    due_date=timezone.now().date(),
+                    transaction_hash=transaction_hash,
+                    idempotency_key=idempotency_key
+                )
+        except IntegrityError:
+            lookup = Q(transaction_hash=transaction_hash)
+            if idempotency_key:
+                lookup |= Q(member=request.user, idempotency_key=idempotency_key)
+            existing = Contribution.objects.filter(lookup).first()
+            if existing is None:
+                raise
+            deduplicator.remember(existing)
+            return self.existing_response(existing, request.user)
+        
+        deduplicator.remember(contribution)
         
-        # Verify transaction on blockchain asynchronously
-        verify_blockchain_transaction.delay(contribution.id)
+        # Verify transaction on blockchain asynchronously, together with other submissions
+        request_contribution_verification()
         
         return Response(
             ContributionSerializer(contribution).data,
             status=status.HTTP_201_CREATED
         )
 
+    def existing_response(self, contribution, user):
+        metrics.incr('contribution_intake.duplicates')
+        if contribution.member_id != user.id:
+            return Response({'error': 'This transaction was already submitted by another member'},
+                            status=status.HTTP_409_CONFLICT)
+        return Response(ContributionSerializer(contribution).data, status=status.HTTP_200_OK)
+
 
 class UserContributionsView(generics.ListAPIView):
     serializer_class = ContributionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-contribution_date', '-id')
 
     def get_queryset(self):
-        queryset = Contribution.objects.filter(user=self.request.user).select_related('group')
+        queryset = (
+            Contribution.objects.filter(member=self.request.user)
+            .select_related('member').prefetch_related(group_stats_prefetch())
+        )
         group_id = self.request.query_params.get('group_id')
         if group_id:
             queryset = queryset.filter(group_id=group_id)
-        return queryset.order_by('-created_at')
+        return queryset
 
 
 class GroupContributionsView(generics.ListAPIView):
     serializer_class = ContributionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-contribution_date', '-id')
 
     def get_queryset(self):
         group_id = self.kwargs['group_id']
         # Ensure user is a member of the group
         group = get_object_or_404(ChamaGroup, id=group_id)
-        if not group.members.filter(user=self.request.user).exists():
+        if not group.memberships.filter(user=self.request.user).exists():
             return Contribution.objects.none()
         
-        return Contribution.objects.filter(group_id=group_id).select_related('user').order_by('-created_at')
+        return (
+            Contribution.objects.filter(group_id=group_id)
+            .select_related('member').prefetch_related(group_stats_prefetch())
+        )
 
 
 class GroupPayoutsView(generics.ListAPIView):
     serializer_class = PayoutSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-scheduled_date', '-id')
 
     def get_queryset(self):
         group_id = self.kwargs['group_id']
         # Ensure user is a member of the group
         group = get_object_or_404(ChamaGroup, id=group_id)
-        if not group.members.filter(user=self.request.user).exists():
+        if not group.memberships.filter(user=self.request.user).exists():
             return Payout.objects.none()
         
-        return Payout.objects.filter(group_id=group_id).select_related('recipient').order_by('-scheduled_date')
+        return (
+            Payout.objects.filter(group_id=group_id)
+            .select_related('recipient').prefetch_related(group_stats_prefetch())
+        )
 
 
 class UserTransactionsView(generics.ListAPIView):
     serializer_class = TransactionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
-        return Transaction.objects.filter(user=self.request.user).select_related('group').order_by('-created_at')
+        return (
+            Transaction.objects.filter(user=self.request.user)
+            .select_related('user').prefetch_related(group_stats_prefetch())
+        )
 
 
 class GroupStatsView(APIView):
@@ -210,22 +293,25 @@ class GroupStatsView(APIView):
         
         # Ensure user is a member or creator
         if not (group.created_by == request.user or 
-                group.members.filter(user=request.user).exists()):
+                group.memberships.filter(user=request.user).exists()):
             return Response(
                 {'error': 'You do not have access to this group'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
         # Calculate stats
-        total_contributions = group.contributions.filter(is_confirmed=True).aggregate(
+        total_contributions = group.contributions.filter(status='confirmed').aggregate(
             total=Sum('amount')
         )['total'] or 0
         
         total_members = group.members.count()
-        completed_rounds = group.payouts.filter(is_completed=True).count()
+        completed_rounds = group.payouts.filter(status='completed').count()
         
         # Get next payout info
-        next_payout = group.payouts.filter(is_completed=False).order_by('scheduled_date').first()
+        next_payout = (
+            group.payouts.filter(status__in=['scheduled', 'processing'])
+            .select_related('recipient').order_by('scheduled_date').first()
+        )
         next_payout_date = next_payout.scheduled_date if next_payout else None
         next_recipient = next_payout.recipient if next_payout else None
         
@@ -241,6 +327,49 @@ class GroupStatsView(APIView):
         return Response(serializer.data)
 
 
+class GroupBalancesView(APIView):
+    """Latest recorded balances of a group wallet and its members' wallets"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, group_id):
+        group = get_object_or_404(ChamaGroup, id=group_id)
+        
+        # Only group admins, treasurers and staff can see member balances
+        if not (request.user.is_staff or group.created_by == request.user or
+                group.memberships.filter(user=request.user, role__in=['admin', 'treasurer'], status='active').exists()):
+            return Response(
+                {'error': 'You do not have access to this group\'s balances'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        memberships = list(
+            group.memberships.filter(status='active').select_related('user')
+        )
+        snapshots = latest_snapshots(
+            [group.contract_address] + [membership.user.wallet_address for membership in memberships]
+        )
+        
+        def balance_entry(address):
+            snapshot = snapshots.get(address.lower()) if address else None
+            return {
+                'address': address,
+                'balance': snapshot.balance if snapshot else None,
+                'block_number': snapshot.block_number if snapshot else None,
+                'taken_at': snapshot.taken_at if snapshot else None,
+            }
+        
+        members = [
+            {'user_id': membership.user_id, 'email': membership.user.email, 'role': membership.role,
+             **balance_entry(membership.user.wallet_address)}
+            for membership in memberships
+        ]
+        return Response({
+            'group': balance_entry(group.contract_address),
+            'members': members,
+            'total_member_balance': sum(member['balance'] for member in members if member['balance'] is not None),
+        })
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def dashboard_stats(request):
@@ -252,17 +381,17 @@ def dashboard_stats(request):
     
     # Total contributions made
     total_contributions = Contribution.objects.filter(
-        user=user, is_confirmed=True
+        member=user, status='confirmed'
     ).aggregate(total=Sum('amount'))['total'] or 0
     
     # Payouts received
     payouts_received = Payout.objects.filter(
-        recipient=user, is_completed=True
+        recipient=user, status='completed'
     ).aggregate(total=Sum('amount'))['total'] or 0
     
     # Pending payouts
     pending_payouts = Payout.objects.filter(
-        recipient=user, is_completed=False
+        recipient=user, status__in=['scheduled', 'processing']
     ).count()
     
     return Response({
@@ -271,3 +400,12 @@ def dashboard_stats(request):
         'payouts_received': payouts_received,
         'pending_payouts': pending_payouts
     })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def metrics_view(request):
+    """Get operational counters (cache hits, coalesced jobs, ...)"""
+    counters = get_counters()
+    counters.update(receipt_cache_stats())
+    return Response(counters)
@@ -1,31 +1,77 @@
+import asyncio
 import json
 import logging
 from decimal import Decimal
-from typing import Dict, Any, Optional
-from web3 import Web3
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+import threading
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from eth_account import Account
+from django.db import transaction as db_transaction
+from django.utils import timezone
+from .gas_oracle import GasOracle
+from .models import OutgoingTransaction
+from .nonce_manager import NonceManager, is_ambiguous_error
+from .receipt_cache import ReceiptCache
+from .rpc_pool import RPCPool, get_rpc_pool
 
 logger = logging.getLogger(__name__)
 
+# Hex-encoded quantities returned by the node that we decode to ints
+TRANSACTION_QUANTITY_FIELDS = ('value', 'gas', 'gasPrice', 'nonce', 'blockNumber', 'transactionIndex',
+                               'maxFeePerGas', 'maxPriorityFeePerGas', 'chainId', 'type')
+RECEIPT_QUANTITY_FIELDS = ('status', 'gasUsed', 'cumulativeGasUsed', 'effectiveGasPrice',
+                           'blockNumber', 'transactionIndex', 'type')
+BLOCK_QUANTITY_FIELDS = ('number', 'timestamp', 'gasUsed', 'gasLimit', 'baseFeePerGas')
+
+WEI_PER_AVAX = Decimal(10) ** 18
+
+# disperseEther from the widely deployed Disperse contract (disperse.app)
+DISPERSE_ABI = [{
+    'name': 'disperseEther',
+    'type': 'function',
+    'stateMutability': 'payable',
+    'inputs': [{'name': 'recipients', 'type': 'address[]'}, {'name': 'values', 'type': 'uint256[]'}],
+    'outputs': [],
+}]
+
+
+class BroadcastUncertain(Exception):
+    """Raised when a transaction may or may not have reached the node, so it must not be sent again blindly"""
+
+    def __init__(self, message: str, tx_hash: str):
+        super().__init__(message)
+        # Hash of the signed transaction, to look it up on chain
+        self.tx_hash = tx_hash
+
 
 class AvalancheWeb3Helper:
     """Helper class for interacting with Avalanche blockchain"""
     
-    def __init__(self):
-        # Initialize Web3 connection
-        self.w3 = Web3(Web3.HTTPProvider(settings.AVALANCHE_RPC_URL))
+    def __init__(self, rpc_url: Optional[str] = None, pool: Optional[RPCPool] = None):
+        # web3 is slow to import, so it is only loaded once a helper is needed
+        from web3 import Web3
+        from .providers import PooledHTTPProvider
+        
+        # Initialize Web3 connection; by default requests are spread over AVALANCHE_RPC_URLS
+        if pool is None:
+            pool = RPCPool([rpc_url]) if rpc_url else get_rpc_pool()
+        self.rpc_pool = pool
+        self.w3 = Web3(PooledHTTPProvider(pool))
         
         # Add middleware for Avalanche (which is POA-based)
         # Note: Avalanche C-Chain is EVM compatible, so we might not need special middleware
         
         # Set default account if private key is provided
         if settings.ADMIN_PRIVATE_KEY:
-            account = Account.from_key(settings.ADMIN_PRIVATE_KEY)
+            account = self.w3.eth.account.from_key(settings.ADMIN_PRIVATE_KEY)
             self.w3.eth.default_account = account.address
             self.default_account = account
         else:
             self.default_account = None
+        
+        self.nonce_manager = NonceManager(self.get_pending_nonce)
+        self.receipt_cache = ReceiptCache()
+        self.gas_oracle = GasOracle(self.get_fee_history, lambda: self.w3.eth.gas_price)
     
     def is_connected(self) -> bool:
         """Check if connected to Avalanche network"""
@@ -45,109 +91,249 @@ class AvalancheWeb3Helper:
             logger.error(f"Error getting balance for {address}: {e}")
             return Decimal('0')
     
-    def get_transaction_receipt(self, tx_hash: str) -> Optional[Dict[str, Any]]:
-        """Get transaction receipt"""
+    def get_balances(self, addresses: Iterable[str]) -> Dict[str, Optional[Decimal]]:
+        """Get AVAX balances for many addresses using JSON-RPC batches.
+
+        Addresses the node returned an error for map to None.
+        """
+        addresses = list(dict.fromkeys(addresses))
+        balances = {}
+
+        for chunk in _chunked(addresses, settings.WEB3_BATCH_MAX_SIZE):
+            responses = self.w3.provider.make_batch_request(
+                [('eth_getBalance', [address, 'latest']) for address in chunk]
+            )
+            if not isinstance(responses, list):
+                raise ValueError(f"Error fetching balances: {_rpc_error_message(responses)}")
+            for address, response in zip(chunk, responses):
+                error = _rpc_error_message(response)
+                if error:
+                    logger.error(f"Error getting balance for {address}: {error}")
+                balances[address] = None if error else _from_wei(_to_int(response['result']))
+
+        return balances
+
+    def get_block_number(self) -> Optional[int]:
+        """Get the latest block number"""
         try:
-            receipt = self.w3.eth.get_transaction_receipt(tx_hash)
-            return dict(receipt)
+            return self.w3.eth.block_number
         except Exception as e:
-            logger.error(f"Error getting transaction receipt for {tx_hash}: {e}")
+            logger.error(f"Error getting block number: {e}")
             return None
+
+    def get_blocks(self, block_numbers: Iterable[int],
+                   full_transactions: bool = True) -> Dict[int, Optional[Dict[str, Any]]]:
+        """Fetch many blocks using JSON-RPC batches, keyed by block number"""
+        block_numbers = list(block_numbers)
+        blocks = {}
+
+        for chunk in _chunked(block_numbers, settings.WEB3_BATCH_MAX_SIZE):
+            batch = [('eth_getBlockByNumber', [hex(number), full_transactions]) for number in chunk]
+            responses = self.w3.provider.make_batch_request(batch)
+            if not isinstance(responses, list):
+                raise ValueError(f"Error fetching blocks: {_rpc_error_message(responses)}")
+            for number, response in zip(chunk, responses):
+                if _rpc_error_message(response):
+                    raise ValueError(f"Error fetching block {number}: {_rpc_error_message(response)}")
+                blocks[number] = _parse_block(response.get('result'))
+
+        return blocks
+
+    def get_transaction_receipt(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Get transaction receipt"""
+        return self.fetch_transactions([tx_hash])[tx_hash]['receipt']
     
+    def fetch_transactions(self, tx_hashes: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch transactions and receipts for many hashes using JSON-RPC batches.
+
+        Every hash costs two calls (``eth_getTransactionByHash`` and
+        ``eth_getTransactionReceipt``) but they all travel in a single HTTP
+        request per ``WEB3_BATCH_MAX_SIZE`` hashes. Finalized results are
+        served from, and saved to, the receipt cache.
+        """
+        tx_hashes = list(dict.fromkeys(tx_hashes))
+        results = self.receipt_cache.get_many(tx_hashes)
+
+        for chunk in _chunked([tx_hash for tx_hash in tx_hashes if tx_hash not in results],
+                              settings.WEB3_BATCH_MAX_SIZE):
+            try:
+                responses = self.w3.provider.make_batch_request(_transaction_batch(chunk))
+            except Exception as e:
+                logger.error(f"Error fetching transaction batch: {e}")
+                responses = {'error': {'message': str(e)}}
+            fetched, head_block = _parse_transaction_batch(chunk, responses)
+            if head_block is not None:
+                self.receipt_cache.store_many(fetched, head_block)
+            results.update(fetched)
+
+        return results
+
+    def verify_transactions(self, checks: Iterable[Tuple[str, Decimal, str]]) -> Dict[str, Dict[str, Any]]:
+        """Verify many transactions against their expected amount and recipient.
+
+        ``checks`` is an iterable of ``(tx_hash, expected_amount, expected_to_address)``
+        tuples. Returns the verification result of every hash, keyed by hash.
+        """
+        checks = list(checks)
+        fetched = self.fetch_transactions(tx_hash for tx_hash, _, _ in checks)
+        return {
+            tx_hash: _build_verification_result(tx_hash, fetched[tx_hash], expected_amount, expected_to_address)
+            for tx_hash, expected_amount, expected_to_address in checks
+        }
+
     def verify_transaction(self, tx_hash: str, expected_amount: Decimal, 
                           expected_to_address: str) -> Dict[str, Any]:
         """Verify a transaction matches expected parameters"""
-        try:
-            # Get transaction details
-            tx = self.w3.eth.get_transaction(tx_hash)
-            receipt = self.w3.eth.get_transaction_receipt(tx_hash)
-            
-            # Convert amount to wei for comparison
-            expected_amount_wei = self.w3.to_wei(expected_amount, 'ether')
-            
-            verification_result = {
-                'is_valid': False,
-                'tx_hash': tx_hash,
-                'from_address': tx['from'],
-                'to_address': tx['to'],
-                'amount': self.w3.from_wei(tx['value'], 'ether'),
-                'gas_used': receipt['gasUsed'],
-                'block_number': receipt['blockNumber'],
-                'status': receipt['status'],
-                'errors': []
-            }
-            
-            # Verify transaction succeeded
-            if receipt['status'] != 1:
-                verification_result['errors'].append('Transaction failed')
-                return verification_result
-            
-            # Verify recipient address
-            if tx['to'].lower() != expected_to_address.lower():
-                verification_result['errors'].append('Recipient address mismatch')
-            
-            # Verify amount (allow small gas differences)
-            if abs(tx['value'] - expected_amount_wei) > self.w3.to_wei(0.001, 'ether'):
-                verification_result['errors'].append('Amount mismatch')
-            
-            # If no errors, transaction is valid
-            if not verification_result['errors']:
-                verification_result['is_valid'] = True
-            
-            return verification_result
-            
-        except Exception as e:
-            logger.error(f"Error verifying transaction {tx_hash}: {e}")
-            return {
-                'is_valid': False,
-                'tx_hash': tx_hash,
-                'errors': [f'Verification error: {str(e)}']
-            }
+        return self.verify_transactions([(tx_hash, expected_amount, expected_to_address)])[tx_hash]
     
     def estimate_gas(self, transaction: Dict[str, Any]) -> int:
-        """Estimate gas for a transaction"""
-        try:
-            return self.w3.eth.estimate_gas(transaction)
-        except Exception as e:
-            logger.error(f"Error estimating gas: {e}")
-            return 21000  # Default gas limit
+        """Estimate the gas limit for a transaction, with ``GAS_LIMIT_MULTIPLIER`` headroom.
+
+        Plain transfers are estimated too, since a contract wallet's receive
+        function costs more than 21000 gas. Estimation errors are raised, as
+        they mean the transaction would revert.
+        """
+        estimate = self.w3.eth.estimate_gas({key: transaction[key] for key in ('from', 'to', 'value', 'data')
+                                             if key in transaction})
+        return int(estimate * settings.GAS_LIMIT_MULTIPLIER)
+    
+    def get_fee_history(self, block_count: int, reward_percentiles: List[float]) -> Dict[str, Any]:
+        """Get base fees and priority fee percentiles of recent blocks"""
+        return dict(self.w3.eth.fee_history(block_count, 'latest', reward_percentiles))
+    
+    def get_fees(self) -> Dict[str, int]:
+        """Get fee fields for a new transaction from the shared gas oracle"""
+        return self.gas_oracle.get_fees()
     
     def get_gas_price(self) -> int:
-        """Get current gas price"""
-        try:
-            return self.w3.eth.gas_price
-        except Exception as e:
-            logger.error(f"Error getting gas price: {e}")
-            return self.w3.to_wei(25, 'gwei')  # Default gas price
+        """Get the highest price per gas a new transaction would currently pay"""
+        fees = self.get_fees()
+        return fees.get('maxFeePerGas', fees.get('gasPrice'))
     
+    def get_pending_nonce(self, address: str) -> int:
+        """Get the number of transactions sent from an address, including pending ones"""
+        return self.w3.eth.get_transaction_count(self.w3.to_checksum_address(address), 'pending')
+
     def send_transaction(self, to_address: str, amount: Decimal, 
                         private_key: Optional[str] = None) -> Optional[str]:
         """Send AVAX transaction"""
+        return self._sign_and_send({'to': to_address, 'value': self.w3.to_wei(amount, 'ether')}, private_key)
+
+    def send_disperse_transaction(self, recipients: Iterable[Tuple[str, Decimal]],
+                                  private_key: Optional[str] = None) -> Optional[str]:
+        """Pay many recipients in one transaction through the disperse contract"""
+        if not settings.DISPERSE_CONTRACT_ADDRESS:
+            logger.error("DISPERSE_CONTRACT_ADDRESS is not configured")
+            return None
+
+        recipients = list(recipients)
+        addresses = [self.w3.to_checksum_address(address) for address, _ in recipients]
+        values = [self.w3.to_wei(amount, 'ether') for _, amount in recipients]
+        contract = self.w3.eth.contract(address=self.w3.to_checksum_address(settings.DISPERSE_CONTRACT_ADDRESS),
+                                        abi=DISPERSE_ABI)
+        return self._sign_and_send({
+            'to': contract.address,
+            'value': sum(values),
+            'data': contract.encode_abi('disperseEther', args=[addresses, values]),
+        }, private_key)
+
+    def _sign_and_send(self, transaction: Dict[str, Any], private_key: Optional[str] = None) -> Optional[str]:
+        """Fill in nonce, fees and gas, then sign and broadcast a transaction.
+
+        Returns None if the transaction was not sent. A transport failure
+        while broadcasting raises ``BroadcastUncertain`` instead, since the
+        node may have accepted it.
+        """
+        broadcasting = False
         try:
             if not private_key and not self.default_account:
                 logger.error("No private key available for sending transaction")
                 return None
             
-            account = Account.from_key(private_key) if private_key else self.default_account
+            account = self.w3.eth.account.from_key(private_key) if private_key else self.default_account
             
-            # Build transaction
-            transaction = {
-                'to': to_address,
-                'value': self.w3.to_wei(amount, 'ether'),
-                'gas': 21000,
-                'gasPrice': self.get_gas_price(),
-                'nonce': self.w3.eth.get_transaction_count(account.address),
-            }
-            
-            # Sign and send transaction
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, private_key or self.default_account.key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            
-            return tx_hash.hex()
+            # Nonces come from the local nonce manager so concurrent payouts
+            # never collide and need not wait for each other to be mined
+            with self.nonce_manager.reserve(account.address) as nonce:
+                # Build transaction
+                transaction = {
+                    **transaction,
+                    # Recipients come from the database in whatever case they were entered
+                    'to': self.w3.to_checksum_address(transaction['to']),
+                    'from': account.address,
+                    'nonce': nonce,
+                    'chainId': settings.AVALANCHE_CHAIN_ID,
+                    **self.get_fees(),
+                }
+                transaction['gas'] = self.estimate_gas(transaction)
+                del transaction['from']
+                
+                # Sign and send transaction
+                signed_txn = self.w3.eth.account.sign_transaction(transaction, account.key)
+                broadcasting = True
+                tx_hash = self.w3.to_hex(self.w3.eth.send_raw_transaction(signed_txn.raw_transaction))
             
         except Exception as e:
+            if broadcasting and is_ambiguous_error(e):
+                tx_hash = self.w3.to_hex(signed_txn.hash)
+                raise BroadcastUncertain(f"Broadcast of {tx_hash} may have reached the node: {e}", tx_hash) from e
             logger.error(f"Error sending transaction: {e}")
+            if 'underpriced' in str(e).lower():
+                self.gas_oracle.invalidate()
             return None
+        
+        # The transaction is out: whatever happens to the bookkeeping, the caller
+        # must see it as sent or the payment would be sent twice
+        self._record_broadcast(account.address, transaction, tx_hash)
+        return tx_hash
+
+    def _record_broadcast(self, from_address: str, transaction: Dict[str, Any], tx_hash: str) -> None:
+        """Track a broadcast by nonce so a stuck transaction can be replaced"""
+        try:
+            with db_transaction.atomic():
+                OutgoingTransaction.objects.create(
+                    from_address=from_address.lower(),
+                    nonce=transaction['nonce'],
+                    to_address=transaction['to'],
+                    value=transaction['value'],
+                    data=transaction.get('data') or '',
+                    gas=transaction['gas'],
+                    max_fee_per_gas=transaction.get('maxFeePerGas'),
+                    max_priority_fee_per_gas=transaction.get('maxPriorityFeePerGas'),
+                    gas_price=transaction.get('gasPrice'),
+                    transaction_hash=tx_hash,
+                    broadcast_at=timezone.now(),
+                )
+        except Exception as e:
+            # Confirmation still works from the payout's hash; only fee bumping is lost
+            logger.error(f"Sent transaction {tx_hash} but could not record it for the stuck transaction monitor: {e}")
+
+    def replace_transaction(self, outgoing: OutgoingTransaction, fees: Dict[str, int]) -> str:
+        """Re-sign a pending transaction with the same nonce and new fees, and broadcast it.
+
+        Only transactions sent from the default account can be replaced. Node
+        errors are raised to the caller.
+        """
+        if not self.default_account or self.default_account.address.lower() != outgoing.from_address:
+            raise ValueError(f"No private key available for {outgoing.from_address}")
+
+        transaction = {
+            'to': self.w3.to_checksum_address(outgoing.to_address),
+            'value': int(outgoing.value),
+            'nonce': outgoing.nonce,
+            'gas': outgoing.gas,
+            'chainId': settings.AVALANCHE_CHAIN_ID,
+            **fees,
+        }
+        if outgoing.data:
+            transaction['data'] = outgoing.data
+
+        signed_txn = self.w3.eth.account.sign_transaction(transaction, self.default_account.key)
+        return self.w3.to_hex(self.w3.eth.send_raw_transaction(signed_txn.raw_transaction))
+
+    def get_transaction_count(self, address: str) -> int:
+        """Get the number of mined transactions sent from an address"""
+        return self.w3.eth.get_transaction_count(self.w3.to_checksum_address(address), 'latest')
     
     def wait_for_transaction_receipt(self, tx_hash: str, timeout: int = 120) -> Optional[Dict[str, Any]]:
         """Wait for transaction to be mined"""
@@ -159,26 +345,354 @@ class AvalancheWeb3Helper:
             return None
 
 
-# Initialize global Web3 helper instance
-web3_helper = AvalancheWeb3Helper()
+class AsyncAvalancheWeb3Helper:
+    """Async counterpart of AvalancheWeb3Helper for high-throughput verification.
+
+    Calls are multiplexed over a single aiohttp session, with at most
+    ``max_concurrency`` requests in flight per event loop.
+    """
+
+    def __init__(self, rpc_url: Optional[str] = None, max_concurrency: Optional[int] = None):
+        from web3 import AsyncWeb3
+        
+        # The async client talks to the best endpoint of the pool at creation time
+        self.w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(rpc_url or get_rpc_pool().ranked()[0].url))
+        self.max_concurrency = max_concurrency or settings.WEB3_ASYNC_MAX_CONCURRENCY
+        self.receipt_cache = ReceiptCache()
+        self._semaphores = {}
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Get the concurrency limiter bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            # Drop limiters belonging to loops that have since been closed
+            self._semaphores = {l: sem for l, sem in self._semaphores.items() if not l.is_closed()}
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def is_connected(self) -> bool:
+        """Check if connected to Avalanche network"""
+        try:
+            async with self._semaphore():
+                return await self.w3.is_connected()
+        except Exception as e:
+            logger.error(f"Web3 connection error: {e}")
+            return False
+
+    async def disconnect(self) -> None:
+        """Close the HTTP sessions opened on the running event loop"""
+        await self.w3.provider.disconnect()
+
+    async def get_balance(self, address: str) -> Decimal:
+        """Get AVAX balance for an address"""
+        try:
+            async with self._semaphore():
+                balance_wei = await self.w3.eth.get_balance(address)
+            return _from_wei(balance_wei)
+        except Exception as e:
+            logger.error(f"Error getting balance for {address}: {e}")
+            return Decimal('0')
+
+    async def fetch_transactions(self, tx_hashes: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch transactions and receipts for many hashes, one batch per chunk in parallel"""
+        tx_hashes = list(dict.fromkeys(tx_hashes))
+        results = await sync_to_async(self.receipt_cache.get_many)(tx_hashes)
+        chunk_results = await asyncio.gather(*(
+            self._fetch_transaction_chunk(chunk)
+            for chunk in _chunked([tx_hash for tx_hash in tx_hashes if tx_hash not in results],
+                                  settings.WEB3_BATCH_MAX_SIZE)
+        ))
+        for chunk_result in chunk_results:
+            results.update(chunk_result)
+        return results
+
+    async def _fetch_transaction_chunk(self, tx_hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        try:
+            async with self._semaphore():
+                responses = await self.w3.provider.make_batch_request(_transaction_batch(tx_hashes))
+        except Exception as e:
+            logger.error(f"Error fetching transaction batch: {e}")
+            responses = {'error': {'message': str(e)}}
+        fetched, head_block = _parse_transaction_batch(tx_hashes, responses)
+        if head_block is not None:
+            await sync_to_async(self.receipt_cache.store_many)(fetched, head_block)
+        return fetched
+
+    async def verify_transactions(self, checks: Iterable[Tuple[str, Decimal, str]]) -> Dict[str, Dict[str, Any]]:
+        """Verify many transactions against their expected amount and recipient"""
+        checks = list(checks)
+        fetched = await self.fetch_transactions(tx_hash for tx_hash, _, _ in checks)
+        return {
+            tx_hash: _build_verification_result(tx_hash, fetched[tx_hash], expected_amount, expected_to_address)
+            for tx_hash, expected_amount, expected_to_address in checks
+        }
+
+    async def verify_transaction(self, tx_hash: str, expected_amount: Decimal,
+                                 expected_to_address: str) -> Dict[str, Any]:
+        """Verify a transaction matches expected parameters"""
+        results = await self.verify_transactions([(tx_hash, expected_amount, expected_to_address)])
+        return results[tx_hash]
+
+    async def get_transaction_receipt(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Get transaction receipt"""
+        fetched = await self.fetch_transactions([tx_hash])
+        return fetched[tx_hash]['receipt']
+
+
+def _chunked(items: List[Any], size: int) -> Iterator[List[Any]]:
+    """Split ``items`` into lists of at most ``size`` elements"""
+    size = max(1, size)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _transaction_batch(tx_hashes: List[str]) -> List[Tuple[str, List[Any]]]:
+    """Build the JSON-RPC batch that fetches a transaction and receipt per hash.
+
+    The current block number rides along at the end so callers can tell
+    which receipts are final.
+    """
+    batch = []
+    for tx_hash in tx_hashes:
+        batch.append(('eth_getTransactionByHash', [tx_hash]))
+        batch.append(('eth_getTransactionReceipt', [tx_hash]))
+    batch.append(('eth_blockNumber', []))
+    return batch
+
+
+def _parse_transaction_batch(tx_hashes: List[str],
+                             responses: Any) -> Tuple[Dict[str, Dict[str, Any]], Optional[int]]:
+    """Pair the responses of a ``_transaction_batch`` back up with their hashes.
+
+    Returns the per-hash results and the head block number (if known).
+    """
+    if not isinstance(responses, list):
+        # The node rejected the whole batch
+        error = _rpc_error_message(responses)
+        return {tx_hash: {'transaction': None, 'receipt': None, 'error': error} for tx_hash in tx_hashes}, None
+
+    results = {}
+    for index, tx_hash in enumerate(tx_hashes):
+        tx_response = responses[2 * index]
+        receipt_response = responses[2 * index + 1]
+        results[tx_hash] = {
+            'transaction': _parse_transaction(tx_response.get('result')),
+            'receipt': _parse_receipt(receipt_response.get('result')),
+            'error': _rpc_error_message(tx_response) or _rpc_error_message(receipt_response),
+        }
+    head_block = _to_int(responses[-1].get('result')) if len(responses) > 2 * len(tx_hashes) else None
+    return results, head_block
+
+
+def _to_wei(amount: Decimal) -> int:
+    """Convert an AVAX amount to wei"""
+    return int(Decimal(str(amount)) * WEI_PER_AVAX)
+
+
+def _from_wei(value: int) -> Decimal:
+    """Convert a wei amount to AVAX"""
+    return Decimal(value) / WEI_PER_AVAX
+
+
+def _to_int(value: Any) -> Any:
+    """Decode a JSON-RPC hex quantity, leaving other values untouched"""
+    if isinstance(value, str) and value.startswith('0x'):
+        return int(value, 16)
+    return value
+
+
+def _rpc_error_message(response: Any) -> Optional[str]:
+    """Extract the error message from a raw JSON-RPC response, if any"""
+    if isinstance(response, dict) and response.get('error'):
+        error = response['error']
+        return error.get('message', str(error)) if isinstance(error, dict) else str(error)
+    return None
+
+
+def _parse_transaction(tx: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Normalize a raw ``eth_getTransactionByHash`` result"""
+    if not tx:
+        return None
+    parsed = dict(tx)
+    for key in TRANSACTION_QUANTITY_FIELDS:
+        if key in parsed:
+            parsed[key] = _to_int(parsed[key])
+    from eth_utils import to_checksum_address
+    for key in ('from', 'to'):
+        if parsed.get(key):
+            parsed[key] = to_checksum_address(parsed[key])
+    return parsed
+
+
+def _parse_receipt(receipt: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Normalize a raw ``eth_getTransactionReceipt`` result"""
+    if not receipt:
+        return None
+    parsed = dict(receipt)
+    for key in RECEIPT_QUANTITY_FIELDS:
+        if key in parsed:
+            parsed[key] = _to_int(parsed[key])
+    return parsed
+
+
+def _parse_block(block: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Normalize a raw ``eth_getBlockByNumber`` result"""
+    if not block:
+        return None
+    parsed = dict(block)
+    for key in BLOCK_QUANTITY_FIELDS:
+        if key in parsed:
+            parsed[key] = _to_int(parsed[key])
+    parsed['transactions'] = [
+        _parse_transaction(tx) if isinstance(tx, dict) else tx
+        for tx in parsed.get('transactions', [])
+    ]
+    return parsed
+
+
+def _build_verification_result(tx_hash: str, fetched: Dict[str, Any], expected_amount: Decimal,
+                               expected_to_address: str) -> Dict[str, Any]:
+    """Check a fetched transaction/receipt pair against the expected transfer"""
+    tx = fetched.get('transaction')
+    receipt = fetched.get('receipt')
+
+    if fetched.get('error'):
+        return {
+            'is_valid': False,
+            'tx_hash': tx_hash,
+            'errors': [f"Verification error: {fetched['error']}"]
+        }
+    if tx is None:
+        return {'is_valid': False, 'tx_hash': tx_hash, 'errors': ['Transaction not found']}
+    if receipt is None:
+        return {'is_valid': False, 'tx_hash': tx_hash, 'errors': ['Transaction not yet mined']}
+
+    # Convert amount to wei for comparison
+    expected_amount_wei = _to_wei(expected_amount)
+
+    verification_result = {
+        'is_valid': False,
+        'tx_hash': tx_hash,
+        'from_address': tx['from'],
+        'to_address': tx['to'],
+        'amount': _from_wei(tx['value']),
+        'gas_price': tx.get('gasPrice'),
+        'gas_used': receipt['gasUsed'],
+        'block_number': receipt['blockNumber'],
+        'status': receipt['status'],
+        'errors': []
+    }
+
+    # Verify transaction succeeded
+    if receipt['status'] != 1:
+        verification_result['errors'].append('Transaction failed')
+        return verification_result
+
+    # Verify recipient address
+    if not tx['to'] or not expected_to_address or tx['to'].lower() != expected_to_address.lower():
+        verification_result['errors'].append('Recipient address mismatch')
+
+    # Verify amount (allow small gas differences)
+    if abs(tx['value'] - expected_amount_wei) > _to_wei(Decimal('0.001')):
+        verification_result['errors'].append('Amount mismatch')
+
+    # If no errors, transaction is valid
+    if not verification_result['errors']:
+        verification_result['is_valid'] = True
+
+    return verification_result
+
+
+# Shared helper instances, built on first use so that importing this module
+# (from views, tasks, management commands, ...) does not load web3
+_web3_helper = None
+_async_web3_helper = None
+_helper_lock = threading.Lock()
+
+
+def get_web3_helper() -> AvalancheWeb3Helper:
+    """Get the shared Web3 helper, creating it on first use"""
+    global _web3_helper
+    if _web3_helper is None:
+        with _helper_lock:
+            if _web3_helper is None:
+                _web3_helper = AvalancheWeb3Helper()
+    return _web3_helper
+
+
+def get_async_web3_helper() -> AsyncAvalancheWeb3Helper:
+    """Get the shared async Web3 helper, creating it on first use"""
+    global _async_web3_helper
+    if _async_web3_helper is None:
+        with _helper_lock:
+            if _async_web3_helper is None:
+                _async_web3_helper = AsyncAvalancheWeb3Helper()
+    return _async_web3_helper
+
+
+def __getattr__(name: str) -> Any:
+    # Keep ``web3_helper``/``async_web3_helper`` importable as module attributes
+    if name == 'web3_helper':
+        return get_web3_helper()
+    if name == 'async_web3_helper':
+        return get_async_web3_helper()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def verify_contribution_transaction(tx_hash: str, amount: Decimal, 
                                   group_wallet_address: str) -> Dict[str, Any]:
     """Verify a contribution transaction on the blockchain"""
-    return web3_helper.verify_transaction(tx_hash, amount, group_wallet_address)
+    return get_web3_helper().verify_transaction(tx_hash, amount, group_wallet_address)
+
+
+def verify_contribution_transactions(checks: Iterable[Tuple[str, Decimal, str]]) -> Dict[str, Dict[str, Any]]:
+    """Verify many contribution transactions with a single batched lookup"""
+    return get_web3_helper().verify_transactions(checks)
 
 
 def get_transaction_details(tx_hash: str) -> Optional[Dict[str, Any]]:
     """Get transaction details from blockchain"""
-    return web3_helper.get_transaction_receipt(tx_hash)
+    return get_transactions_details([tx_hash])[tx_hash]
+
+
+def get_transactions_details(tx_hashes: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Get transaction receipts for many hashes with a single batched lookup"""
+    fetched = get_web3_helper().fetch_transactions(tx_hashes)
+    return {tx_hash: result['receipt'] for tx_hash, result in fetched.items()}
 
 
 def check_wallet_balance(address: str) -> Decimal:
     """Check wallet balance on Avalanche"""
-    return web3_helper.get_balance(address)
+    return get_web3_helper().get_balance(address)
 
 
 def send_payout_transaction(to_address: str, amount: Decimal) -> Optional[str]:
     """Send payout transaction"""
-    return web3_helper.send_transaction(to_address, amount)
+    return get_web3_helper().send_transaction(to_address, amount)
+
+
+def send_batch_payout_transaction(recipients: Iterable[Tuple[str, Decimal]]) -> Optional[str]:
+    """Send one disperse transaction paying every ``(address, amount)`` pair"""
+    return get_web3_helper().send_disperse_transaction(recipients)
+
+
+async def averify_contribution_transaction(tx_hash: str, amount: Decimal,
+                                           group_wallet_address: str) -> Dict[str, Any]:
+    """Verify a contribution transaction on the blockchain without blocking"""
+    return await get_async_web3_helper().verify_transaction(tx_hash, amount, group_wallet_address)
+
+
+async def averify_contribution_transactions(checks: Iterable[Tuple[str, Decimal, str]]) -> Dict[str, Dict[str, Any]]:
+    """Verify many contribution transactions concurrently"""
+    return await get_async_web3_helper().verify_transactions(checks)
+
+
+async def aget_transaction_details(tx_hash: str) -> Optional[Dict[str, Any]]:
+    """Get transaction details from blockchain without blocking"""
+    return await get_async_web3_helper().get_transaction_receipt(tx_hash)
+
+
+async def acheck_wallet_balance(address: str) -> Decimal:
+    """Check wallet balance on Avalanche without blocking"""
+    return await get_async_web3_helper().get_balance(address)
@@ -20,6 +20,34 @@ app.conf.beat_schedule = {
         'task': 'chama.tasks.send_contribution_reminder',
         'schedule': 86400.0,  # Run daily (24 hours in seconds)
     },
+    'index-chain-contributions': {
+        'task': 'chama.tasks.index_chain_contributions',
+        'schedule': 15.0,  # Run every 15 seconds
+    },
+    'dispatch-contribution-verification': {
+        'task': 'chama.tasks.dispatch_contribution_verification',
+        'schedule': 60.0,  # Run every minute; picks up backed-off contributions without new submissions
+    },
+    'sweep-due-payouts': {
+        'task': 'chama.tasks.sweep_due_payouts',
+        'schedule': 60.0,  # Run every minute; no-op in PAYOUT_BATCH_MODE
+    },
+    'execute-batch-payouts': {
+        'task': 'chama.tasks.execute_batch_payouts',
+        'schedule': 300.0,  # Run every 5 minutes; no-op unless PAYOUT_BATCH_MODE is on
+    },
+    'snapshot-wallet-balances': {
+        'task': 'chama.tasks.snapshot_wallet_balances',
+        'schedule': 900.0,  # Run every 15 minutes
+    },
+    'monitor-pending-transactions': {
+        'task': 'chama.tasks.monitor_pending_transactions',
+        'schedule': 30.0,  # Run every 30 seconds
+    },
+    'drain-email-outbox': {
+        'task': 'users.tasks.drain_email_outbox',
+        'schedule': 60.0,  # Run every minute; commits also wake a worker straight away
+    },
     'cleanup-unconfirmed-contributions': {
         'task': 'chama.tasks.cleanup_unconfirmed_contributions',
         'schedule': 3600.0,  # Run hourly
@@ -213,17 +213,107 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Cache Configuration
+# Shared cache for counters and short-lived chain data; Redis in production
+if DEBUG:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
+        }
+    }
+
 # Avalanche/Web3 Configuration
 AVALANCHE_RPC_URL = os.getenv('AVALANCHE_RPC_URL', 'https://api.avax-test.network/ext/bc/C/rpc')  # Testnet
+# Comma-separated list of RPC endpoints; requests are routed to the fastest healthy one
+AVALANCHE_RPC_URLS = [url.strip() for url in os.getenv('AVALANCHE_RPC_URLS', AVALANCHE_RPC_URL).split(',') if url.strip()]
+# Optional websocket endpoint used to follow new block heads
+AVALANCHE_WS_URL = os.getenv('AVALANCHE_WS_URL', '')
 AVALANCHE_CHAIN_ID = int(os.getenv('AVALANCHE_CHAIN_ID', '43113'))  # Fuji Testnet
 
+# Maximum number of transactions looked up per JSON-RPC batch request
+WEB3_BATCH_MAX_SIZE = int(os.getenv('WEB3_BATCH_MAX_SIZE', '100'))
+
+# RPC pool: failover, EWMA latency routing, hedged reads and health checks
+RPC_TIMEOUT_SECONDS = float(os.getenv('RPC_TIMEOUT_SECONDS', '10'))
+RPC_POOL_MAXSIZE = int(os.getenv('RPC_POOL_MAXSIZE', '10'))  # Keep-alive connections per endpoint
+RPC_HEDGE_DELAY_SECONDS = float(os.getenv('RPC_HEDGE_DELAY_SECONDS', '0.5'))  # 0 disables hedged reads
+RPC_EWMA_ALPHA = float(os.getenv('RPC_EWMA_ALPHA', '0.3'))
+RPC_FAILURE_THRESHOLD = int(os.getenv('RPC_FAILURE_THRESHOLD', '3'))  # Consecutive failures before cooldown
+RPC_COOLDOWN_SECONDS = float(os.getenv('RPC_COOLDOWN_SECONDS', '5'))
+RPC_MAX_COOLDOWN_SECONDS = float(os.getenv('RPC_MAX_COOLDOWN_SECONDS', '300'))
+RPC_MAX_BLOCK_LAG = int(os.getenv('RPC_MAX_BLOCK_LAG', '5'))
+RPC_HEALTH_CHECK_INTERVAL_SECONDS = float(os.getenv('RPC_HEALTH_CHECK_INTERVAL_SECONDS', '30'))
+
+# Maximum number of in-flight RPC requests per event loop for the async client
+WEB3_ASYNC_MAX_CONCURRENCY = int(os.getenv('WEB3_ASYNC_MAX_CONCURRENCY', '32'))
+
+# Receipt cache: only results at least this many blocks deep are cached
+RECEIPT_CACHE_CONFIRMATIONS = int(os.getenv('RECEIPT_CACHE_CONFIRMATIONS', '12'))
+RECEIPT_CACHE_MEMORY_SIZE = int(os.getenv('RECEIPT_CACHE_MEMORY_SIZE', '10000'))  # In-process LRU entries
+
+# Contribution indexer: blocks are only scanned once they have this many confirmations
+CHAIN_INDEXER_CONFIRMATIONS = int(os.getenv('CHAIN_INDEXER_CONFIRMATIONS', '1'))
+CHAIN_INDEXER_MAX_BLOCKS = int(os.getenv('CHAIN_INDEXER_MAX_BLOCKS', '500'))  # Per indexer run
+# First block to scan when no checkpoint exists yet (defaults to the current head)
+CHAIN_INDEXER_START_BLOCK = int(os.getenv('CHAIN_INDEXER_START_BLOCK')) if os.getenv('CHAIN_INDEXER_START_BLOCK') else None
+
+# Confirmation tracker: resolves awaited transactions as new blocks arrive
+CONFIRMATION_TRACKER_CONFIRMATIONS = int(os.getenv('CONFIRMATION_TRACKER_CONFIRMATIONS', '1'))
+CONFIRMATION_TRACKER_REORG_DEPTH = int(os.getenv('CONFIRMATION_TRACKER_REORG_DEPTH', '64'))  # Blocks kept to detect reorgs
+CONFIRMATION_TRACKER_MAX_BLOCKS = int(os.getenv('CONFIRMATION_TRACKER_MAX_BLOCKS', '100'))  # Per head
+CONFIRMATION_TRACKER_POLL_INTERVAL_SECONDS = float(os.getenv('CONFIRMATION_TRACKER_POLL_INTERVAL_SECONDS', '2'))
+CONFIRMATION_TRACKER_WS_RETRY_SECONDS = float(os.getenv('CONFIRMATION_TRACKER_WS_RETRY_SECONDS', '60'))
+
 # Contract Configuration (will be set when smart contract is deployed)
 CHAMA_CONTRACT_ADDRESS = os.getenv('CHAMA_CONTRACT_ADDRESS', '')
 CHAMA_CONTRACT_ABI = []  # Will be populated with actual ABI
 
+# Batched payouts: due payouts across groups are paid in one disperseEther call
+PAYOUT_BATCH_MODE = os.getenv('PAYOUT_BATCH_MODE', 'False').lower() == 'true'
+DISPERSE_CONTRACT_ADDRESS = os.getenv('DISPERSE_CONTRACT_ADDRESS', '')
+PAYOUT_BATCH_MAX_RECIPIENTS = int(os.getenv('PAYOUT_BATCH_MAX_RECIPIENTS', '100'))
+PAYOUT_BATCH_VERIFY_DELAY_SECONDS = int(os.getenv('PAYOUT_BATCH_VERIFY_DELAY_SECONDS', '10'))
+
+# Payout sweeper: due payouts are claimed from the database in bounded batches;
+# a claim not finished within the lease is picked up again by the next sweep
+PAYOUT_SWEEP_BATCH_SIZE = int(os.getenv('PAYOUT_SWEEP_BATCH_SIZE', '20'))
+PAYOUT_SWEEP_MAX_BATCHES = int(os.getenv('PAYOUT_SWEEP_MAX_BATCHES', '10'))
+PAYOUT_CLAIM_LEASE_SECONDS = int(os.getenv('PAYOUT_CLAIM_LEASE_SECONDS', '600'))
+
 # Admin wallet (for contract deployment and management)
 ADMIN_PRIVATE_KEY = os.getenv('ADMIN_PRIVATE_KEY', '')  # Keep this secure!
 
+# Gas oracle: EIP-1559 fees from eth_feeHistory, cached and shared by all payout senders
+GAS_ORACLE_TTL_SECONDS = int(os.getenv('GAS_ORACLE_TTL_SECONDS', '15'))
+GAS_FEE_HISTORY_BLOCKS = int(os.getenv('GAS_FEE_HISTORY_BLOCKS', '20'))
+GAS_PRIORITY_FEE_PERCENTILE = float(os.getenv('GAS_PRIORITY_FEE_PERCENTILE', '50'))
+GAS_BASE_FEE_MULTIPLIER = float(os.getenv('GAS_BASE_FEE_MULTIPLIER', '2'))
+GAS_MIN_PRIORITY_FEE_GWEI = float(os.getenv('GAS_MIN_PRIORITY_FEE_GWEI', '0'))
+GAS_PRICE_FALLBACK_GWEI = float(os.getenv('GAS_PRICE_FALLBACK_GWEI', '25'))  # Only if the node never answered
+GAS_LIMIT_MULTIPLIER = float(os.getenv('GAS_LIMIT_MULTIPLIER', '1.2'))  # Headroom over eth_estimateGas; unused gas is refunded
+
+# Wallet balances: batched lookups cached briefly, plus periodic snapshots for dashboards
+BALANCE_CACHE_TTL_SECONDS = int(os.getenv('BALANCE_CACHE_TTL_SECONDS', '60'))
+BALANCE_SNAPSHOT_RETENTION_DAYS = int(os.getenv('BALANCE_SNAPSHOT_RETENTION_DAYS', '30'))
+
+# Stuck payouts are re-signed with the same nonce and a higher fee
+PAYOUT_STUCK_AFTER_SECONDS = int(os.getenv('PAYOUT_STUCK_AFTER_SECONDS', '120'))
+PAYOUT_FEE_BUMP_PERCENT = float(os.getenv('PAYOUT_FEE_BUMP_PERCENT', '20'))  # Nodes require at least 10
+PAYOUT_MAX_FEE_BUMPS = int(os.getenv('PAYOUT_MAX_FEE_BUMPS', '5'))
+PAYOUT_MAX_FEE_GWEI = float(os.getenv('PAYOUT_MAX_FEE_GWEI', '1000'))
+
+# How often locally managed nonces are reconciled with the node's pending count
+NONCE_RESYNC_INTERVAL_SECONDS = int(os.getenv('NONCE_RESYNC_INTERVAL_SECONDS', '300'))
+# A reserved nonce counts as in flight this long; a gap at the node is only refilled once nothing covers it
+NONCE_RESERVATION_LEASE_SECONDS = int(os.getenv('NONCE_RESERVATION_LEASE_SECONDS', '120'))
+
 # Logging Configuration
 LOGGING = {
     'version': 1,
@@ -291,5 +381,51 @@ else:
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@chama.com')
 EMAIL_VERIFICATION_TIMEOUT_HOURS = 24
 
+# In-process Bloom filter of submitted transaction hashes and idempotency keys
+CONTRIBUTION_BLOOM_CAPACITY = int(os.getenv('CONTRIBUTION_BLOOM_CAPACITY', '1000000'))
+CONTRIBUTION_BLOOM_ERROR_RATE = float(os.getenv('CONTRIBUTION_BLOOM_ERROR_RATE', '0.001'))
+CONTRIBUTION_BLOOM_PRELOAD = os.getenv('CONTRIBUTION_BLOOM_PRELOAD', 'True').lower() == 'true'  # Load it at process start
+
+# Submitted contributions are verified in bulk tasks of up to CONTRIBUTION_VERIFY_BATCH_SIZE
+CONTRIBUTION_VERIFY_BATCH_SIZE = int(os.getenv('CONTRIBUTION_VERIFY_BATCH_SIZE', '100'))
+CONTRIBUTION_VERIFY_MAX_BATCHES = int(os.getenv('CONTRIBUTION_VERIFY_MAX_BATCHES', '20'))
+CONTRIBUTION_VERIFY_DELAY_SECONDS = int(os.getenv('CONTRIBUTION_VERIFY_DELAY_SECONDS', '5'))
+# A contribution left pending by a check is not picked again for RETRY_BASE * 2^checks seconds, up to RETRY_MAX
+CONTRIBUTION_VERIFY_RETRY_BASE_SECONDS = int(os.getenv('CONTRIBUTION_VERIFY_RETRY_BASE_SECONDS', '30'))
+CONTRIBUTION_VERIFY_RETRY_MAX_SECONDS = int(os.getenv('CONTRIBUTION_VERIFY_RETRY_MAX_SECONDS', '3600'))
+# The coalescing marker outlives the scheduled dispatch by this long, so a lost dispatch cannot hold it for good
+CONTRIBUTION_VERIFY_MARKER_GRACE_SECONDS = int(os.getenv('CONTRIBUTION_VERIFY_MARKER_GRACE_SECONDS', '300'))
+
+# Lease of the row lock serializing payout scheduling per group on databases without advisory locks
+GROUP_LOCK_LEASE_SECONDS = int(os.getenv('GROUP_LOCK_LEASE_SECONDS', '60'))
+
+# Round completion checks for a group are coalesced over this window
+ROUND_CHECK_DELAY_SECONDS = int(os.getenv('ROUND_CHECK_DELAY_SECONDS', '30'))
+ROUND_CHECK_MARKER_GRACE_SECONDS = int(os.getenv('ROUND_CHECK_MARKER_GRACE_SECONDS', '300'))
+
+# Group search: 'auto' picks PostgreSQL full text search or SQLite FTS5 from the
+# database, 'like' falls back to substring matching; FTS5 returns the best
+# CHAMA_SEARCH_MAX_RESULTS groups among those the request can see
+CHAMA_SEARCH_BACKEND = os.getenv('CHAMA_SEARCH_BACKEND', 'auto')
+CHAMA_SEARCH_MAX_RESULTS = int(os.getenv('CHAMA_SEARCH_MAX_RESULTS', '200'))
+
+# Contribution reminders are streamed and queued in the email outbox in batches
+REMINDER_BATCH_SIZE = int(os.getenv('REMINDER_BATCH_SIZE', '500'))
+
+# Email outbox delivery: batches per run, retry backoff and per-domain rate limits
+# (emails per minute; EMAIL_OUTBOX_DOMAIN_RATE_LIMITS overrides it, e.g. "gmail.com:60,yahoo.com:20")
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', '100'))
+EMAIL_OUTBOX_MAX_BATCHES = int(os.getenv('EMAIL_OUTBOX_MAX_BATCHES', '50'))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', '6'))
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = int(os.getenv('EMAIL_OUTBOX_RETRY_BASE_SECONDS', '60'))
+EMAIL_OUTBOX_LEASE_SECONDS = int(os.getenv('EMAIL_OUTBOX_LEASE_SECONDS', '300'))
+EMAIL_OUTBOX_DOMAIN_RATE_LIMIT = int(os.getenv('EMAIL_OUTBOX_DOMAIN_RATE_LIMIT', '120'))
+EMAIL_OUTBOX_DOMAIN_RATE_LIMITS = {
+    domain.strip().lower(): int(limit)
+    for domain, limit in (
+        item.split(':') for item in os.getenv('EMAIL_OUTBOX_DOMAIN_RATE_LIMITS', '').split(',') if item.strip()
+    )
+}
+
 # Frontend URL for email verification links
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:8081')
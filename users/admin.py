@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User
+from .models import EmailOutbox, User
 
 
 @admin.register(User)
@@ -17,3 +17,12 @@ class CustomUserAdmin(UserAdmin):
     add_fieldsets = UserAdmin.add_fieldsets + (
         ('Additional Info', {'fields': ('phone_number', 'wallet_address')}),
     )
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to_email', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status', 'domain', 'created_at')
+    search_fields = ('to_email', 'subject')
+    readonly_fields = ('created_at', 'sent_at', 'claimed_at')
+    ordering = ('-created_at',)
@@ -85,3 +85,45 @@ class EmailVerificationToken(models.Model):
     
     def __str__(self):
         return f"Verification token for {self.user.email}"
+
+
+class EmailOutbox(models.Model):
+    """
+    Email queued for delivery by the outbox worker.
+
+    Rows are written in the same database transaction as the change that
+    triggers the email, so a rolled back request never sends mail and a
+    committed one always does eventually.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    to_email = models.EmailField()
+    # Recipient domain, used to rate limit delivery per mail provider
+    domain = models.CharField(max_length=255)
+    from_email = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'email_outbox'
+        verbose_name = 'Outbox Email'
+        verbose_name_plural = 'Email Outbox'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='email_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
@@ -0,0 +1,188 @@
+import logging
+from datetime import timedelta
+from typing import Dict, Iterable, List, Mapping
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def queue_email(to_email: str, subject: str, body: str, html_body: str = '', from_email: str = None) -> EmailOutbox:
+    """Queue one email; it is delivered after the current transaction commits"""
+    return queue_emails([{
+        'to_email': to_email, 'subject': subject, 'body': body,
+        'html_body': html_body, 'from_email': from_email,
+    }])[0]
+
+
+def queue_emails(messages: Iterable[Mapping[str, str]]) -> List[EmailOutbox]:
+    """Queue several emails with a single insert.
+
+    Each message is a mapping with ``to_email``, ``subject`` and ``body``,
+    and optionally ``html_body`` and ``from_email``.
+    """
+    rows = [
+        EmailOutbox(
+            to_email=message['to_email'],
+            domain=message['to_email'].rsplit('@', 1)[-1].lower(),
+            from_email=message.get('from_email') or settings.DEFAULT_FROM_EMAIL,
+            subject=message['subject'],
+            body=message['body'],
+            html_body=message.get('html_body') or '',
+        )
+        for message in messages
+    ]
+    if not rows:
+        return []
+
+    EmailOutbox.objects.bulk_create(rows)
+    transaction.on_commit(_wake_worker)
+    return rows
+
+
+def _wake_worker() -> None:
+    """Ask a worker to drain the outbox now rather than on its next scheduled run"""
+    from .tasks import drain_email_outbox
+
+    try:
+        drain_email_outbox.delay()
+    except Exception as e:
+        # The periodic drain picks the emails up anyway
+        logger.warning(f"Could not queue email outbox drain: {e}")
+
+
+def claim_batch(batch_size: int) -> List[EmailOutbox]:
+    """Claim due emails for this worker.
+
+    Rows are locked with ``SKIP LOCKED`` so concurrent workers claim disjoint
+    batches. Emails claimed by a worker that died are claimed again once
+    their lease of ``EMAIL_OUTBOX_LEASE_SECONDS`` has run out.
+    """
+    now = timezone.now()
+    expired_lease = now - timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+    with transaction.atomic():
+        ids = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='pending', next_attempt_at__lte=now) | Q(status='sending', claimed_at__lt=expired_lease))
+            .order_by('next_attempt_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        EmailOutbox.objects.filter(id__in=ids).update(status='sending', claimed_at=now)
+    return list(EmailOutbox.objects.filter(id__in=ids).order_by('next_attempt_at'))
+
+
+def domain_rate_limit(domain: str) -> int:
+    """Emails per minute allowed to a recipient domain"""
+    return settings.EMAIL_OUTBOX_DOMAIN_RATE_LIMITS.get(domain, settings.EMAIL_OUTBOX_DOMAIN_RATE_LIMIT)
+
+
+def _take_rate_slot(domain: str, now) -> bool:
+    """Count one email against the domain's limit for the current minute"""
+    key = f'email_outbox:rate:{domain}:{int(now.timestamp() // 60)}'
+    cache.add(key, 0, timeout=120)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # The counter expired between add and incr
+        cache.set(key, 1, timeout=120)
+        count = 1
+    return count <= domain_rate_limit(domain)
+
+
+def _build_message(email: EmailOutbox, connection) -> EmailMultiAlternatives:
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=[email.to_email],
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def _deliver(batch: List[EmailOutbox], connection, summary: Dict[str, int]) -> None:
+    now = timezone.now()
+    next_minute = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    sent, retried = [], []
+    for email in batch:
+        if not _take_rate_slot(email.domain, now):
+            # Over the provider's limit: leave it for the next minute
+            email.status = 'pending'
+            email.next_attempt_at = next_minute
+            retried.append(email)
+            summary['deferred'] += 1
+            continue
+
+        try:
+            connection.send_messages([_build_message(email, connection)])
+        except Exception as e:
+            email.attempts += 1
+            email.last_error = str(e)
+            if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                email.status = 'failed'
+                summary['failed'] += 1
+                logger.error(f"Giving up on email {email.id} to {email.to_email}: {e}")
+            else:
+                email.status = 'pending'
+                email.next_attempt_at = now + _retry_delay(email.attempts)
+                summary['retried'] += 1
+            retried.append(email)
+            continue
+
+        email.status = 'sent'
+        email.sent_at = timezone.now()
+        sent.append(email)
+        summary['sent'] += 1
+
+    EmailOutbox.objects.bulk_update(sent, ['status', 'sent_at'])
+    EmailOutbox.objects.bulk_update(retried, ['status', 'attempts', 'last_error', 'next_attempt_at'])
+
+
+def drain_outbox(batch_size: int = None, max_batches: int = None) -> Dict[str, int]:
+    """Deliver due outbox emails in batches over one SMTP connection.
+
+    Emails failing to send are retried with exponential backoff, starting at
+    ``EMAIL_OUTBOX_RETRY_BASE_SECONDS``, until ``EMAIL_OUTBOX_MAX_ATTEMPTS``.
+    Each recipient domain gets at most its rate limit per minute; emails
+    over it are deferred to the next minute.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    max_batches = max_batches or settings.EMAIL_OUTBOX_MAX_BATCHES
+    summary = {'batches': 0, 'sent': 0, 'retried': 0, 'deferred': 0, 'failed': 0}
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        logger.error(f"Could not connect to the mail server, outbox left for the next run: {e}")
+        return summary
+
+    try:
+        while summary['batches'] < max_batches:
+            batch = claim_batch(batch_size)
+            if not batch:
+                break
+            _deliver(batch, connection, summary)
+            summary['batches'] += 1
+    finally:
+        connection.close()
+
+    if summary['batches']:
+        logger.info(
+            f"Email outbox: {summary['sent']} sent, {summary['retried']} to retry, "
+            f"{summary['deferred']} rate limited, {summary['failed']} failed"
+        )
+    return summary
@@ -0,0 +1,16 @@
+import logging
+
+from celery import shared_task
+
+from .outbox import drain_outbox
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def drain_email_outbox():
+    """Deliver queued emails from the outbox"""
+    try:
+        drain_outbox()
+    except Exception as e:
+        logger.error(f"Error draining email outbox: {e}")
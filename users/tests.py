@@ -1,3 +1,91 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .models import EmailOutbox, User
+from .outbox import drain_outbox, queue_email
+
+
+class EmailOutboxTest(TestCase):
+    """Tests for the transactional email outbox"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_registration_queues_verification_email_without_sending(self):
+        with mock.patch('users.tasks.drain_email_outbox.delay') as wake:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = APIClient().post('/api/auth/register/', {
+                    'username': 'wanjiku',
+                    'email': 'wanjiku@example.com',
+                    'first_name': 'Wanjiku',
+                    'last_name': 'Kamau',
+                    'phone_number': '+254700000001',
+                    'password': 'Str0ng-passw0rd!',
+                    'password_confirm': 'Str0ng-passw0rd!',
+                }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(mail.outbox), 0)
+        queued = EmailOutbox.objects.get()
+        self.assertEqual((queued.to_email, queued.domain, queued.status), ('wanjiku@example.com', 'example.com', 'pending'))
+        wake.assert_called_once()
+
+        drain_outbox()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'Verify your Chama account')
+        self.assertEqual(EmailOutbox.objects.get().status, 'sent')
+
+    def test_registration_is_rolled_back_when_the_email_cannot_be_queued(self):
+        with mock.patch('users.outbox.EmailOutbox.objects.bulk_create', side_effect=DatabaseError('outbox down')):
+            response = APIClient().post('/api/auth/register/', {
+                'username': 'otieno',
+                'email': 'otieno@example.com',
+                'phone_number': '+254700000002',
+                'password': 'Str0ng-passw0rd!',
+                'password_confirm': 'Str0ng-passw0rd!',
+            }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(User.objects.filter(email='otieno@example.com').exists())
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2, EMAIL_OUTBOX_RETRY_BASE_SECONDS=60)
+    def test_failed_delivery_backs_off_then_gives_up(self):
+        email = queue_email('amina@example.com', 'Hello', 'Body')
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('421 busy')):
+            first = drain_outbox()
+            email.refresh_from_db()
+            self.assertEqual((first['retried'], email.status, email.attempts), (1, 'pending', 1))
+            self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=55))
+
+            EmailOutbox.objects.filter(id=email.id).update(next_attempt_at=timezone.now())
+            second = drain_outbox()
+
+        email.refresh_from_db()
+        self.assertEqual((second['failed'], email.status, email.last_error), (1, 'failed', '421 busy'))
+
+    @override_settings(EMAIL_OUTBOX_DOMAIN_RATE_LIMIT=2, EMAIL_OUTBOX_DOMAIN_RATE_LIMITS={'slow.example': 1})
+    def test_delivery_is_rate_limited_per_domain(self):
+        for index in range(3):
+            queue_email(f'user{index}@example.com', 'Hello', 'Body')
+            queue_email(f'user{index}@slow.example', 'Hello', 'Body')
+
+        summary = drain_outbox()
+
+        self.assertEqual((summary['sent'], summary['deferred']), (3, 3))
+        self.assertEqual(EmailOutbox.objects.filter(status='pending', domain='slow.example').count(), 2)
+        self.assertEqual(EmailOutbox.objects.filter(status='pending', domain='example.com').count(), 1)
+
+    def test_expired_claims_are_recovered(self):
+        email = queue_email('baraka@example.com', 'Hello', 'Body')
+        EmailOutbox.objects.filter(id=email.id).update(status='sending', claimed_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(drain_outbox()['sent'], 1)
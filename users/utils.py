@@ -1,15 +1,21 @@
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
+from django.db import DatabaseError, transaction
 from django.utils.html import strip_tags
 from .models import User, EmailVerificationToken
+from .outbox import queue_email
 import logging
 
 logger = logging.getLogger(__name__)
 
 def send_verification_email(user, token):
     """
-    Send email verification email to user
+    Queue the email verification email for the user.
+
+    The email goes through the outbox, so it is only sent if the caller's
+    transaction commits and SMTP is never contacted during the request.
+    Queueing errors are raised, so the caller's transaction rolls back
+    instead of committing without the email.
     """
     try:
         verification_url = f"{settings.FRONTEND_URL}/auth/verify-email?token={token.token}"
@@ -52,21 +58,19 @@ def send_verification_email(user, token):
         The Chama Team
         """
         
-        send_mail(
+        queue_email(
+            to_email=user.email,
             subject=subject,
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            html_message=html_message,
-            fail_silently=False,
+            body=plain_message,
+            html_body=html_message,
         )
         
-        logger.info(f"Verification email sent to {user.email}")
+        logger.info(f"Verification email queued for {user.email}")
         return True
         
     except Exception as e:
-        logger.error(f"Failed to send verification email to {user.email}: {str(e)}")
-        return False
+        logger.error(f"Failed to queue verification email to {user.email}: {str(e)}")
+        raise
 
 def create_verification_token(user):
     """
@@ -89,10 +93,11 @@ def resend_verification_email(user):
     if user.is_verified:
         return False, "User is already verified"
     
-    token = create_verification_token(user)
-    success = send_verification_email(user, token)
-    
-    if success:
-        return True, "Verification email sent successfully"
-    else:
+    try:
+        with transaction.atomic():
+            token = create_verification_token(user)
+            send_verification_email(user, token)
+    except DatabaseError:
         return False, "Failed to send verification email"
+    
+    return True, "Verification email sent successfully"
@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import login
+from django.db import DatabaseError, transaction
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from .models import User, EmailVerificationToken
@@ -23,26 +24,28 @@ class UserRegistrationView(generics.CreateAPIView):
     serializer_class = UserRegistrationSerializer
 
     def create(self, request, *args, **kwargs):
-        print(f"Registration request received: {request.data}")
         serializer = self.get_serializer(data=request.data)
         
         if not serializer.is_valid():
-            print(f"Serializer validation errors: {serializer.errors}")
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             
-        user = serializer.save()
-        print(f"User created successfully: {user.email}")
-        
-        # Create and send verification email
-        token = create_verification_token(user)
-        email_sent = send_verification_email(user, token)
-        print(f"Verification email sent: {email_sent}")
+        # The verification email is queued with the user, so both are saved or neither
+        try:
+            with transaction.atomic():
+                user = serializer.save()
+                token = create_verification_token(user)
+                send_verification_email(user, token)
+        except DatabaseError:
+            return Response(
+                {'error': 'Registration failed, please try again.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
         
         # Return response without JWT tokens (user needs to verify email first)
         return Response({
             'user': UserProfileSerializer(user).data,
             'message': 'Registration successful. Please check your email to verify your account.',
-            'email_sent': email_sent
+            'email_sent': True
         }, status=status.HTTP_201_CREATED)
 
 